@@ -0,0 +1,79 @@
+"""
+Compare the per-document cost of WebisDocument and DocumentRecord.
+
+Each round builds documents, applies three processing steps, and pickles
+them (what the "process" executor does between stages).
+
+Usage:
+    python benchmarks/benchmark_documents.py [num_docs]
+"""
+
+import pickle
+import sys
+import time
+import tracemalloc
+
+from webis.core.records import DocumentRecord, to_documents, to_records
+from webis.core.schema import DocumentMetadata, DocumentType, WebisDocument
+
+
+def _timed(label, func, num_docs):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    # Second run for memory: tracing slows the timed run down several-fold
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} {elapsed:7.3f}s  {num_docs / elapsed:>10,.0f} docs/s  "
+        f"peak {peak / num_docs:7.0f} B/doc"
+    )
+    return result
+
+
+def _process_models(num_docs):
+    docs = [
+        WebisDocument(
+            content=f"<p>Content {i}</p>",
+            doc_type=DocumentType.HTML,
+            meta=DocumentMetadata(url=f"https://example.com/{i}", title=f"Title {i}"),
+        )
+        for i in range(num_docs)
+    ]
+    for doc in docs:
+        doc.clean_content = doc.content[3:-4]
+        doc.add_processing_step("html_cleaner", {"chars": len(doc.clean_content)})
+        doc.add_processing_step("pii_redactor")
+        doc.add_processing_step("language", {"language": "en"})
+    return pickle.loads(pickle.dumps(docs))
+
+
+def _process_records(num_docs):
+    records = [
+        DocumentRecord(
+            content=f"<p>Content {i}</p>",
+            doc_type=DocumentType.HTML,
+            meta={"url": f"https://example.com/{i}", "title": f"Title {i}"},
+        )
+        for i in range(num_docs)
+    ]
+    for record in records:
+        record.clean_content = record.content[3:-4]
+        record.add_processing_step("html_cleaner", {"chars": len(record.clean_content)})
+        record.add_processing_step("pii_redactor")
+        record.add_processing_step("language", {"language": "en"})
+    return pickle.loads(pickle.dumps(records))
+
+
+def run_benchmark(num_docs: int = 100_000):
+    print(f"Benchmarking {num_docs:,} documents (build, 3 steps, pickle round trip)...")
+    docs = _timed("WebisDocument (pydantic)", lambda: _process_models(num_docs), num_docs)
+    records = _timed("DocumentRecord (slots)", lambda: _process_records(num_docs), num_docs)
+    _timed("records -> WebisDocument", lambda: to_documents(records), num_docs)
+    _timed("WebisDocument -> records", lambda: to_records(docs), num_docs)
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
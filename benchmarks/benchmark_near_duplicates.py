@@ -0,0 +1,54 @@
+"""
+Signature and lookup cost of the near-duplicate index.
+
+Indexes synthetic articles, then looks up copies of them wrapped in
+site boilerplate and unrelated articles.
+
+Usage:
+    python benchmarks/benchmark_near_duplicates.py [num_docs]
+"""
+
+import random
+import sys
+import time
+
+from webis.core.near_duplicates import NearDuplicateIndex
+
+
+def run_benchmark(num_docs: int = 20_000, threshold: float = 0.8):
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(20_000)]
+    articles = [" ".join(rng.choice(words) for _ in range(400)) for _ in range(num_docs)]
+    index = NearDuplicateIndex(threshold=threshold)
+    print(f"{index.bands} bands x {index.rows} rows for threshold {threshold}")
+
+    start = time.perf_counter()
+    signatures = [index.signature(text) for text in articles]
+    elapsed = time.perf_counter() - start
+    print(f"signature    {elapsed / num_docs * 1e3:8.3f} ms/doc")
+
+    for i, signature in enumerate(signatures):
+        index.insert(str(i), signature)
+
+    probes = 1000
+    copies = [
+        index.signature(f"Home | News | Sports {articles[i]} (c) Example Media. Subscribe now.")
+        for i in range(probes)
+    ]
+    unrelated = [
+        index.signature(" ".join(rng.choice(words) for _ in range(400))) for _ in range(probes)
+    ]
+
+    start = time.perf_counter()
+    found = sum(bool(index.query(signature)) for signature in copies)
+    elapsed = time.perf_counter() - start
+    print(f"lookup (dup) {elapsed / probes * 1e3:8.3f} ms/doc  {found}/{probes} found")
+
+    start = time.perf_counter()
+    found = sum(bool(index.query(signature)) for signature in unrelated)
+    elapsed = time.perf_counter() - start
+    print(f"lookup (new) {elapsed / probes * 1e3:8.3f} ms/doc  {found}/{probes} false matches")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
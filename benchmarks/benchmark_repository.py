@@ -0,0 +1,77 @@
+"""
+Rows/sec of DocumentRepository.bulk_upsert against one ORM session.add
+per document, on a scratch SQLite database (or WEBIS_BENCH_DB_URL).
+
+Usage:
+    python benchmarks/benchmark_repository.py [num_docs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from sqlmodel import Session
+
+from webis.core.memory.db import create_db_engine, init_db
+from webis.core.memory.deduplication import content_hash
+from webis.core.memory.models import DocumentModel
+from webis.core.memory.repository import DocumentRepository
+from webis.core.schema import DocumentMetadata, DocumentType, WebisDocument
+
+
+def _make_docs(num_docs, prefix):
+    return [
+        WebisDocument(
+            content=f"{prefix} document {i} " + "lorem ipsum " * 100,
+            doc_type=DocumentType.HTML,
+            meta=DocumentMetadata(url=f"https://example.com/{prefix}/{i}", title=f"Title {i}"),
+        )
+        for i in range(num_docs)
+    ]
+
+
+def _orm_insert(engine, docs):
+    # One add + commit per document, as a naive persistence stage would
+    with Session(engine) as session:
+        for doc in docs:
+            session.add(DocumentModel(
+                id=doc.id,
+                content=doc.content,
+                doc_type=doc.doc_type.value,
+                url=doc.meta.url,
+                content_hash=content_hash(doc.content),
+                title=doc.meta.title,
+            ))
+            session.commit()
+
+
+def run_benchmark(num_docs: int = 100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.environ.get("WEBIS_BENCH_DB_URL", f"sqlite:///{tmp}/bench.db")
+        engine = create_db_engine(url)
+        init_db(engine)
+        repo = DocumentRepository(engine)
+
+        orm_docs = min(num_docs, 5_000)
+        docs = _make_docs(orm_docs, "orm")
+        start = time.perf_counter()
+        _orm_insert(engine, docs)
+        elapsed = time.perf_counter() - start
+        print(f"ORM add+commit per doc   {orm_docs:>8,} rows  {orm_docs / elapsed:>10,.0f} rows/s")
+
+        docs = _make_docs(num_docs, "bulk")
+        start = time.perf_counter()
+        counts = repo.bulk_upsert(docs)
+        elapsed = time.perf_counter() - start
+        print(f"bulk_upsert (insert)     {num_docs:>8,} rows  {num_docs / elapsed:>10,.0f} rows/s  {counts}")
+
+        start = time.perf_counter()
+        counts = repo.bulk_upsert(docs)
+        elapsed = time.perf_counter() - start
+        print(f"bulk_upsert (re-upsert)  {num_docs:>8,} rows  {num_docs / elapsed:>10,.0f} rows/s  {counts}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
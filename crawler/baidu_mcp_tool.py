@@ -7,7 +7,7 @@ import hashlib
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlparse
 
-import requests
+from webis.core.http import get_http_client
 
 from .tool_base import BaseTool, ToolResult
 
@@ -125,7 +125,7 @@ class BaiduAiSearchMcpTool(BaseTool):
         body = {"jsonrpc": "2.0", "id": int(time.time() * 1000), "method": method}
         if params is not None:
             body["params"] = params
-        r = requests.post(self.mcp_url, json=body, headers=headers, timeout=30)
+        r = get_http_client().post(self.mcp_url, json=body, headers=headers, timeout=30)
         r.raise_for_status()
         data = r.json()
         if "error" in data:
@@ -286,7 +286,7 @@ class BaiduAiSearchMcpTool(BaseTool):
                 "Chrome/120.0.0.0 Safari/537.36"
             )
         }
-        r = requests.get(url, headers=headers, timeout=20)
+        r = get_http_client().get(url, headers=headers, timeout=20)
         # 某些站点不返回 charset，requests 会默认 ISO-8859-1，导致中文页面乱码（mojibake）
         if not r.encoding or r.encoding.lower() == "iso-8859-1":
             r.encoding = r.apparent_encoding
@@ -1,5 +1,5 @@
 import os
-import requests
+from webis.core.http import get_http_client
 from .tool_base import BaseTool, ToolResult
 
 
@@ -18,7 +18,7 @@ class GitHubSearchTool(BaseTool):
     def run(self, task: str, limit: int) -> ToolResult:
         os.makedirs(self.output_dir, exist_ok=True)
         url = "https://api.github.com/search/repositories"
-        r = requests.get(url, params={"q": task, "per_page": limit}, timeout=20)
+        r = get_http_client().get(url, params={"q": task, "per_page": limit}, timeout=20)
         r.raise_for_status()
         items = r.json().get("items", [])
 
@@ -29,7 +29,7 @@ class GitHubSearchTool(BaseTool):
             path = os.path.join(
                 self.output_dir, repo["name"][:50] + ".html"
             )
-            page = requests.get(html_url, timeout=20)
+            page = get_http_client().get(html_url, timeout=20)
             if not page.encoding or page.encoding.lower() == "iso-8859-1":
                 page.encoding = page.apparent_encoding
             with open(path, "w", encoding="utf-8") as f:
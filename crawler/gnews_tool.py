@@ -2,7 +2,7 @@ import os
 import hashlib
 from typing import Optional
 
-import requests
+from webis.core.http import get_http_client
 
 from .tool_base import BaseTool, ToolResult
 
@@ -36,7 +36,7 @@ class GNewsTool(BaseTool):
             "token": self.api_key,
         }
 
-        r = requests.get(url, params=params, timeout=20)
+        r = get_http_client().get(url, params=params, timeout=20)
         r.raise_for_status()
         articles = r.json().get("articles", []) or []
 
@@ -72,7 +72,7 @@ class GNewsTool(BaseTool):
         )
 
     def _fetch_page(self, url: str, path: str) -> None:
-        r = requests.get(url, timeout=20)
+        r = get_http_client().get(url, timeout=20)
         if not r.encoding or r.encoding.lower() == "iso-8859-1":
             r.encoding = r.apparent_encoding
         r.raise_for_status()
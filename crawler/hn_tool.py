@@ -1,7 +1,11 @@
 import os
-import requests
+from webis.core.http import get_http_client
+from webis.plugins.sources.hackernews_plugin import HackerNewsClient, HackerNewsItemCache
 from .tool_base import BaseTool, ToolResult
 
+# 进程内共享的条目缓存，重复运行时只抓取新条目
+_item_cache = HackerNewsItemCache(ttl=300)
+
 
 class HackerNewsTool(BaseTool):
     name = "hackernews"
@@ -16,23 +20,17 @@ class HackerNewsTool(BaseTool):
         self.output_dir = output_dir
 
     def run(self, task: str, limit: int) -> ToolResult:
-        ids = requests.get(
-            "https://hacker-news.firebaseio.com/v0/topstories.json",
-            timeout=20,
-        ).json()[:limit]
+        client = HackerNewsClient(max_workers=16, cache=_item_cache)
+        ids = client.top_story_ids(limit)
 
         files = []
 
-        for i in ids:
-            item = requests.get(
-                f"https://hacker-news.firebaseio.com/v0/item/{i}.json",
-                timeout=20,
-            ).json()
+        for i, item in client.iter_items(ids):
             url = item.get("url")
             if not url:
                 continue
 
-            r = requests.get(url, timeout=20)
+            r = get_http_client().get(url, timeout=20)
             if not r.encoding or r.encoding.lower() == "iso-8859-1":
                 r.encoding = r.apparent_encoding
             html = r.text
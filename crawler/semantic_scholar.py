@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import requests
+from webis.core.http import get_http_client
 import time
 from pathlib import Path
 
@@ -46,7 +47,7 @@ class SemanticScholarTool(BaseTool):
 
         # === Step 1: query Semantic Scholar API ===
         try:
-            r = requests.get(
+            r = get_http_client().get(
                 self.API_URL,
                 params=params,
                 headers=headers,
@@ -97,7 +98,7 @@ class SemanticScholarTool(BaseTool):
 
             try:
                 time.sleep(1.2)  # polite crawling
-                r = requests.get(url, headers=headers, timeout=15)
+                r = get_http_client().get(url, headers=headers, timeout=15)
                 r.raise_for_status()
                 html_path.write_text(r.text, encoding="utf-8")
                 files.append(str(html_path))
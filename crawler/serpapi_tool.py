@@ -6,7 +6,7 @@ from typing import Optional
 import hashlib
 from urllib.parse import urlparse
 
-import requests
+from webis.core.http import get_http_client
 
 from .tool_base import BaseTool, ToolResult
 
@@ -63,7 +63,7 @@ class SerpApiSearchTool(BaseTool):
         if safe:
             params["safe"] = safe
 
-        r = requests.get("https://serpapi.com/search", params=params, timeout=30)
+        r = get_http_client().get("https://serpapi.com/search", params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
 
@@ -117,7 +117,7 @@ class SerpApiSearchTool(BaseTool):
                 "Chrome/120.0.0.0 Safari/537.36"
             )
         }
-        r = requests.get(url, headers=headers, timeout=20)
+        r = get_http_client().get(url, headers=headers, timeout=20)
         if not r.encoding or r.encoding.lower() == "iso-8859-1":
             r.encoding = r.apparent_encoding
         r.raise_for_status()
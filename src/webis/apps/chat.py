@@ -3,12 +3,12 @@ import os
 from typing import List
 from webis.core.memory.retriever import HybridRetriever
 from webis.core.memory.vector_store import VectorStore
-from webis.core.llm.base import LLMFactory
+from webis.core.llm import LLMRouter
 
 def main():
     parser = argparse.ArgumentParser(description="Webis Chat")
     parser.add_argument("--collection", default="webis_knowledge", help="Vector store collection name")
-    parser.add_argument("--model", default="gpt-3.5-turbo", help="LLM model to use")
+    parser.add_argument("--model", default="deepseek-v3", help="LLM model to use")
     args = parser.parse_args()
 
     print(f"Initializing Webis Chat (Collection: {args.collection}, Model: {args.model})...")
@@ -17,7 +17,8 @@ def main():
     try:
         vector_store = VectorStore(collection_name=args.collection)
         retriever = HybridRetriever(vector_store)
-        llm = LLMFactory.create_llm(model_name=args.model)
+        llm = LLMRouter()
+        llm.add_model(args.model, primary=True)
     except Exception as e:
         print(f"Error initializing components: {e}")
         return
@@ -58,8 +59,11 @@ def main():
             Answer:
             """
             
-            response = llm.generate(prompt)
-            print(f"\nWebis: {response}\n")
+            # Print tokens as they arrive
+            print("\nWebis: ", end="", flush=True)
+            for delta in llm.stream([{"role": "user", "content": prompt}]):
+                print(delta, end="", flush=True)
+            print("\n")
             print("-" * 50)
 
         except KeyboardInterrupt:
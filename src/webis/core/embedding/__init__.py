@@ -0,0 +1,40 @@
+"""
+Embedding utilities for Webis.
+
+Provides:
+- EmbeddingCache: content-addressed vector cache (memory + SQLite)
+- CachedEmbedder: batched, deduplicated, cached embedding requests
+- EmbeddingMatrix: contiguous float32/float16 vector storage
+- EmbeddingBackend: pluggable backends (OpenAI, local ONNX/CPU, hashing)
+"""
+
+from .backends import (
+    EMBEDDING_BACKENDS,
+    EmbeddingBackend,
+    HashingEmbeddingBackend,
+    LocalEmbeddingBackend,
+    OpenAIEmbeddingBackend,
+    get_embedding_backend,
+    load_local_model,
+    local_model_lock,
+    register_embedding_backend,
+)
+from .cache import EmbeddingCache, text_key
+from .embedder import CachedEmbedder
+from .matrix import EmbeddingMatrix
+
+__all__ = [
+    "EmbeddingCache",
+    "text_key",
+    "CachedEmbedder",
+    "EmbeddingMatrix",
+    "EmbeddingBackend",
+    "OpenAIEmbeddingBackend",
+    "LocalEmbeddingBackend",
+    "HashingEmbeddingBackend",
+    "EMBEDDING_BACKENDS",
+    "register_embedding_backend",
+    "get_embedding_backend",
+    "load_local_model",
+    "local_model_lock",
+]
@@ -0,0 +1,363 @@
+"""
+Pluggable embedding backends.
+
+Every backend exposes ``embed_documents(texts)`` and ``embed_query(text)``
+(the LangChain ``Embeddings`` surface), so ``CachedEmbedder`` and the
+vector stores work with any of them:
+
+- ``openai``: ``langchain_openai.OpenAIEmbeddings`` over the network
+- ``local``: a sentence-transformers model on CPU, run through ONNX
+  Runtime with an int8-quantized graph by default. The model is loaded
+  lazily, once per process, and shared by every backend instance (and so
+  by every pipeline run) that asks for it.
+- ``hashing``: deterministic feature hashing with no model and no
+  network, for tests and offline development
+
+Local and hashing vectors come out as a float32 NumPy array of shape
+``(len(texts), dimension)``.
+
+Example:
+    >>> backend = get_embedding_backend("local", model="sentence-transformers/all-MiniLM-L6-v2")
+    >>> vectors = backend.embed_documents(["cookie banner", "article text"])
+    >>> vectors.dtype, vectors.shape
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+import os
+import platform
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy package required: pip install numpy")
+    return numpy
+
+
+class EmbeddingBackend(ABC):
+    """
+    Base class for embedding backends.
+
+    Args:
+        model: Model name
+    """
+
+    name: str = "base"
+    # Most texts sent in one call to ``embed_documents``
+    max_batch_size: int = 2048
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def model_id(self) -> str:
+        """
+        Identifies the vectors this backend produces (cache namespace).
+
+        Differs between backends, and between variants of one model
+        (e.g. quantized and full precision), whose vectors are not
+        interchangeable.
+        """
+        return self.model
+
+    @abstractmethod
+    def embed_documents(self, texts: Sequence[str]) -> Any:
+        """Embed texts, returning one vector per input in order."""
+        pass
+
+    def embed_query(self, text: str) -> Any:
+        return self.embed_documents([text])[0]
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """
+    OpenAI embeddings API, through LangChain.
+
+    Args:
+        model: Embedding model name
+        api_key: API key (defaults to ``OPENAI_API_KEY``)
+    """
+
+    name = "openai"
+    max_batch_size = 2048
+
+    def __init__(self, model: str = "text-embedding-3-small", api_key: Optional[str] = None, **kwargs):
+        super().__init__(model)
+        try:
+            from langchain_openai import OpenAIEmbeddings
+        except ImportError:
+            raise ImportError("langchain-openai package required: pip install langchain-openai")
+
+        api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            logger.warning("OPENAI_API_KEY not found, embedding will fail")
+        self.embeddings = OpenAIEmbeddings(model=model, api_key=api_key, **kwargs)
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+
+def _default_onnx_file() -> str:
+    # Dynamic int8 exports shipped with sentence-transformers hub models
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+
+_models: Dict[Tuple, Any] = {}
+_model_locks: Dict[Tuple, threading.Lock] = {}
+_models_lock = threading.Lock()
+
+
+def _model_key(model: str, runtime: str, file_name: Optional[str], device: str, threads: Optional[int]) -> Tuple:
+    # Thread settings are fixed when the ONNX session is created
+    return (model, runtime, file_name, device, threads if runtime == "onnx" else None)
+
+
+def load_local_model(
+    model: str = DEFAULT_LOCAL_MODEL,
+    runtime: str = "onnx",
+    file_name: Optional[str] = None,
+    device: str = "cpu",
+    threads: Optional[int] = None,
+) -> Any:
+    """
+    Get the process-wide ``SentenceTransformer`` for a model variant.
+
+    The first call loads it; later calls, from any thread, reuse it.
+    Its tokenizer is not thread-safe: encode under ``local_model_lock()``.
+
+    Args:
+        model: Hub model name or local path
+        runtime: sentence-transformers backend ("onnx", "openvino" or "torch")
+        file_name: Graph file inside the model repo (e.g. a quantized ONNX export)
+        device: Torch/ONNX device
+        threads: ONNX Runtime intra-op threads (None = one per physical core)
+    """
+    key = _model_key(model, runtime, file_name, device, threads)
+    with _models_lock:
+        loaded = _models.get(key)
+        if loaded is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ImportError(
+                    "sentence-transformers package required for local embeddings: "
+                    "pip install 'sentence-transformers[onnx]'"
+                )
+
+            kwargs: Dict[str, Any] = {"device": device}
+            if runtime != "torch":
+                kwargs["backend"] = runtime
+                model_kwargs: Dict[str, Any] = {}
+                if file_name:
+                    model_kwargs["file_name"] = file_name
+                if threads and runtime == "onnx":
+                    import onnxruntime
+
+                    session_options = onnxruntime.SessionOptions()
+                    session_options.intra_op_num_threads = threads
+                    model_kwargs["session_options"] = session_options
+                if model_kwargs:
+                    kwargs["model_kwargs"] = model_kwargs
+            loaded = _models[key] = SentenceTransformer(model, **kwargs)
+            _model_locks[key] = threading.Lock()
+            logger.info(f"Loaded local embedding model {model} ({runtime}, {file_name or 'default graph'})")
+        return loaded
+
+
+def local_model_lock(
+    model: str = DEFAULT_LOCAL_MODEL,
+    runtime: str = "onnx",
+    file_name: Optional[str] = None,
+    device: str = "cpu",
+    threads: Optional[int] = None,
+) -> threading.Lock:
+    """Lock serializing ``encode`` calls on a model from ``load_local_model``."""
+    key = _model_key(model, runtime, file_name, device, threads)
+    with _models_lock:
+        return _model_locks.setdefault(key, threading.Lock())
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    sentence-transformers model on CPU.
+
+    Texts are encoded in batches of ``batch_size``, one at a time: the
+    shared model's tokenizer is not thread-safe, so concurrent callers
+    take turns, and each batch is parallelized by ONNX Runtime's
+    intra-op threads instead.
+
+    Args:
+        model: Hub model name or local path
+        runtime: "onnx" (default), "openvino" or "torch"
+        quantize: Use the model's int8-quantized ONNX graph
+        onnx_file: Explicit graph file (overrides ``quantize``)
+        batch_size: Texts per encoder call
+        threads: ONNX Runtime intra-op threads (default: one per physical core)
+        normalize: L2-normalize vectors (cosine similarity = dot product)
+        device: Device to run on
+    """
+
+    name = "local"
+    max_batch_size = 1024
+
+    def __init__(
+        self,
+        model: str = DEFAULT_LOCAL_MODEL,
+        runtime: str = "onnx",
+        quantize: bool = True,
+        onnx_file: Optional[str] = None,
+        batch_size: int = 64,
+        threads: Optional[int] = None,
+        normalize: bool = True,
+        device: str = "cpu",
+    ):
+        super().__init__(model)
+        self.runtime = runtime
+        if onnx_file is None and quantize and runtime == "onnx":
+            onnx_file = _default_onnx_file()
+        self.onnx_file = onnx_file if runtime == "onnx" else None
+        self.batch_size = max(1, batch_size)
+        self.threads = threads
+        self.normalize = normalize
+        self.device = device
+
+    @property
+    def model_id(self) -> str:
+        variant = self.runtime
+        if self.onnx_file:
+            variant += ":" + os.path.splitext(os.path.basename(self.onnx_file))[0]
+        return f"{self.model}@{variant}"
+
+    @property
+    def encoder(self) -> Any:
+        return load_local_model(self.model, self.runtime, self.onnx_file, self.device, self.threads)
+
+    @property
+    def dimension(self) -> int:
+        return self.encoder.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> Any:
+        encoder = self.encoder
+        with local_model_lock(self.model, self.runtime, self.onnx_file, self.device, self.threads):
+            return encoder.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize,
+                show_progress_bar=False,
+            )
+
+    def embed_documents(self, texts: Sequence[str]) -> Any:
+        np = _numpy()
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        parts = [self._encode(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        return np.ascontiguousarray(np.concatenate(parts), dtype=np.float32)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Feature-hashed bag of words: no model, no network, fully deterministic.
+
+    Texts sharing words get similar vectors, which is enough to exercise
+    dedup and retrieval code paths offline; it is not a semantic model.
+
+    Args:
+        dimension: Vector size
+        normalize: L2-normalize vectors
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 256, normalize: bool = True, model: Optional[str] = None):
+        super().__init__(model or f"hashing-{dimension}")
+        self.dimension = dimension
+        self.normalize = normalize
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            # Low bits pick the bucket, the top bit the sign
+            vector[value % self.dimension] += 1.0 if value >> 63 else -1.0
+        if self.normalize:
+            norm = math.sqrt(sum(x * x for x in vector))
+            if norm:
+                vector = [x / norm for x in vector]
+        return vector
+
+    def embed_documents(self, texts: Sequence[str]) -> Any:
+        rows = [self._vector(text) for text in texts]
+        try:
+            np = _numpy()
+        except ImportError:
+            # Plain lists keep this backend dependency-free
+            return rows
+        return np.asarray(rows, dtype=np.float32).reshape(len(rows), self.dimension)
+
+
+EMBEDDING_BACKENDS: Dict[str, Type[EmbeddingBackend]] = {
+    OpenAIEmbeddingBackend.name: OpenAIEmbeddingBackend,
+    LocalEmbeddingBackend.name: LocalEmbeddingBackend,
+    HashingEmbeddingBackend.name: HashingEmbeddingBackend,
+}
+
+
+def register_embedding_backend(name: str, backend_class: Type[EmbeddingBackend]) -> None:
+    """Make a backend class available to ``get_embedding_backend`` by name."""
+    EMBEDDING_BACKENDS[name] = backend_class
+
+
+def get_embedding_backend(name: str = "openai", **options: Any) -> EmbeddingBackend:
+    """
+    Create an embedding backend by name.
+
+    Args:
+        name: "openai", "local", "hashing" or a registered name
+        **options: Constructor arguments of the backend class
+    """
+    backend_class = EMBEDDING_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(
+            f"Unknown embedding backend: {name} (available: {', '.join(sorted(EMBEDDING_BACKENDS))})"
+        )
+    return backend_class(**options)
+
+
+__all__ = [
+    "EmbeddingBackend",
+    "OpenAIEmbeddingBackend",
+    "LocalEmbeddingBackend",
+    "HashingEmbeddingBackend",
+    "EMBEDDING_BACKENDS",
+    "register_embedding_backend",
+    "get_embedding_backend",
+    "load_local_model",
+]
@@ -0,0 +1,168 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are keyed by ``(model, sha256(text))``, so identical text is
+embedded once per model no matter which document or run it comes from.
+A bounded in-memory LRU sits in front of an optional SQLite store that
+survives restarts and is shared by all processes on a node. Vectors are
+stored as float32.
+
+Example:
+    >>> cache = EmbeddingCache("~/.webis/embedding_cache.db")
+    >>> cache.put_many("text-embedding-3-small", {text_key("hello"): [0.1, 0.2]})
+    >>> cache.get_many("text-embedding-3-small", [text_key("hello")])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# SQLite's default limit on bound parameters is 999
+_SQL_BATCH = 500
+
+
+def text_key(text: str) -> str:
+    """Content address of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    if hasattr(vector, "astype"):
+        # NumPy row: copy the buffer instead of boxing each element
+        return vector.astype("float32", copy=False).tobytes()
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    Args:
+        path: SQLite database path (None = memory only)
+        max_memory_entries: Size of the in-memory LRU tier
+    """
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 10000):
+        self.path = os.path.expanduser(path) if path else None
+        self.max_memory_entries = max_memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._conn()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, key))"
+            )
+            conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, model: str, key: str, blob: bytes) -> None:
+        # Called with the lock held
+        self._memory[(model, key)] = blob
+        self._memory.move_to_end((model, key))
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Look up vectors by text key; missing keys are left out."""
+        return {key: _unpack(blob) for key, blob in self.get_blobs(model, keys).items()}
+
+    def get_blobs(self, model: str, keys: Sequence[str]) -> Dict[str, bytes]:
+        """Like ``get_many``, but returns the packed float32 buffers."""
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            for key in keys:
+                blob = self._memory.get((model, key))
+                if blob is not None:
+                    self._memory.move_to_end((model, key))
+                    found[key] = blob
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.path:
+            conn = self._conn()
+            for start in range(0, len(missing), _SQL_BATCH):
+                batch = missing[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({placeholders})",
+                    (model, *batch),
+                ).fetchall()
+                with self._lock:
+                    for key, blob in rows:
+                        found[key] = bytes(blob)
+                        self._remember(model, key, found[key])
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, Sequence[float]]) -> None:
+        """Store vectors by text key."""
+        self.put_blobs(model, {key: _pack(vector) for key, vector in vectors.items()})
+
+    def put_blobs(self, model: str, blobs: Dict[str, bytes]) -> None:
+        """Store packed float32 buffers by text key."""
+        with self._lock:
+            for key, blob in blobs.items():
+                self._remember(model, key, blob)
+        if self.path and blobs:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)",
+                    [(model, key, blob) for key, blob in blobs.items()],
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM embeddings")
+
+    def __len__(self) -> int:
+        if self.path:
+            return self._conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return len(self._memory)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+
+__all__ = [
+    "EmbeddingCache",
+    "text_key",
+]
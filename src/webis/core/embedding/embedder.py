@@ -0,0 +1,105 @@
+"""
+Batched, deduplicated and cached embedding requests.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from webis.core.embedding.cache import EmbeddingCache, _pack, _unpack, text_key
+from webis.core.embedding.matrix import EmbeddingMatrix
+
+logger = logging.getLogger(__name__)
+
+
+class CachedEmbedder:
+    """
+    Embeds texts through a content-addressed cache.
+
+    Each call collapses duplicate texts, serves what it can from the
+    cache, and sends the rest to the provider in batches of at most
+    ``batch_size`` texts. Returned vectors are float32-rounded, so a
+    text gets the same vector whether it was cached or not.
+
+    Args:
+        embeddings: Object with ``embed_documents(texts)`` returning one
+            vector per text (an ``EmbeddingBackend`` or a LangChain ``Embeddings``)
+        model: Model name, part of the cache key
+        cache: Embedding cache (default: in-memory only)
+        batch_size: Maximum texts per provider request
+
+    Example:
+        >>> backend = get_embedding_backend("local")
+        >>> embedder = CachedEmbedder(backend, backend.model_id,
+        ...                           cache=EmbeddingCache("~/.webis/embedding_cache.db"))
+        >>> vectors = embedder.embed(["cookie banner", "article text", "cookie banner"])
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        model: str,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 2048,
+    ):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.batch_size = max(1, batch_size)
+        self.requests = 0
+        self.embedded = 0
+        self.deduplicated = 0
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts, returning one vector per input in order."""
+        return [_unpack(blob) for blob in self._embed_blobs(texts)]
+
+    def embed_matrix(self, texts: Sequence[str], dtype: str = "float32") -> EmbeddingMatrix:
+        """
+        Embed texts into one contiguous matrix, row ``i`` for ``texts[i]``.
+
+        Cached float32 buffers are concatenated directly, without
+        materializing any Python floats.
+        """
+        blobs = self._embed_blobs(texts)
+        dim = len(blobs[0]) // 4 if blobs else 0
+        return EmbeddingMatrix.from_bytes(b"".join(blobs), dim).astype(dtype)
+
+    def _embed_blobs(self, texts: Sequence[str]) -> List[bytes]:
+        keys = [text_key(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+        self.deduplicated += len(keys) - len(unique)
+
+        blobs = self.cache.get_blobs(self.model, list(unique))
+        missing = [key for key in unique if key not in blobs]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            embedded = self.embeddings.embed_documents([unique[key] for key in batch])
+            fresh = {key: _pack(vector) for key, vector in zip(batch, embedded)}
+            self.cache.put_blobs(self.model, fresh)
+            blobs.update(fresh)
+            self.requests += 1
+            self.embedded += len(batch)
+
+        if missing:
+            logger.debug(
+                f"Embedded {len(missing)} of {len(texts)} texts "
+                f"({len(unique) - len(missing)} cached, {len(keys) - len(unique)} duplicates)"
+            )
+        return [blobs[key] for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "embedded": self.embedded,
+            "deduplicated": self.deduplicated,
+            "cache": self.cache.stats(),
+        }
+
+
+__all__ = [
+    "CachedEmbedder",
+]
@@ -0,0 +1,234 @@
+"""
+Contiguous embedding storage.
+
+``EmbeddingMatrix`` keeps a document's vectors as one row-major float32
+(or float16) buffer instead of a list of lists of Python floats: a
+1536-dim vector takes 6 KB rather than ~50 KB, and serializes as one
+base64 string rather than 1536 decimal numbers. With NumPy installed,
+``to_numpy()`` is a zero-copy view of the buffer; without it, rows are
+decoded on access.
+
+Example:
+    >>> matrix = EmbeddingMatrix.from_rows([[0.1, 0.2], [0.3, 0.4]])
+    >>> matrix.shape, matrix.nbytes
+    ((2, 2), 16)
+    >>> EmbeddingMatrix.from_json(matrix.to_json()) == matrix
+    True
+"""
+
+from __future__ import annotations
+
+import base64
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# Buffers are little-endian regardless of the host
+_DTYPES = {"float32": ("<f4", "f", 4), "float16": ("<f2", "e", 2)}
+
+
+def _numpy() -> Optional[Any]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _is_ndarray(value: Any) -> bool:
+    return hasattr(value, "dtype") and hasattr(value, "shape")
+
+
+class EmbeddingMatrix:
+    """
+    Row-major matrix of float32 or float16 vectors in one buffer.
+
+    Args:
+        data: Raw little-endian buffer (bytes, or a NumPy array kept as is)
+        shape: (rows, dimension)
+        dtype: "float32" or "float16"
+    """
+
+    __slots__ = ("_data", "shape", "dtype")
+
+    def __init__(self, data: Any, shape: Tuple[int, int], dtype: str = "float32"):
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype} (use float32 or float16)")
+        rows, dim = shape
+        expected = rows * dim * _DTYPES[dtype][2]
+        size = data.nbytes if _is_ndarray(data) else len(data)
+        if size != expected:
+            raise ValueError(f"Buffer of {size} bytes does not hold a {rows}x{dim} {dtype} matrix")
+        self._data = data
+        self.shape = (int(rows), int(dim))
+        self.dtype = dtype
+
+    @classmethod
+    def from_rows(cls, rows: Any, dtype: str = "float32") -> "EmbeddingMatrix":
+        """Build from a NumPy array or a sequence of equal-length vectors."""
+        if dtype not in _DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype} (use float32 or float16)")
+        np = _numpy()
+        if np is not None:
+            matrix = np.ascontiguousarray(rows, dtype=_DTYPES[dtype][0])
+            if matrix.ndim == 1 and matrix.size == 0:
+                matrix = matrix.reshape(0, 0)
+            if matrix.ndim != 2:
+                raise ValueError(f"Expected a 2-D array of vectors, got shape {matrix.shape}")
+            return cls(matrix, matrix.shape, dtype)
+
+        rows = [list(row) for row in rows]
+        dim = len(rows[0]) if rows else 0
+        if any(len(row) != dim for row in rows):
+            raise ValueError("All embedding vectors must have the same dimension")
+        values = [x for row in rows for x in row]
+        if dtype == "float32":
+            buffer = array("f", values)
+            if sys.byteorder == "big":
+                buffer.byteswap()
+            data = buffer.tobytes()
+        else:
+            data = struct.pack(f"<{len(values)}e", *values)
+        return cls(data, (len(rows), dim), dtype)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, dim: int, dtype: str = "float32") -> "EmbeddingMatrix":
+        """Wrap a buffer of concatenated vectors of dimension ``dim``."""
+        itemsize = _DTYPES[dtype][2] if dtype in _DTYPES else 1
+        rows = len(data) // (dim * itemsize) if dim else 0
+        return cls(data, (rows, dim), dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return self.shape[0] * self.shape[1] * _DTYPES[self.dtype][2]
+
+    def tobytes(self) -> bytes:
+        if _is_ndarray(self._data):
+            return self._data.tobytes()
+        return bytes(self._data)
+
+    def to_numpy(self) -> Any:
+        """Zero-copy (read-only when backed by bytes) NumPy view of the matrix."""
+        np = _numpy()
+        if np is None:
+            raise ImportError("numpy package required: pip install numpy")
+        if _is_ndarray(self._data):
+            return self._data
+        return np.frombuffer(self._data, dtype=_DTYPES[self.dtype][0]).reshape(self.shape)
+
+    def row(self, index: int) -> List[float]:
+        """One vector as Python floats."""
+        rows, dim = self.shape
+        if index < 0:
+            index += rows
+        if not 0 <= index < rows:
+            raise IndexError(f"Row {index} out of range for {rows} embeddings")
+        if _is_ndarray(self._data):
+            return self._data[index].tolist()
+        fmt, size = _DTYPES[self.dtype][1], _DTYPES[self.dtype][2]
+        return list(struct.unpack_from(f"<{dim}{fmt}", self._data, index * dim * size))
+
+    def __getitem__(self, index: int) -> Any:
+        """A row: a NumPy view when available, else a list of floats."""
+        if _numpy() is not None:
+            return self.to_numpy()[index]
+        return self.row(index)
+
+    def take_rows(self, start: int, stop: int) -> "EmbeddingMatrix":
+        """Copy of rows ``start:stop`` as a matrix of its own."""
+        start, stop, _ = slice(start, stop).indices(self.shape[0])
+        stop = max(start, stop)
+        if _is_ndarray(self._data):
+            return EmbeddingMatrix(self._data[start:stop].copy(), (stop - start, self.shape[1]), self.dtype)
+        width = self.shape[1] * _DTYPES[self.dtype][2]
+        return EmbeddingMatrix(
+            bytes(self._data[start * width:stop * width]), (stop - start, self.shape[1]), self.dtype
+        )
+
+    def astype(self, dtype: str) -> "EmbeddingMatrix":
+        if dtype == self.dtype:
+            return self
+        if _is_ndarray(self._data) or _numpy() is not None:
+            return EmbeddingMatrix.from_rows(self.to_numpy(), dtype)
+        return EmbeddingMatrix.from_rows(self.tolist(), dtype)
+
+    def tolist(self) -> List[List[float]]:
+        return [self.row(i) for i in range(self.shape[0])]
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self.shape[0]):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EmbeddingMatrix):
+            return NotImplemented
+        return self.shape == other.shape and self.dtype == other.dtype and self.tobytes() == other.tobytes()
+
+    def __repr__(self) -> str:
+        return f"EmbeddingMatrix(shape={self.shape}, dtype={self.dtype!r})"
+
+    # ---- Serialization ----
+
+    def to_json(self) -> Dict[str, Any]:
+        """Binary-safe JSON form: dtype, shape and the base64 buffer."""
+        return {
+            "dtype": self.dtype,
+            "shape": list(self.shape),
+            "data": base64.b64encode(self.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_json(cls, payload: Dict[str, Any]) -> "EmbeddingMatrix":
+        return cls(base64.b64decode(payload["data"]), tuple(payload["shape"]), payload.get("dtype", "float32"))
+
+    def __reduce__(self):
+        # Pickle the raw buffer, not an ndarray (loadable without NumPy)
+        return (EmbeddingMatrix, (self.tobytes(), self.shape, self.dtype))
+
+    @classmethod
+    def validate(cls, value: Any) -> "EmbeddingMatrix":
+        """Coerce a matrix, NumPy array, JSON form or list of vectors."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict) and "data" in value:
+            return cls.from_json(value)
+        if _is_ndarray(value):
+            dtype = "float16" if str(value.dtype) == "float16" else "float32"
+            return cls.from_rows(value, dtype)
+        if isinstance(value, (list, tuple)):
+            # Legacy List[List[float]] documents
+            return cls.from_rows(value)
+        raise TypeError(f"Cannot interpret {type(value).__name__} as an embedding matrix")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> Any:
+        from pydantic_core import core_schema
+
+        def serialize(value: "EmbeddingMatrix", info: Any) -> Union["EmbeddingMatrix", Dict[str, Any]]:
+            return value.to_json() if info.mode_is_json() else value
+
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(serialize, info_arg=True),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "dtype": {"type": "string", "enum": list(_DTYPES)},
+                "shape": {"type": "array", "items": {"type": "integer"}},
+                "data": {"type": "string", "contentEncoding": "base64"},
+            },
+            "required": ["shape", "data"],
+        }
+
+
+__all__ = [
+    "EmbeddingMatrix",
+]
@@ -1,6 +1,8 @@
 from typing import Any, Dict, List, Callable, Optional
+import asyncio
 import concurrent.futures
 import logging
+import threading
 from webis.core.schema import WebisDocument, PipelineContext
 
 logger = logging.getLogger(__name__)
@@ -8,13 +10,22 @@ logger = logging.getLogger(__name__)
 class DistributedExecutor:
     """
     Manages distributed execution of pipeline tasks.
-    Currently supports multi-threading/multi-processing locally.
+    Currently supports multi-threading/multi-processing locally, plus an
+    "async" mode that fans work out on an asyncio event loop.
     Could be extended to use Celery/Ray/Dask.
+
+    Pools are created on first use and kept until shutdown(), so an
+    executor can be reused across many map() calls. In "async" mode the
+    event loop runs in a background thread for the executor's lifetime;
+    async HTTP clients opened on it are closed at shutdown.
     """
     def __init__(self, max_workers: int = 4, mode: str = "thread"):
         self.max_workers = max_workers
         self.mode = mode
         self._executor: Optional[concurrent.futures.Executor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
 
     def __enter__(self):
         self._ensure_executor()
@@ -24,7 +35,9 @@ class DistributedExecutor:
         self.shutdown()
 
     def _ensure_executor(self):
-        if self._executor is None:
+        if self.mode == "async":
+            self._ensure_loop()
+        elif self._executor is None:
             if self.mode == "thread":
                 self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
             elif self.mode == "process":
@@ -33,15 +46,46 @@ class DistributedExecutor:
                 # Sequential/Sync mode - no executor needed
                 pass
 
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="webis-executor-loop", daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
+
     def shutdown(self, wait: bool = True):
         if self._executor:
             self._executor.shutdown(wait=wait)
             self._executor = None
 
+        with self._lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._close_loop(), loop).result()
+            except Exception as e:
+                logger.warning(f"Error closing executor event loop: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    @staticmethod
+    async def _close_loop() -> None:
+        from webis.core.http import aclose_http_clients
+
+        await aclose_http_clients()
+        await asyncio.get_running_loop().shutdown_default_executor()
+
     def map(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
         """
         Applies func to items in parallel.
+        Results are returned in the order of items.
         """
+        if self.mode == "async":
+            return self._map_async(func, items)
         if self.mode not in ["thread", "process"]:
              return [func(item) for item in items]
 
@@ -50,6 +94,39 @@ class DistributedExecutor:
             return list(self._executor.map(func, items))
         return []
 
+    def _map_async(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """
+        Runs func over items on the executor's event loop, at most max_workers at a time.
+        Coroutine functions are awaited directly; plain functions are offloaded
+        to the loop's default thread pool.
+        The calling thread blocks until all items are done, so coroutines
+        should offload the call with ``asyncio.to_thread``. Calling it from
+        a task on the executor's own loop would deadlock and raises.
+        """
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError(
+                "DistributedExecutor.map() cannot be called from a task on its own event loop"
+            )
+
+        async def run_all() -> List[Any]:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            loop = asyncio.get_running_loop()
+
+            async def run_one(item: Any) -> Any:
+                async with semaphore:
+                    if asyncio.iscoroutinefunction(func):
+                        return await func(item)
+                    return await loop.run_in_executor(None, func, item)
+
+            return await asyncio.gather(*(run_one(item) for item in items))
+
+        return list(asyncio.run_coroutine_threadsafe(run_all(), loop).result())
+
     def submit(self, func: Callable, *args, **kwargs) -> concurrent.futures.Future:
         """
         Submits a single task.
@@ -0,0 +1,410 @@
+"""
+Shared HTTP client layer for Webis.
+
+All source and fetcher plugins should issue requests through an
+``HttpClient`` obtained from ``get_http_client()`` (or
+``PipelineContext.http``) instead of calling ``requests`` directly, so
+that connections are pooled and reused across plugins and runs.
+
+Features:
+- Per-host connection pools with keep-alive
+- Optional per-host concurrency limits
+- Retries with exponential backoff on transient status codes
+- Optional per-client DNS caching (sync face)
+- Sync (``requests``) and async (``httpx``, optionally HTTP/2) faces
+
+Example:
+    >>> client = get_http_client()
+    >>> resp = client.get("https://example.com", timeout=10)
+    >>> resp = await client.aget("https://example.com")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from webis.core.schema import PipelineContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HttpClientConfig:
+    """Settings for an HttpClient (read from the ``"http"`` pipeline config key)."""
+
+    timeout: float = 30
+    retries: int = 3
+    backoff_factor: float = 0.3
+
+    # Connection pooling
+    max_hosts: int = 100  # Number of per-host pools kept alive
+    max_connections_per_host: int = 16
+    max_concurrency_per_host: Optional[int] = None  # None = only bounded by the pool
+
+    # Async face
+    http2: bool = False
+
+    # DNS cache of the sync face: TTL in seconds (0 disables) and max hosts
+    dns_cache_ttl: float = 0.0
+    dns_cache_size: int = 1024
+
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class _DnsCache:
+    """
+    LRU cache of resolved addresses, private to one HttpClient.
+
+    Entries expire ``ttl`` seconds after they were resolved; at most
+    ``max_entries`` hosts are kept.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, List[str]]]" = OrderedDict()
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Addresses of ``host`` in resolver order (empty if it does not resolve)."""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        try:
+            infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError:
+            # Let the connection resolve again and raise its own error
+            return []
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"ttl": self.ttl, "max_entries": self.max_entries}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+
+class _CachedDnsConnection:
+    """Connection mixin that connects to addresses from ``dns_cache``."""
+
+    dns_cache: _DnsCache
+
+    def _new_conn(self):
+        # _dns_host is only used to open the socket; TLS SNI and
+        # certificate checks keep using the hostname in ``host``
+        host = self._dns_host
+        addresses = self.dns_cache.resolve(host, self.port)
+        if not addresses:
+            return super()._new_conn()
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if i == len(addresses) - 1:
+                        # The host may have moved; resolve again next time
+                        self.dns_cache.forget(host, self.port)
+                        raise
+        finally:
+            self._dns_host = host
+
+
+def _caching_pool_class(pool_cls: type, connection_cls: type, dns_cache: _DnsCache) -> type:
+    connection = type(connection_cls.__name__, (_CachedDnsConnection, connection_cls), {"dns_cache": dns_cache})
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": connection})
+
+
+class _DnsCachingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve hosts through a per-client DNS cache."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["dns_cache"]
+
+    def __init__(self, dns_cache: _DnsCache, **kwargs):
+        # Set first: HTTPAdapter.__init__ calls init_poolmanager
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _caching_pool_class(HTTPConnectionPool, HTTPConnection, self.dns_cache),
+            "https": _caching_pool_class(HTTPSConnectionPool, HTTPSConnection, self.dns_cache),
+        }
+
+
+class _AsyncState:
+    """Async clients and host semaphores bound to one event loop."""
+
+    def __init__(self):
+        self.clients: Dict[bool, Any] = {}
+        self.host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+class HttpClient:
+    """
+    A pooled HTTP client with retries, per-host limits and optional DNS caching.
+
+    The sync face wraps a ``requests.Session`` and returns
+    ``requests.Response`` objects. The async face wraps an
+    ``httpx.AsyncClient`` (requires ``httpx``; HTTP/2 additionally requires
+    ``h2``) and returns ``httpx.Response`` objects.
+
+    With ``dns_cache_ttl > 0``, the sync face resolves each host once per
+    TTL and reuses the addresses for new connections; the cache belongs to
+    this client and leaves ``socket.getaddrinfo`` untouched.
+
+    Async clients are bound to the event loop they were created on. Close
+    them with ``aclose()`` (or ``aclose_http_clients()``) on that loop
+    before it finishes.
+
+    Instances are thread-safe and meant to be shared.
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff_factor: float = 0.3,
+        timeout: float = 30,
+        headers: Optional[Dict[str, str]] = None,
+        config: Optional[HttpClientConfig] = None,
+    ):
+        self.config = config or HttpClientConfig(
+            retries=retries,
+            backoff_factor=backoff_factor,
+            timeout=timeout,
+            headers=dict(headers or {}),
+        )
+        self.timeout = self.config.timeout
+        self.headers = dict(self.config.headers)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+        retry_strategy = Retry(
+            total=self.config.retries,
+            backoff_factor=self.config.backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Hand the last response back so callers can inspect the status
+            raise_on_status=False,
+        )
+        adapter_options = dict(
+            pool_connections=self.config.max_hosts,
+            pool_maxsize=self.config.max_connections_per_host,
+            max_retries=retry_strategy,
+        )
+        self.dns_cache: Optional[_DnsCache] = None
+        if self.config.dns_cache_ttl > 0:
+            self.dns_cache = _DnsCache(self.config.dns_cache_ttl, self.config.dns_cache_size)
+            adapter = _DnsCachingAdapter(self.dns_cache, **adapter_options)
+        else:
+            adapter = HTTPAdapter(**adapter_options)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+
+        # Clients and semaphores cannot be shared across event loops;
+        # an entry goes away with its loop
+        self._async_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncState]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        limit = self.config.max_concurrency_per_host
+        if not limit:
+            yield
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._host_limits.get(host)
+            if semaphore is None:
+                semaphore = self._host_limits[host] = threading.BoundedSemaphore(limit)
+        with semaphore:
+            yield
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        with self._host_slot(url):
+            return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _async_state(self) -> _AsyncState:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._async_states.get(loop)
+            if state is None:
+                state = self._async_states[loop] = _AsyncState()
+            return state
+
+    def _async_client(self, verify: bool = True) -> Any:
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx package required for async requests: pip install httpx")
+
+        state = self._async_state()
+        client = state.clients.get(verify)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                follow_redirects=True,
+                transport=httpx.AsyncHTTPTransport(
+                    verify=verify,
+                    http2=self.config.http2,
+                    retries=self.config.retries,
+                    limits=httpx.Limits(
+                        max_connections=self.config.max_hosts * self.config.max_connections_per_host,
+                        max_keepalive_connections=self.config.max_connections_per_host * 4,
+                    ),
+                ),
+            )
+            state.clients[verify] = client
+        return client
+
+    async def arequest(self, method: str, url: str, verify: bool = True, **kwargs) -> Any:
+        """
+        Send a request on the async client.
+
+        Transport-level failures are retried by httpx; unlike the sync
+        face, status codes such as 429/503 are returned to the caller.
+        """
+        client = self._async_client(verify)
+        limit = self.config.max_concurrency_per_host
+        if not limit:
+            return await client.request(method, url, **kwargs)
+
+        host = urlsplit(url).netloc
+        host_limits = self._async_state().host_limits
+        semaphore = host_limits.get(host)
+        if semaphore is None:
+            semaphore = host_limits[host] = asyncio.Semaphore(limit)
+        async with semaphore:
+            return await client.request(method, url, **kwargs)
+
+    async def aget(self, url: str, **kwargs) -> Any:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> Any:
+        return await self.arequest("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the async clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._async_states.pop(loop, None)
+        if state is not None:
+            for client in state.clients.values():
+                await client.aclose()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, HttpClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(
+    context: Optional["PipelineContext"] = None,
+    **overrides
+) -> HttpClient:
+    """
+    Get the shared HttpClient for a pipeline context.
+
+    Clients are process-wide and keyed by their settings, which come from
+    the ``"http"`` key of the pipeline config plus any overrides. Plugins
+    asking for the same settings therefore share connection pools.
+
+    Args:
+        context: Pipeline context (uses default settings if None)
+        **overrides: HttpClientConfig fields to override
+    """
+    settings: Dict[str, Any] = {}
+    if context is not None:
+        settings.update(context.config.get("http") or {})
+    settings.update(overrides)
+
+    config = HttpClientConfig(**settings)
+    key = json.dumps(asdict(config), sort_keys=True)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = HttpClient(config=config)
+        return client
+
+
+def close_http_clients() -> None:
+    """Close all shared clients (sync sessions only; see ``aclose_http_clients``)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_http_clients() -> None:
+    """Close the async clients that shared clients opened on the running event loop."""
+    with _clients_lock:
+        clients = list(_clients.values())
+    for client in clients:
+        await client.aclose()
+
+
+__all__ = [
+    "HttpClientConfig",
+    "HttpClient",
+    "get_http_client",
+    "close_http_clients",
+    "aclose_http_clients",
+]
@@ -3,19 +3,51 @@ from .base import (
     ModelConfig,
     BUILTIN_MODELS,
     LLMProvider,
+    LLMStream,
+    AsyncLLMStream,
     OpenAICompatibleProvider,
+    request_key,
     ResponseCache,
+    CacheBackend,
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
     LLMRouter,
     get_default_router,
 )
+from .ratelimit import TokenBucket, AdaptiveConcurrencyLimit, ModelRateLimiter, get_rate_limiter
+from .singleflight import SingleFlight
+from .routing import LatencyTracker, ModelStats, routing_score
+from .tokenizer import Tokenizer, get_tokenizer, input_budget, fit_to_budget
+from .batch_job import BatchJobProvider, BatchJobError, offline_batch_options
 
 __all__ = [
     "LLMResponse",
     "ModelConfig",
     "BUILTIN_MODELS",
     "LLMProvider",
+    "LLMStream",
+    "AsyncLLMStream",
     "OpenAICompatibleProvider",
+    "request_key",
     "ResponseCache",
+    "SingleFlight",
+    "LatencyTracker",
+    "ModelStats",
+    "routing_score",
+    "TokenBucket",
+    "AdaptiveConcurrencyLimit",
+    "ModelRateLimiter",
+    "get_rate_limiter",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "Tokenizer",
+    "get_tokenizer",
+    "input_budget",
+    "fit_to_budget",
+    "BatchJobProvider",
+    "BatchJobError",
+    "offline_batch_options",
     "LLMRouter",
     "get_default_router",
 ]
@@ -12,14 +12,32 @@ with built-in support for:
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import hashlib
 import json
 import logging
 import os
+import threading
 import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Union
+from dataclasses import asdict, dataclass
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union,
+)
+
+from webis.core.llm.batcher import BatchProcessor, pack_prompt, plan_batches, unpack_response
+from webis.core.llm.cache import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+from webis.core.llm.ratelimit import get_rate_limiter, is_overload_error
+from webis.core.llm.routing import LatencyTracker, routing_score
+from webis.core.llm.singleflight import SingleFlight
+from webis.core.llm.tokenizer import get_tokenizer
+
+if TYPE_CHECKING:
+    from webis.core.llm.batch_job import BatchJobProvider
+    from webis.core.utils.checkpoint import CheckpointManager
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +60,10 @@ class LLMResponse:
     # Timing
     latency_ms: float = 0.0
     
+    # Streaming metrics: time to first token and decode speed
+    ttft_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    
     # Raw response for debugging
     raw: Optional[Dict[str, Any]] = None
     
@@ -73,6 +95,11 @@ class ModelConfig:
     supports_json_mode: bool = False
     supports_vision: bool = False
     context_window: int = 4096
+    
+    # Client-side rate limits (None = unlimited)
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+    max_concurrency: Optional[int] = None  # Upper bound for adaptive concurrency
 
 
 # Pre-configured models
@@ -137,6 +164,86 @@ BUILTIN_MODELS: Dict[str, ModelConfig] = {
 }
 
 
+class LLMStream:
+    """
+    Iterator over the content deltas of a streamed chat call.
+    
+    Once the stream is exhausted, ``response`` holds the complete
+    LLMResponse, including ``ttft_ms`` and ``tokens_per_second``.
+    
+    Example:
+        >>> stream = router.stream(messages)
+        >>> for delta in stream:
+        ...     print(delta, end="", flush=True)
+        >>> stream.response.ttft_ms
+    """
+    
+    def __init__(self, source: Iterator[Union[str, LLMResponse]]):
+        self._source = source
+        self.response: Optional[LLMResponse] = None
+    
+    def __iter__(self) -> Iterator[str]:
+        for item in self._source:
+            if isinstance(item, LLMResponse):
+                self.response = item
+            else:
+                yield item
+    
+    def read(self) -> LLMResponse:
+        """Consume the rest of the stream and return the complete response."""
+        for _ in self:
+            pass
+        return self.response
+    
+    def close(self) -> None:
+        """Abandon the stream, releasing the upstream connection."""
+        close = getattr(self._source, "close", None)
+        if close:
+            close()
+
+
+class AsyncLLMStream:
+    """Async variant of ``LLMStream``."""
+    
+    def __init__(self, source: AsyncIterator[Union[str, LLMResponse]]):
+        self._source = source
+        self.response: Optional[LLMResponse] = None
+    
+    async def __aiter__(self) -> AsyncIterator[str]:
+        async for item in self._source:
+            if isinstance(item, LLMResponse):
+                self.response = item
+            else:
+                yield item
+    
+    async def read(self) -> LLMResponse:
+        async for _ in self:
+            pass
+        return self.response
+    
+    async def aclose(self) -> None:
+        aclose = getattr(self._source, "aclose", None)
+        if aclose:
+            await aclose()
+
+
+def _set_stream_metrics(
+    response: LLMResponse,
+    start_time: float,
+    first_token_time: Optional[float],
+    end_time: float,
+) -> LLMResponse:
+    """Fill in latency, TTFT and decode speed of a streamed response."""
+    first_token_time = first_token_time or end_time
+    response.latency_ms = (end_time - start_time) * 1000
+    response.ttft_ms = (first_token_time - start_time) * 1000
+    # Decode speed after the first token; whole-call speed if it arrived at once
+    window = end_time - first_token_time if end_time > first_token_time else end_time - start_time
+    if window > 0 and response.completion_tokens:
+        response.tokens_per_second = response.completion_tokens / window
+    return response
+
+
 class LLMProvider(ABC):
     """Base class for LLM providers."""
     
@@ -149,41 +256,162 @@ class LLMProvider(ABC):
     ) -> LLMResponse:
         """Send a chat completion request."""
         raise NotImplementedError
-
-
-class OpenAICompatibleProvider(LLMProvider):
-    """Provider for OpenAI-compatible APIs (OpenAI, SiliconFlow, etc.)."""
     
-    def chat(
+    async def achat(
         self,
         messages: List[Dict[str, str]],
         model_config: ModelConfig,
         **kwargs
     ) -> LLMResponse:
-        try:
-            from openai import OpenAI
-        except ImportError:
-            raise ImportError("openai package required: pip install openai")
+        """
+        Async variant of ``chat``.
+        
+        The default runs ``chat`` in a worker thread; providers with a
+        native async client should override it.
+        """
+        return await asyncio.to_thread(self.chat, messages, model_config, **kwargs)
+    
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> Iterator[Union[str, LLMResponse]]:
+        """
+        Stream a chat completion.
         
+        Yields content deltas, then one final LLMResponse with the full
+        content, usage and streaming metrics. The default makes a blocking
+        call and yields it as a single delta; providers that can stream
+        should override it.
+        """
+        start_time = time.time()
+        response = self.chat(messages, model_config, **kwargs)
+        _set_stream_metrics(response, start_time, None, time.time())
+        if response.content:
+            yield response.content
+        yield response
+    
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> AsyncIterator[Union[str, LLMResponse]]:
+        """Async variant of ``stream``."""
+        start_time = time.time()
+        response = await self.achat(messages, model_config, **kwargs)
+        _set_stream_metrics(response, start_time, None, time.time())
+        if response.content:
+            yield response.content
+        yield response
+    
+    async def aclose(self) -> None:
+        """Release async resources bound to the running event loop."""
+
+
+class _StreamAccumulator:
+    """Collects the chunks of a streamed OpenAI-style completion."""
+    
+    def __init__(self):
+        self.start_time = time.time()
+        self.first_token_time: Optional[float] = None
+        self.parts: List[str] = []
+        self.usage: Any = None
+    
+    def add(self, chunk: Any) -> str:
+        """Record a chunk and return its content delta."""
+        if getattr(chunk, "usage", None):
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return ""
+        delta = chunk.choices[0].delta.content or ""
+        if delta:
+            if self.first_token_time is None:
+                self.first_token_time = time.time()
+            self.parts.append(delta)
+        return delta
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """
+    Provider for OpenAI-compatible APIs (OpenAI, SiliconFlow, etc.).
+    
+    Clients are pooled per ``(base_url, api_key)`` and shared by all
+    provider instances, so calls reuse the client's keep-alive
+    connections. Async clients are additionally pooled per event loop.
+    
+    Args:
+        keep_raw: Retain the full provider payload in ``LLMResponse.raw``
+    """
+    
+    _clients: Dict[Tuple[Optional[str], str], Any] = {}
+    _async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+    _clients_lock = threading.Lock()
+    
+    def __init__(self, keep_raw: bool = True):
+        self.keep_raw = keep_raw
+    
+    @staticmethod
+    def _api_key(model_config: ModelConfig) -> str:
         api_key = os.getenv(model_config.api_key_env)
         if not api_key:
             raise ValueError(f"Missing API key: {model_config.api_key_env}")
+        return api_key
+    
+    def get_client(self, model_config: ModelConfig) -> Any:
+        """Get the pooled sync client for a model's endpoint."""
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("openai package required: pip install openai")
         
-        client = OpenAI(
-            api_key=api_key,
-            base_url=model_config.base_url,
-        )
-        
-        start_time = time.time()
+        key = (model_config.base_url, self._api_key(model_config))
+        with self._clients_lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = OpenAI(api_key=key[1], base_url=key[0])
+        return client
+    
+    def get_async_client(self, model_config: ModelConfig) -> Any:
+        """Get the pooled async client for a model's endpoint on the running loop."""
+        try:
+            from openai import AsyncOpenAI
+        except ImportError:
+            raise ImportError("openai package required: pip install openai")
         
-        response = client.chat.completions.create(
+        key = (model_config.base_url, self._api_key(model_config))
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = AsyncOpenAI(api_key=key[1], base_url=key[0])
+        return client
+    
+    async def aclose(self) -> None:
+        """Close the pooled async clients of the running loop (shared by all instances)."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            await client.close()
+    
+    def _request_params(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        return dict(
             model=model_config.name,
             messages=messages,
             temperature=kwargs.get("temperature", model_config.temperature),
             max_tokens=kwargs.get("max_tokens", model_config.max_tokens),
             top_p=kwargs.get("top_p", model_config.top_p),
         )
-        
+    
+    def _build_response(self, response: Any, model_config: ModelConfig, start_time: float) -> LLMResponse:
         latency = (time.time() - start_time) * 1000
         
         usage = response.usage
@@ -196,6 +424,10 @@ class OpenAICompatibleProvider(LLMProvider):
             (completion_tokens / 1_000_000) * model_config.cost_per_1m_output
         )
         
+        raw = None
+        if self.keep_raw and hasattr(response, "model_dump"):
+            raw = response.model_dump()
+        
         return LLMResponse(
             content=response.choices[0].message.content or "",
             model=model_config.name,
@@ -204,45 +436,211 @@ class OpenAICompatibleProvider(LLMProvider):
             total_tokens=prompt_tokens + completion_tokens,
             cost=cost,
             latency_ms=latency,
-            raw=response.model_dump() if hasattr(response, "model_dump") else None,
+            raw=raw,
+        )
+    
+    def _build_stream_response(
+        self,
+        stream: _StreamAccumulator,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+    ) -> LLMResponse:
+        content = "".join(stream.parts)
+        if stream.usage:
+            prompt_tokens = stream.usage.prompt_tokens
+            completion_tokens = stream.usage.completion_tokens
+        else:
+            # Endpoint ignored include_usage; count locally
+            tokenizer = get_tokenizer(model_config)
+            prompt_tokens = sum(tokenizer.count_batch([str(m.get("content") or "") for m in messages]))
+            completion_tokens = tokenizer.count(content)
+        
+        response = LLMResponse(
+            content=content,
+            model=model_config.name,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cost=(
+                (prompt_tokens / 1_000_000) * model_config.cost_per_1m_input +
+                (completion_tokens / 1_000_000) * model_config.cost_per_1m_output
+            ),
+        )
+        return _set_stream_metrics(response, stream.start_time, stream.first_token_time, time.time())
+    
+    def _stream_params(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        return dict(
+            **self._request_params(messages, model_config, kwargs),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+    
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> LLMResponse:
+        client = self.get_client(model_config)
+        
+        start_time = time.time()
+        response = client.chat.completions.create(
+            **self._request_params(messages, model_config, kwargs)
+        )
+        return self._build_response(response, model_config, start_time)
+    
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> LLMResponse:
+        client = self.get_async_client(model_config)
+        
+        start_time = time.time()
+        response = await client.chat.completions.create(
+            **self._request_params(messages, model_config, kwargs)
         )
+        return self._build_response(response, model_config, start_time)
+    
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> Iterator[Union[str, LLMResponse]]:
+        client = self.get_client(model_config)
+        
+        state = _StreamAccumulator()
+        chunks = client.chat.completions.create(**self._stream_params(messages, model_config, kwargs))
+        try:
+            for chunk in chunks:
+                delta = state.add(chunk)
+                if delta:
+                    yield delta
+        finally:
+            chunks.close()
+        yield self._build_stream_response(state, messages, model_config)
+    
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> AsyncIterator[Union[str, LLMResponse]]:
+        client = self.get_async_client(model_config)
+        
+        state = _StreamAccumulator()
+        chunks = await client.chat.completions.create(**self._stream_params(messages, model_config, kwargs))
+        try:
+            async for chunk in chunks:
+                delta = state.add(chunk)
+                if delta:
+                    yield delta
+        finally:
+            await chunks.close()
+        yield self._build_stream_response(state, messages, model_config)
+
+
+def request_key(messages: List[Dict[str, str]], model: str, params: Dict[str, Any]) -> str:
+    """Full SHA-256 identity of a chat request."""
+    content = json.dumps(
+        {"messages": messages, "model": model, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
 
 
 class ResponseCache:
-    """Simple in-memory cache for LLM responses."""
+    """
+    Cache for LLM responses.
+    
+    Keys are full SHA-256 hashes over the messages, model and every
+    generation parameter, so calls that differ in e.g. temperature never
+    share an entry. Responses are stored serialized; each hit returns a
+    fresh LLMResponse with ``cached=True``.
+    
+    Args:
+        max_size: Entry limit of the default in-memory backend
+        ttl: Entry lifetime in seconds for the default backend
+        max_bytes: Size limit of the default backend
+        backend: Storage backend (defaults to an in-memory LRU)
+    """
     
-    def __init__(self, max_size: int = 1000):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
         self.max_size = max_size
-        self._cache: Dict[str, LLMResponse] = {}
+        if backend is None:
+            backend = MemoryCacheBackend(max_entries=max_size, max_bytes=max_bytes, ttl=ttl)
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
     
-    def _hash_key(self, messages: List[Dict[str, str]], model: str) -> str:
-        content = json.dumps({"messages": messages, "model": model}, sort_keys=True)
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+    def _hash_key(self, messages: List[Dict[str, str]], model: str, **params) -> str:
+        return request_key(messages, model, params)
     
-    def get(self, messages: List[Dict[str, str]], model: str) -> Optional[LLMResponse]:
-        key = self._hash_key(messages, model)
-        response = self._cache.get(key)
-        if response:
-            response.cached = True
-        return response
+    def get(self, messages: List[Dict[str, str]], model: str, **params) -> Optional[LLMResponse]:
+        return self.lookup(self._hash_key(messages, model, **params))
+    
+    def set(self, messages: List[Dict[str, str]], model: str, response: LLMResponse, **params) -> None:
+        self.store(self._hash_key(messages, model, **params), response)
     
-    def set(self, messages: List[Dict[str, str]], model: str, response: LLMResponse) -> None:
-        if len(self._cache) >= self.max_size:
-            # Remove oldest entry (simple FIFO)
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
+    def lookup(self, key: str, record: bool = True) -> Optional[LLMResponse]:
+        """Get a response by its ``request_key`` (``record=False`` skips hit/miss counting)."""
+        value = self.backend.get(key)
+        if record:
+            with self._lock:
+                if value is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+        if value is None:
+            return None
         
-        key = self._hash_key(messages, model)
-        self._cache[key] = response
+        response = LLMResponse(**json.loads(value))
+        response.cached = True
+        return response
+    
+    def store(self, key: str, response: LLMResponse) -> None:
+        """Store a response under its ``request_key``."""
+        value = json.dumps(asdict(response), default=str).encode()
+        self.backend.set(key, value)
     
     def clear(self) -> None:
-        self._cache.clear()
+        self.backend.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus backend size and eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.backend.stats(),
+        }
 
 
 class LLMRouter:
     """
     Intelligent LLM router with fallback support.
     
+    Concurrent cacheable calls with identical requests are coalesced:
+    only the first is sent upstream and the others share its response.
+    If the cache backend coalesces across processes, callers in other
+    processes wait for it too.
+    
     Example:
         >>> router = LLMRouter()
         >>> router.add_model("deepseek-v3", primary=True)
@@ -250,18 +648,60 @@ class LLMRouter:
         >>> response = router.chat([{"role": "user", "content": "Hello"}])
     """
     
-    def __init__(self, enable_cache: bool = True):
+    # Seconds between cache checks while another process owns a request
+    coalesce_poll_interval: float = 0.05
+    
+    # Retries of a throttled (429/5xx) call on the same model before falling back
+    overload_retries: int = 3
+    overload_backoff: float = 1.0
+    
+    # Micro-batching defaults (see enable_batching)
+    batch_size: int = 16
+    batch_linger_ms: int = 50
+    max_batch_tokens: Optional[int] = None
+    
+    # Hedging defaults (see enable_hedging)
+    hedge_delay_ms: Optional[float] = None
+    hedge_min_samples: int = 20
+    hedge_max_workers: int = 32
+    
+    def __init__(
+        self,
+        enable_cache: bool = True,
+        cache: Optional[ResponseCache] = None,
+        keep_raw: bool = True,
+        coalesce: bool = True,
+    ):
         self._models: Dict[str, ModelConfig] = {}
         self._primary_model: Optional[str] = None
         self._fallback_chain: List[str] = []
         
+        openai_compatible = OpenAICompatibleProvider(keep_raw=keep_raw)
         self._providers: Dict[str, LLMProvider] = {
-            "openai": OpenAICompatibleProvider(),
-            "siliconflow": OpenAICompatibleProvider(),
-            "deepseek": OpenAICompatibleProvider(),
+            "openai": openai_compatible,
+            "siliconflow": openai_compatible,
+            "deepseek": openai_compatible,
         }
         
-        self._cache = ResponseCache() if enable_cache else None
+        if cache is not None:
+            self._cache = cache
+        else:
+            self._cache = ResponseCache() if enable_cache else None
+        
+        self.coalesce = coalesce
+        self._flights = SingleFlight()
+        
+        self.batching = False
+        self._batchers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        
+        # Latency-aware routing
+        self.latency = LatencyTracker()
+        self.hedging = False
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_pool_lock = threading.Lock()
+        self.routing_objective: Optional[Tuple[float, float]] = None
         
         # Usage tracking
         self.total_tokens = 0
@@ -297,6 +737,13 @@ class LLMRouter:
         
         return self
     
+    def get_model_config(self, model: Optional[str] = None) -> ModelConfig:
+        """Get the configuration of a model (the primary model if not specified)."""
+        model_name = model or self._primary_model
+        if model_name not in self._models:
+            raise ValueError(f"Unknown model: {model_name}")
+        return self._models[model_name]
+    
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -313,21 +760,962 @@ class LLMRouter:
             use_cache: Whether to use response cache
             **kwargs: Additional parameters for the model
         """
+        model_name, key, cached = self._start_call(messages, model, use_cache, kwargs)
+        if cached:
+            return cached
+        
+        def call() -> LLMResponse:
+            return self._chat_upstream(messages, model_name, use_cache, kwargs)
+        
+        if not (use_cache and self.coalesce):
+            return call()
+        response, shared = self._flights.do(key, lambda: self._lead(key, call))
+        return self._shared_copy(response) if shared else response
+    
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> LLMResponse:
+        """Async variant of ``chat`` using the providers' async clients."""
+        model_name, key, cached = self._start_call(messages, model, use_cache, kwargs)
+        if cached:
+            return cached
+        
+        async def call() -> LLMResponse:
+            return await self._achat_upstream(messages, model_name, use_cache, kwargs)
+        
+        if not (use_cache and self.coalesce):
+            return await call()
+        response, shared = await self._flights.ado(key, lambda: self._alead(key, call))
+        return self._shared_copy(response) if shared else response
+    
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> LLMStream:
+        """
+        Stream a chat response as content deltas.
+        
+        Fallback models are tried only until the first token arrives; an
+        error after that is raised to the consumer. A cache hit is
+        replayed as a single delta and a completed stream is cached.
+        Streams are never coalesced.
+        
+        Args:
+            messages: Chat messages
+            model: Specific model to use (uses primary if not specified)
+            use_cache: Whether to use response cache
+            **kwargs: Additional parameters for the model
+        """
+        model_name, key, cached = self._start_call(messages, model, use_cache, kwargs)
+        if cached:
+            return LLMStream(iter([cached.content, cached]))
+        return LLMStream(self._stream_upstream(messages, model_name, use_cache, kwargs))
+    
+    def astream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        **kwargs
+    ) -> AsyncLLMStream:
+        """Async variant of ``stream``."""
+        model_name, key, cached = self._start_call(messages, model, use_cache, kwargs)
+        if cached:
+            return AsyncLLMStream(self._replay(cached))
+        return AsyncLLMStream(self._astream_upstream(messages, model_name, use_cache, kwargs))
+    
+    @staticmethod
+    async def _replay(response: LLMResponse) -> AsyncIterator[Union[str, LLMResponse]]:
+        yield response.content
+        yield response
+    
+    def _chat_upstream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: str,
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        """Try the model, then its fallbacks, hedging slow calls with the next model."""
+        last_error = None
+        candidates = list(self._candidates(model_name))
+        while candidates:
+            candidate = candidates.pop(0)
+            try_model, config, provider = candidate
+            delay = self._hedge_delay(try_model) if candidates else None
+            try:
+                if delay is None:
+                    response = self._timed_call(candidate, messages, kwargs)
+                else:
+                    try_model, response = self._hedged_call(
+                        candidate, candidates.pop(0), delay, messages, kwargs
+                    )
+                self._finish_call(messages, try_model, response, use_cache, kwargs, model_name)
+                return response
+                
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Model {try_model} failed: {e}")
+                continue
+        
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+    
+    async def _achat_upstream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: str,
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        last_error = None
+        candidates = list(self._candidates(model_name))
+        while candidates:
+            candidate = candidates.pop(0)
+            try_model, config, provider = candidate
+            delay = self._hedge_delay(try_model) if candidates else None
+            try:
+                if delay is None:
+                    response = await self._atimed_call(candidate, messages, kwargs)
+                else:
+                    try_model, response = await self._ahedged_call(
+                        candidate, candidates.pop(0), delay, messages, kwargs
+                    )
+                self._finish_call(messages, try_model, response, use_cache, kwargs, model_name)
+                return response
+                
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Model {try_model} failed: {e}")
+                continue
+        
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+    
+    def _stream_upstream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: str,
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> Iterator[Union[str, LLMResponse]]:
+        """Stream from the model, failing over to fallbacks before the first token."""
+        last_error = None
+        for try_model, config, provider in self._candidates(model_name):
+            started = False
+            try:
+                for item in self._stream_model(provider, messages, config, kwargs):
+                    if isinstance(item, LLMResponse):
+                        self._finish_call(messages, try_model, item, use_cache, kwargs, model_name)
+                    started = True
+                    yield item
+                return
+                
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"Model {try_model} failed: {e}")
+                continue
+        
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+    
+    async def _astream_upstream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: str,
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> AsyncIterator[Union[str, LLMResponse]]:
+        last_error = None
+        for try_model, config, provider in self._candidates(model_name):
+            started = False
+            try:
+                async for item in self._astream_model(provider, messages, config, kwargs):
+                    if isinstance(item, LLMResponse):
+                        self._finish_call(messages, try_model, item, use_cache, kwargs, model_name)
+                    started = True
+                    yield item
+                return
+                
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                logger.warning(f"Model {try_model} failed: {e}")
+                continue
+        
+        raise RuntimeError(f"All models failed. Last error: {last_error}")
+    
+    def enable_hedging(
+        self,
+        delay_ms: Optional[float] = None,
+        min_samples: int = 20,
+    ) -> "LLMRouter":
+        """
+        Hedge slow calls with the next model in the fallback chain.
+        
+        Once a call has run longer than its model's rolling p95 latency
+        (or ``delay_ms``), the same request is sent to the next candidate;
+        the first success wins and the other call is cancelled. In sync
+        code a call already in flight cannot be interrupted, so the
+        loser's result is discarded (its usage is still counted).
+        
+        Args:
+            delay_ms: Fixed hedge delay instead of the rolling p95
+            min_samples: Latency samples needed before p95-based hedging
+        
+        Returns:
+            The router, for chaining
+        """
+        self.hedging = True
+        self.hedge_delay_ms = delay_ms
+        self.hedge_min_samples = min_samples
+        return self
+    
+    def set_routing_objective(
+        self,
+        cost_weight: float = 1.0,
+        latency_weight: float = 1.0,
+    ) -> "LLMRouter":
+        """
+        Order the primary and fallback models by a cost/latency score.
+        
+        Calls without an explicit model go to the best-scoring model first
+        (see ``routing_score``); the rest follow in score order.
+        
+        Args:
+            cost_weight: Weight of price (USD per 1M input + output tokens)
+            latency_weight: Weight of rolling p50 latency (seconds)
+        
+        Returns:
+            The router, for chaining
+        """
+        self.routing_objective = (cost_weight, latency_weight)
+        return self
+    
+    def _routing_order(self) -> List[str]:
+        """Primary and fallback models, best first under the routing objective."""
+        names = [self._primary_model] if self._primary_model else []
+        names += [m for m in self._fallback_chain if m not in names]
+        if self.routing_objective is None:
+            return names
+        cost_weight, latency_weight = self.routing_objective
+        return sorted(
+            names,
+            key=lambda name: routing_score(
+                self._models[name], self.latency.get(name), cost_weight, latency_weight
+            ),
+        )
+    
+    def _hedge_delay(self, model_name: str) -> Optional[float]:
+        """Seconds to wait on a model before hedging, or None to not hedge."""
+        if not self.hedging:
+            return None
+        if self.hedge_delay_ms is not None:
+            return self.hedge_delay_ms / 1000
+        stats = self.latency.get(model_name)
+        p95 = stats.p95
+        if stats.samples < self.hedge_min_samples or p95 is None:
+            return None
+        return p95 / 1000
+    
+    def _timed_call(
+        self,
+        candidate: Tuple[str, ModelConfig, LLMProvider],
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        """Call a model and record its latency and outcome."""
+        model_name, config, provider = candidate
+        start = time.monotonic()
+        try:
+            response = self._call_model(provider, messages, config, kwargs)
+        except Exception:
+            self.latency.record(model_name, (time.monotonic() - start) * 1000, ok=False)
+            raise
+        self.latency.record(model_name, (time.monotonic() - start) * 1000)
+        return response
+    
+    async def _atimed_call(
+        self,
+        candidate: Tuple[str, ModelConfig, LLMProvider],
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        model_name, config, provider = candidate
+        start = time.monotonic()
+        try:
+            response = await self._acall_model(provider, messages, config, kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race; not a failure of the model
+            raise
+        except Exception:
+            self.latency.record(model_name, (time.monotonic() - start) * 1000, ok=False)
+            raise
+        self.latency.record(model_name, (time.monotonic() - start) * 1000)
+        return response
+    
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_pool_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=self.hedge_max_workers, thread_name_prefix="webis-hedge"
+                )
+            return self._hedge_pool
+    
+    def _hedged_call(
+        self,
+        primary: Tuple[str, ModelConfig, LLMProvider],
+        hedge: Tuple[str, ModelConfig, LLMProvider],
+        delay: float,
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[str, LLMResponse]:
+        """Race ``primary`` against ``hedge`` started after ``delay`` seconds; first success wins."""
+        executor = self._hedge_executor()
+        names: Dict[Future, str] = {}
+        
+        def start(candidate: Tuple[str, ModelConfig, LLMProvider]) -> Future:
+            future = executor.submit(self._timed_call, candidate, messages, kwargs)
+            names[future] = candidate[0]
+            return future
+        
+        pending = {start(primary)}
+        hedged = False
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=None if hedged else delay, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"Model {primary[0]} slower than {delay:.2f}s, hedging with {hedge[0]}")
+                hedged = True
+                self.hedged_requests += 1
+                pending.add(start(hedge))
+                continue
+            
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Model {names[future]} failed: {e}")
+                    continue
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(self._count_discarded)
+                if names[future] != primary[0]:
+                    self.hedge_wins += 1
+                return names[future], response
+            
+            if not hedged:
+                # The primary failed before the hedge delay: plain fallback
+                hedged = True
+                pending.add(start(hedge))
+        
+        raise last_error
+    
+    async def _ahedged_call(
+        self,
+        primary: Tuple[str, ModelConfig, LLMProvider],
+        hedge: Tuple[str, ModelConfig, LLMProvider],
+        delay: float,
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any],
+    ) -> Tuple[str, LLMResponse]:
+        names: Dict[asyncio.Task, str] = {}
+        
+        def start(candidate: Tuple[str, ModelConfig, LLMProvider]) -> asyncio.Task:
+            task = asyncio.ensure_future(self._atimed_call(candidate, messages, kwargs))
+            names[task] = candidate[0]
+            return task
+        
+        pending = {start(primary)}
+        hedged = False
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=None if hedged else delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"Model {primary[0]} slower than {delay:.2f}s, hedging with {hedge[0]}")
+                    hedged = True
+                    self.hedged_requests += 1
+                    pending.add(start(hedge))
+                    continue
+                
+                for task in done:
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"Model {names[task]} failed: {e}")
+                        continue
+                    if names[task] != primary[0]:
+                        self.hedge_wins += 1
+                    return names[task], response
+                
+                if not hedged:
+                    hedged = True
+                    pending.add(start(hedge))
+        finally:
+            # Cancel the loser (or both, if we were cancelled ourselves)
+            for task in pending:
+                task.cancel()
+        
+        raise last_error
+    
+    def _count_discarded(self, future: Future) -> None:
+        """Account usage of a hedge-race loser that could not be cancelled."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response = future.result()
+        self.total_tokens += response.total_tokens
+        self.total_cost += response.cost
+    
+    def enable_batching(
+        self,
+        batch_size: int = 16,
+        linger_ms: int = 50,
+        max_batch_tokens: Optional[int] = None,
+    ) -> "LLMRouter":
+        """
+        Micro-batch concurrent ``achat_batched`` calls into packed prompts.
+        
+        Args:
+            batch_size: Maximum items per packed call
+            linger_ms: How long a batch waits for more items
+            max_batch_tokens: Input token budget per batch (the model's
+                context window always applies)
+        """
+        self.batching = True
+        self.batch_size = batch_size
+        self.batch_linger_ms = linger_ms
+        self.max_batch_tokens = max_batch_tokens
+        return self
+    
+    def chat_batch(
+        self,
+        instruction: str,
+        items: List[str],
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        output_tokens_per_item: int = 256,
+        ids: Optional[List[str]] = None,
+        job: Optional["BatchJobProvider"] = None,
+        checkpoints: Optional["CheckpointManager"] = None,
+        system: Optional[str] = None,
+        **kwargs
+    ) -> List[Union[LLMResponse, Exception]]:
+        """
+        Apply one instruction to many small inputs using packed prompts.
+        
+        Items are grouped so each call fits the model's context window and
+        output budget, and each call's answer is split back per item. An
+        item missing from a packed answer is retried on its own, so one
+        bad item never fails its neighbours.
+        
+        With ``job`` set, every item is instead sent as its own request in
+        one offline batch job (see ``run_batch_job``).
+        
+        An item sent on its own (a single item, a retry, or a batch-job
+        request) gets the same messages in every path: ``system``, then
+        the instruction followed by the item, answered in at most
+        ``output_tokens_per_item`` tokens unless ``max_tokens`` is given.
+        
+        Args:
+            instruction: Task applied to every item
+            items: Item texts
+            model: Specific model to use (uses primary if not specified)
+            use_cache: Whether to use response cache
+            output_tokens_per_item: Output budget reserved per item
+            ids: Stable item ids for batch jobs (defaults to positions)
+            job: Batch-job provider for offline execution
+            checkpoints: Checkpoint store for resuming batch jobs
+            system: System message sent with every prompt
+            **kwargs: Additional parameters for the model
+        
+        Returns:
+            One LLMResponse (or the Exception that item failed with) per item,
+            in input order
+        """
+        if job is not None:
+            ids = ids or [str(i) for i in range(len(items))]
+            responses = self.run_batch_job(
+                {
+                    item_id: self._single_prompt(instruction, item, system)
+                    for item_id, item in zip(ids, items)
+                },
+                model=model,
+                job=job,
+                checkpoints=checkpoints,
+                **self._single_kwargs(output_tokens_per_item, kwargs)
+            )
+            return [responses[item_id] for item_id in ids]
+        
+        results: List[Union[LLMResponse, Exception, None]] = [None] * len(items)
+        for group in self._plan_batches(items, model, output_tokens_per_item, kwargs):
+            texts = [items[i] for i in group]
+            packed = self._run_packed(instruction, texts, model, use_cache, output_tokens_per_item, kwargs, system)
+            for i, result in zip(group, packed):
+                results[i] = result
+        return results
+    
+    def run_batch_job(
+        self,
+        requests: Dict[str, List[Dict[str, str]]],
+        model: Optional[str] = None,
+        job: Optional["BatchJobProvider"] = None,
+        checkpoints: Optional["CheckpointManager"] = None,
+        **kwargs
+    ) -> Dict[str, Union[LLMResponse, Exception]]:
+        """
+        Run chat requests as one offline batch job.
+        
+        Args:
+            requests: Messages keyed by a stable request id
+            model: Specific model to use (uses primary if not specified)
+            job: Batch-job provider (defaults to one with default settings)
+            checkpoints: Checkpoint store; a rerun with the same requests
+                resumes the submitted job instead of submitting it again
+            **kwargs: Additional parameters for the model
+        
+        Returns:
+            LLMResponse (or the Exception it failed with) keyed by request id
+        """
+        from webis.core.llm.batch_job import BatchJobProvider
+        
+        config = self.get_model_config(model)
+        job = job or BatchJobProvider()
+        results = job.run_job(requests, config, checkpoints=checkpoints, **kwargs)
+        for result in results.values():
+            if isinstance(result, LLMResponse):
+                self.total_tokens += result.total_tokens
+                self.total_cost += result.cost
+        return results
+    
+    async def achat_batch(
+        self,
+        instruction: str,
+        items: List[str],
+        model: Optional[str] = None,
+        use_cache: bool = True,
+        output_tokens_per_item: int = 256,
+        system: Optional[str] = None,
+        **kwargs
+    ) -> List[Union[LLMResponse, Exception]]:
+        """Async variant of ``chat_batch``; packed calls run concurrently."""
+        groups = self._plan_batches(items, model, output_tokens_per_item, kwargs)
+        outcomes = await asyncio.gather(*(
+            self._arun_packed(
+                instruction, [items[i] for i in group], model, use_cache, output_tokens_per_item, kwargs, system
+            )
+            for group in groups
+        ))
+        results: List[Union[LLMResponse, Exception, None]] = [None] * len(items)
+        for group, group_results in zip(groups, outcomes):
+            for i, result in zip(group, group_results):
+                results[i] = result
+        return results
+    
+    async def achat_batched(
+        self,
+        instruction: str,
+        item: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Run one item, transparently micro-batched with concurrent callers.
+        
+        Calls sharing the instruction, model and parameters that arrive
+        within the linger window are packed together (see
+        ``enable_batching``). Without batching enabled this is a single
+        call. Raises the item's own error if it fails.
+        """
+        if not self.batching:
+            result = (await self.achat_batch(instruction, [item], model=model, system=system, **kwargs))[0]
+        else:
+            loop = asyncio.get_running_loop()
+            batchers = self._batchers.setdefault(loop, {})
+            key = request_key(
+                [{"role": "system", "content": system or ""}, {"role": "user", "content": instruction}],
+                model or "", kwargs,
+            )
+            batcher = batchers.get(key)
+            if batcher is None:
+                batcher = batchers[key] = BatchProcessor(
+                    lambda batch: self.achat_batch(instruction, batch, model=model, system=system, **kwargs),
+                    batch_size=self.batch_size,
+                    linger_ms=self.batch_linger_ms,
+                    max_batch_tokens=self._max_batch_input_tokens(
+                        model, kwargs, kwargs.get("output_tokens_per_item", 256)
+                    ),
+                )
+            result = await batcher.submit(item)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def _max_batch_input_tokens(
+        self,
+        model: Optional[str],
+        kwargs: Dict[str, Any],
+        output_tokens_per_item: int = 256,
+    ) -> int:
+        config = self._models.get(model or self._primary_model or "")
+        budget = 4096
+        if config:
+            # Keep room for the packed completion (as requested by
+            # _packed_kwargs for a full group) and the packing prompt itself
+            max_output = kwargs.get("max_tokens", config.max_tokens)
+            count = max(1, min(self.batch_size, max_output // max(1, output_tokens_per_item)))
+            budget = config.context_window - (count * output_tokens_per_item + 64) - 256
+        if self.max_batch_tokens:
+            budget = min(budget, self.max_batch_tokens)
+        if budget < 256:
+            logger.warning(
+                f"Batch input budget of {model or self._primary_model} is {budget} tokens; "
+                f"using 256 (lower batch_size or output_tokens_per_item)"
+            )
+            return 256
+        return budget
+    
+    def _plan_batches(
+        self,
+        items: List[str],
+        model: Optional[str],
+        output_tokens_per_item: int,
+        kwargs: Dict[str, Any],
+    ) -> List[List[int]]:
+        config = self._models.get(model or self._primary_model or "")
+        return plan_batches(
+            items,
+            max_items=self.batch_size,
+            max_prompt_tokens=self._max_batch_input_tokens(model, kwargs, output_tokens_per_item),
+            max_output_tokens=kwargs.get("max_tokens", config.max_tokens if config else 4096),
+            output_tokens_per_item=output_tokens_per_item,
+            tokenizer=get_tokenizer(config),
+        )
+    
+    @staticmethod
+    def _single_prompt(instruction: str, item: str, system: Optional[str] = None) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": f"{instruction}\n\n{item}"})
+        return messages
+    
+    @staticmethod
+    def _single_kwargs(output_tokens_per_item: int, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"max_tokens": output_tokens_per_item, **kwargs}
+    
+    @staticmethod
+    def _packed_kwargs(count: int, output_tokens_per_item: int, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        packed = dict(kwargs)
+        packed["max_tokens"] = count * output_tokens_per_item + 64
+        return packed
+    
+    @staticmethod
+    def _split_response(response: LLMResponse, content: str, count: int) -> LLMResponse:
+        """One item's share of a packed response."""
+        return LLMResponse(
+            content=content,
+            model=response.model,
+            prompt_tokens=response.prompt_tokens // count,
+            completion_tokens=response.completion_tokens // count,
+            total_tokens=response.total_tokens // count,
+            cost=response.cost / count,
+            latency_ms=response.latency_ms,
+            cached=response.cached,
+        )
+    
+    def _run_packed(
+        self,
+        instruction: str,
+        texts: List[str],
+        model: Optional[str],
+        use_cache: bool,
+        output_tokens_per_item: int,
+        kwargs: Dict[str, Any],
+        system: Optional[str] = None,
+    ) -> List[Union[LLMResponse, Exception]]:
+        outputs: Dict[int, str] = {}
+        response = None
+        if len(texts) > 1:
+            try:
+                response = self.chat(
+                    pack_prompt(instruction, texts, system), model=model, use_cache=use_cache,
+                    **self._packed_kwargs(len(texts), output_tokens_per_item, kwargs)
+                )
+                outputs = unpack_response(response.content, len(texts))
+            except Exception as e:
+                logger.warning(f"Packed call for {len(texts)} items failed, running them one by one: {e}")
+        
+        results: List[Union[LLMResponse, Exception]] = []
+        for i, text in enumerate(texts):
+            if i in outputs:
+                results.append(self._split_response(response, outputs[i], len(texts)))
+                continue
+            try:
+                results.append(self.chat(
+                    self._single_prompt(instruction, text, system), model=model, use_cache=use_cache,
+                    **self._single_kwargs(output_tokens_per_item, kwargs)
+                ))
+            except Exception as e:
+                results.append(e)
+        return results
+    
+    async def _arun_packed(
+        self,
+        instruction: str,
+        texts: List[str],
+        model: Optional[str],
+        use_cache: bool,
+        output_tokens_per_item: int,
+        kwargs: Dict[str, Any],
+        system: Optional[str] = None,
+    ) -> List[Union[LLMResponse, Exception]]:
+        outputs: Dict[int, str] = {}
+        response = None
+        if len(texts) > 1:
+            try:
+                response = await self.achat(
+                    pack_prompt(instruction, texts, system), model=model, use_cache=use_cache,
+                    **self._packed_kwargs(len(texts), output_tokens_per_item, kwargs)
+                )
+                outputs = unpack_response(response.content, len(texts))
+            except Exception as e:
+                logger.warning(f"Packed call for {len(texts)} items failed, running them one by one: {e}")
+        
+        missing = [i for i in range(len(texts)) if i not in outputs]
+        singles = await asyncio.gather(
+            *(
+                self.achat(
+                    self._single_prompt(instruction, texts[i], system), model=model, use_cache=use_cache,
+                    **self._single_kwargs(output_tokens_per_item, kwargs)
+                )
+                for i in missing
+            ),
+            return_exceptions=True,
+        )
+        retried = dict(zip(missing, singles))
+        return [
+            self._split_response(response, outputs[i], len(texts)) if i in outputs else retried[i]
+            for i in range(len(texts))
+        ]
+    
+    def _call_model(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict[str, str]],
+        config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        """Call one model within its rate limits, retrying while it is throttled."""
+        limiter = get_rate_limiter(config)
+        if limiter is None:
+            return provider.chat(messages, config, **kwargs)
+        
+        estimate = self._estimate_tokens(messages, config, kwargs)
+        for attempt in range(self.overload_retries + 1):
+            try:
+                with limiter.slot(estimate) as slot:
+                    response = provider.chat(messages, config, **kwargs)
+                    slot.used_tokens = response.total_tokens
+            except Exception as e:
+                if not is_overload_error(e) or attempt == self.overload_retries:
+                    raise
+                limiter.on_overload()
+                logger.info(f"Model {config.name} throttled, retrying: {e}")
+                time.sleep(self.overload_backoff * 2 ** attempt)
+                continue
+            limiter.on_success()
+            return response
+    
+    async def _acall_model(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict[str, str]],
+        config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> LLMResponse:
+        limiter = get_rate_limiter(config)
+        if limiter is None:
+            return await provider.achat(messages, config, **kwargs)
+        
+        estimate = self._estimate_tokens(messages, config, kwargs)
+        for attempt in range(self.overload_retries + 1):
+            try:
+                async with limiter.aslot(estimate) as slot:
+                    response = await provider.achat(messages, config, **kwargs)
+                    slot.used_tokens = response.total_tokens
+            except Exception as e:
+                if not is_overload_error(e) or attempt == self.overload_retries:
+                    raise
+                limiter.on_overload()
+                logger.info(f"Model {config.name} throttled, retrying: {e}")
+                await asyncio.sleep(self.overload_backoff * 2 ** attempt)
+                continue
+            limiter.on_success()
+            return response
+    
+    def _stream_model(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict[str, str]],
+        config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> Iterator[Union[str, LLMResponse]]:
+        """Stream from one model within its rate limits, retrying throttling before the first token."""
+        limiter = get_rate_limiter(config)
+        if limiter is None:
+            yield from provider.stream(messages, config, **kwargs)
+            return
+        
+        estimate = self._estimate_tokens(messages, config, kwargs)
+        for attempt in range(self.overload_retries + 1):
+            started = False
+            try:
+                with limiter.slot(estimate) as slot:
+                    for item in provider.stream(messages, config, **kwargs):
+                        if isinstance(item, LLMResponse):
+                            slot.used_tokens = item.total_tokens
+                        started = True
+                        yield item
+            except Exception as e:
+                if started or not is_overload_error(e) or attempt == self.overload_retries:
+                    raise
+                limiter.on_overload()
+                logger.info(f"Model {config.name} throttled, retrying: {e}")
+                time.sleep(self.overload_backoff * 2 ** attempt)
+                continue
+            limiter.on_success()
+            return
+    
+    async def _astream_model(
+        self,
+        provider: LLMProvider,
+        messages: List[Dict[str, str]],
+        config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> AsyncIterator[Union[str, LLMResponse]]:
+        limiter = get_rate_limiter(config)
+        if limiter is None:
+            async for item in provider.astream(messages, config, **kwargs):
+                yield item
+            return
+        
+        estimate = self._estimate_tokens(messages, config, kwargs)
+        for attempt in range(self.overload_retries + 1):
+            started = False
+            try:
+                async with limiter.aslot(estimate) as slot:
+                    async for item in provider.astream(messages, config, **kwargs):
+                        if isinstance(item, LLMResponse):
+                            slot.used_tokens = item.total_tokens
+                        started = True
+                        yield item
+            except Exception as e:
+                if started or not is_overload_error(e) or attempt == self.overload_retries:
+                    raise
+                limiter.on_overload()
+                logger.info(f"Model {config.name} throttled, retrying: {e}")
+                await asyncio.sleep(self.overload_backoff * 2 ** attempt)
+                continue
+            limiter.on_success()
+            return
+    
+    @staticmethod
+    def _estimate_tokens(
+        messages: List[Dict[str, str]],
+        config: ModelConfig,
+        kwargs: Dict[str, Any],
+    ) -> int:
+        """Upper-bound token cost of a call, for the TPM budget."""
+        counts = get_tokenizer(config).count_batch([str(m.get("content") or "") for m in messages])
+        # ~4 tokens of chat framing per message
+        return sum(counts) + 4 * len(messages) + kwargs.get("max_tokens", config.max_tokens)
+    
+    def _cross_process_backend(self) -> Optional[CacheBackend]:
+        if self._cache and self._cache.backend.coalesces_across_processes:
+            return self._cache.backend
+        return None
+    
+    def _lead(self, key: str, call: Callable[[], LLMResponse]) -> LLMResponse:
+        """Run the in-process leader's call, deferring to another process if it owns the key."""
+        backend = self._cross_process_backend()
+        if backend is None:
+            return call()
+        
+        while not backend.claim(key):
+            cached = self._cache.lookup(key, record=False)
+            if cached:
+                return cached
+            time.sleep(self.coalesce_poll_interval)
+        try:
+            # The previous owner may have finished between our cache miss and the claim
+            return self._cache.lookup(key, record=False) or call()
+        finally:
+            backend.release(key)
+    
+    async def _alead(self, key: str, call: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        backend = self._cross_process_backend()
+        if backend is None:
+            return await call()
+        
+        while not backend.claim(key):
+            cached = self._cache.lookup(key, record=False)
+            if cached:
+                return cached
+            await asyncio.sleep(self.coalesce_poll_interval)
+        try:
+            return self._cache.lookup(key, record=False) or await call()
+        finally:
+            backend.release(key)
+    
+    @staticmethod
+    def _shared_copy(response: LLMResponse) -> LLMResponse:
+        """A follower's view of a coalesced response (usage was paid by the leader)."""
+        shared = copy.copy(response)
+        shared.cached = True
+        return shared
+    
+    def _start_call(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+    ) -> Tuple[str, str, Optional[LLMResponse]]:
+        """Resolve the model name and request key, and check the cache."""
         model_name = model or self._primary_model
         if not model_name:
             raise ValueError("No model specified and no primary model set")
+        if model is None and self.routing_objective is not None:
+            model_name = self._routing_order()[0]
+        key = request_key(messages, model_name, self._cache_params(model_name, kwargs))
         
         # Check cache
         if use_cache and self._cache:
-            cached = self._cache.get(messages, model_name)
+            cached = self._cache.lookup(key)
             if cached:
                 logger.debug(f"Cache hit for {model_name}")
-                return cached
-        
-        # Try primary model, then fallbacks
-        models_to_try = [model_name] + [m for m in self._fallback_chain if m != model_name]
+                return model_name, key, cached
+        return model_name, key, None
+    
+    def _candidates(self, model_name: str) -> Iterator[Tuple[str, ModelConfig, LLMProvider]]:
+        """Yield the requested model, then fallbacks, with their providers."""
+        if self.routing_objective is None:
+            fallbacks = self._fallback_chain
+        else:
+            fallbacks = self._routing_order()
+        models_to_try = [model_name] + [m for m in fallbacks if m != model_name]
         
-        last_error = None
         for try_model in models_to_try:
             config = self._models.get(try_model)
             if not config:
@@ -337,38 +1725,90 @@ class LLMRouter:
             if not provider:
                 logger.warning(f"No provider for {config.provider}")
                 continue
-            
-            try:
-                response = provider.chat(messages, config, **kwargs)
-                
-                # Update tracking
-                self.total_tokens += response.total_tokens
-                self.total_cost += response.cost
-                
-                # Cache the response
-                if use_cache and self._cache:
-                    self._cache.set(messages, try_model, response)
-                
-                return response
-                
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Model {try_model} failed: {e}")
-                continue
+            yield try_model, config, provider
+    
+    def _finish_call(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: str,
+        response: LLMResponse,
+        use_cache: bool,
+        kwargs: Dict[str, Any],
+        requested_model: Optional[str] = None,
+    ) -> None:
+        # Update tracking
+        self.total_tokens += response.total_tokens
+        self.total_cost += response.cost
         
-        raise RuntimeError(f"All models failed. Last error: {last_error}")
+        # Cache the response
+        if use_cache and self._cache:
+            self._cache.set(
+                messages, model_name, response, **self._cache_params(model_name, kwargs)
+            )
+            if requested_model and requested_model != model_name:
+                # A fallback or hedge answered: callers (and other processes
+                # waiting on this request) look it up under the requested model
+                self._cache.set(
+                    messages, requested_model, response, **self._cache_params(requested_model, kwargs)
+                )
+    
+    def _cache_params(self, model_name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Effective generation parameters of a call, for the cache key."""
+        config = self._models.get(model_name)
+        if config is None:
+            return dict(kwargs)
+        return {
+            "model_id": config.name,
+            "base_url": config.base_url,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "top_p": config.top_p,
+            **kwargs,
+        }
     
     def get_usage_stats(self) -> Dict[str, Any]:
         """Get usage statistics."""
-        return {
+        stats = {
             "total_tokens": self.total_tokens,
             "total_cost_usd": round(self.total_cost, 4),
         }
+        if self._cache:
+            stats["cache"] = self._cache.stats()
+        stats["coalesced_requests"] = self._flights.coalesced
+        limits = {}
+        for name, config in self._models.items():
+            limiter = get_rate_limiter(config)
+            if limiter is not None:
+                limits[name] = limiter.stats()
+        if limits:
+            stats["rate_limits"] = limits
+        stats["latency"] = self.latency.stats()
+        stats["hedged_requests"] = self.hedged_requests
+        stats["hedge_wins"] = self.hedge_wins
+        return stats
     
     def reset_stats(self) -> None:
         """Reset usage statistics."""
         self.total_tokens = 0
         self.total_cost = 0.0
+    
+    def close(self) -> None:
+        """Shut down the router's hedging threads."""
+        with self._hedge_pool_lock:
+            pool, self._hedge_pool = self._hedge_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    async def aclose(self) -> None:
+        """
+        Close the router, and the providers' async clients on the running loop.
+        
+        Async clients are pooled per event loop and shared with other
+        routers on it; they are reopened on next use.
+        """
+        self.close()
+        for provider in {id(p): p for p in self._providers.values()}.values():
+            await provider.aclose()
 
 
 # Default router instance
@@ -379,7 +1819,19 @@ def get_default_router() -> LLMRouter:
     """Get the default LLM router with common models configured."""
     global _default_router
     if _default_router is None:
-        _default_router = LLMRouter()
+        cache = None
+        cache_path = os.getenv("WEBIS_LLM_CACHE_PATH")
+        if cache_path:
+            # Shared on-disk cache, e.g. for Celery workers on one node
+            ttl = os.getenv("WEBIS_LLM_CACHE_TTL")
+            cache = ResponseCache(
+                backend=SQLiteCacheBackend(
+                    cache_path,
+                    ttl=float(ttl) if ttl else None,
+                    coalesce_across_processes=True,
+                )
+            )
+        _default_router = LLMRouter(cache=cache)
         _default_router.add_model("deepseek-v3", primary=True)
         _default_router.add_model("gpt-4o-mini", fallback=True)
     return _default_router
@@ -390,8 +1842,14 @@ __all__ = [
     "ModelConfig",
     "BUILTIN_MODELS",
     "LLMProvider",
+    "LLMStream",
+    "AsyncLLMStream",
     "OpenAICompatibleProvider",
+    "request_key",
     "ResponseCache",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
     "LLMRouter",
     "get_default_router",
 ]
@@ -0,0 +1,240 @@
+"""
+Offline batch-job execution for LLM calls.
+
+OpenAI-compatible providers accept a JSONL file of chat requests as one
+asynchronous job, at a discount and with much higher throughput limits.
+``BatchJobProvider`` spools requests to JSONL, submits the job, polls
+it and maps the results back by ``custom_id``. With a
+``CheckpointManager`` an interrupted run resumes polling the job it
+already submitted instead of paying for it twice.
+
+Example:
+    >>> provider = BatchJobProvider()
+    >>> results = provider.run_job(
+    ...     {"doc-1": [{"role": "user", "content": "Summarize: ..."}]},
+    ...     BUILTIN_MODELS["gpt-4o-mini"],
+    ...     checkpoints=CheckpointManager(),
+    ... )
+    >>> results["doc-1"].content
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from webis.core.llm.base import LLMResponse, ModelConfig, OpenAICompatibleProvider
+from webis.core.utils.checkpoint import CheckpointManager
+
+if TYPE_CHECKING:
+    from webis.core.schema import PipelineContext
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses after which polling stops
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchJobError(RuntimeError):
+    """A batch job failed as a whole, or one of its requests failed."""
+
+
+class BatchJobProvider(OpenAICompatibleProvider):
+    """
+    Provider for the OpenAI-compatible batch endpoint.
+
+    Args:
+        keep_raw: Retain the full provider payload in ``LLMResponse.raw``
+        spool_dir: Directory for request JSONL files
+        poll_interval: Seconds between job status checks
+        timeout: Give up waiting after this many seconds (None = wait forever)
+        discount: Price multiplier applied by the provider to batch jobs
+    """
+
+    endpoint = "/v1/chat/completions"
+    completion_window = "24h"
+
+    def __init__(
+        self,
+        keep_raw: bool = True,
+        spool_dir: str = ".webis_batches",
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+        discount: float = 0.5,
+    ):
+        super().__init__(keep_raw=keep_raw)
+        self.spool_dir = spool_dir
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.discount = discount
+
+    def job_key(self, requests: Dict[str, List[Dict[str, str]]], model_config: ModelConfig, **kwargs) -> str:
+        """Deterministic id of a job, used for spool files and checkpoints."""
+        content = json.dumps(
+            {"requests": requests, "model": model_config.name, "base_url": model_config.base_url, "params": kwargs},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+    def spool(
+        self,
+        requests: Dict[str, List[Dict[str, str]]],
+        model_config: ModelConfig,
+        path: str,
+        **kwargs
+    ) -> str:
+        """Write requests as batch-API JSONL; returns the path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for custom_id, messages in requests.items():
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.endpoint,
+                    "body": self._request_params(messages, model_config, kwargs),
+                }, ensure_ascii=False) + "\n")
+        return path
+
+    def submit(self, path: str, model_config: ModelConfig) -> str:
+        """Upload a spooled file and create the job; returns the batch id."""
+        client = self.get_client(model_config)
+        with open(path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+        )
+        logger.info(f"Submitted batch job {batch.id} ({path})")
+        return batch.id
+
+    def wait(self, batch_id: str, model_config: ModelConfig) -> Any:
+        """Poll until the job reaches a terminal status; returns the batch object."""
+        client = self.get_client(model_config)
+        started = time.time()
+        while True:
+            batch = client.batches.retrieve(batch_id)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            if self.timeout is not None and time.time() - started > self.timeout:
+                raise TimeoutError(f"Batch job {batch_id} still {batch.status} after {self.timeout}s")
+            logger.debug(f"Batch job {batch_id} is {batch.status}")
+            time.sleep(self.poll_interval)
+
+    def fetch_results(
+        self,
+        batch: Any,
+        model_config: ModelConfig,
+    ) -> Dict[str, Union[LLMResponse, Exception]]:
+        """Download a finished job's output and error files, keyed by custom id."""
+        if batch.status != "completed":
+            raise BatchJobError(f"Batch job {batch.id} ended with status {batch.status}")
+
+        client = self.get_client(model_config)
+        results: Dict[str, Union[LLMResponse, Exception]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    results[entry["custom_id"]] = self._parse_result(entry, model_config)
+        return results
+
+    def _parse_result(self, entry: Dict[str, Any], model_config: ModelConfig) -> Union[LLMResponse, Exception]:
+        from openai.types.chat import ChatCompletion
+
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code", 200) >= 400:
+            return BatchJobError(f"Request {entry['custom_id']} failed: {entry.get('error') or response.get('body')}")
+
+        completion = ChatCompletion.model_validate(response["body"])
+        result = self._build_response(completion, model_config, time.time())
+        result.latency_ms = 0.0
+        result.cost *= self.discount
+        return result
+
+    def run_job(
+        self,
+        requests: Dict[str, List[Dict[str, str]]],
+        model_config: ModelConfig,
+        checkpoints: Optional[CheckpointManager] = None,
+        **kwargs
+    ) -> Dict[str, Union[LLMResponse, Exception]]:
+        """
+        Spool, submit and wait for a job, then return results by custom id.
+
+        If ``checkpoints`` holds a record of the same job (same requests,
+        model and parameters), its batch id is reused, so a restarted run
+        only resumes polling. Requests missing from the output map to a
+        BatchJobError.
+        """
+        key = self.job_key(requests, model_config, **kwargs)
+        checkpoint_id = f"llm_batch_{key}"
+        state = checkpoints.load_checkpoint(checkpoint_id) if checkpoints else None
+
+        if state and state.get("batch_id"):
+            batch_id = state["batch_id"]
+            logger.info(f"Resuming batch job {batch_id}")
+        else:
+            path = self.spool(requests, model_config, os.path.join(self.spool_dir, f"{key}.jsonl"), **kwargs)
+            batch_id = self.submit(path, model_config)
+            if checkpoints:
+                checkpoints.save_checkpoint(checkpoint_id, {"batch_id": batch_id, "spool": path})
+
+        batch = self.wait(batch_id, model_config)
+        try:
+            results = self.fetch_results(batch, model_config)
+        except BatchJobError:
+            # The job is dead; let the next run submit a fresh one
+            if checkpoints:
+                checkpoints.clear_checkpoint(checkpoint_id)
+            raise
+
+        if checkpoints:
+            checkpoints.clear_checkpoint(checkpoint_id)
+        return {
+            custom_id: results.get(custom_id, BatchJobError(f"No result for request {custom_id}"))
+            for custom_id in requests
+        }
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model_config: ModelConfig,
+        **kwargs
+    ) -> LLMResponse:
+        """Run a single request as its own job (only sensible for testing)."""
+        result = self.run_job({"request-0": messages}, model_config, **kwargs)["request-0"]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def offline_batch_options(context: Optional["PipelineContext"]) -> Dict[str, Any]:
+    """
+    ``chat_batch`` arguments for a pipeline running with ``llm_mode="offline_batch"``.
+
+    Returns an empty dict for interactive runs. Job settings come from the
+    ``"llm_batch"`` config key (``spool_dir``, ``poll_interval``,
+    ``timeout``, ``discount``); job checkpoints go to ``checkpoint_dir``.
+    """
+    if context is None or context.config.get("llm_mode") != "offline_batch":
+        return {}
+    settings = dict(context.config.get("llm_batch") or {})
+    return {
+        "job": BatchJobProvider(**settings),
+        "checkpoints": CheckpointManager(context.config.get("checkpoint_dir", ".checkpoints")),
+    }
+
+
+__all__ = [
+    "BatchJobProvider",
+    "BatchJobError",
+    "offline_batch_options",
+]
@@ -1,24 +1,129 @@
-from typing import List, Callable, Any, Awaitable
+from typing import List, Callable, Any, Awaitable, Dict, Optional, Sequence
 import asyncio
+import json
+import re
 import time
 import logging
 
+from webis.core.llm.tokenizer import Tokenizer, get_tokenizer
+
 logger = logging.getLogger(__name__)
 
+PACKED_SYSTEM_PROMPT = (
+    "You will receive several independent inputs, each with an id. "
+    "Apply the instruction to each input separately. "
+    "Respond with only a JSON array containing one object per input, "
+    'in the form {"id": <input id>, "output": <result for that input>}.'
+)
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of ``text`` for ``model`` (default encoding if None)."""
+    return get_tokenizer(model).count(text)
+
+
+def pack_prompt(instruction: str, items: Sequence[str], system: Optional[str] = None) -> List[Dict[str, str]]:
+    """Build the chat messages for a multi-item prompt (``system`` precedes the packing rules)."""
+    inputs = json.dumps(
+        [{"id": i, "input": item} for i, item in enumerate(items)],
+        ensure_ascii=False,
+        indent=1,
+    )
+    return [
+        {"role": "system", "content": f"{system}\n\n{PACKED_SYSTEM_PROMPT}" if system else PACKED_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Instruction:\n{instruction}\n\nInputs:\n{inputs}"},
+    ]
+
+
+def unpack_response(content: str, count: int) -> Dict[int, str]:
+    """
+    Demultiplex a packed response into ``{item index: output}``.
+
+    Items that are missing or malformed are left out, so the caller can
+    retry them individually. Non-string outputs are returned as JSON.
+    """
+    match = re.search(r"\[.*\]", content, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        entries = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+
+    outputs: Dict[int, str] = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict) or "output" not in entry:
+            continue
+        try:
+            index = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count:
+            output = entry["output"]
+            outputs[index] = output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+    return outputs
+
+
+def plan_batches(
+    items: Sequence[str],
+    max_items: int,
+    max_prompt_tokens: int,
+    max_output_tokens: int,
+    output_tokens_per_item: int,
+    tokenizer: Optional[Tokenizer] = None,
+) -> List[List[int]]:
+    """
+    Split item indices into groups that fit one packed call.
+
+    A group is closed when it reaches ``max_items``, when its inputs
+    would exceed ``max_prompt_tokens``, or when the outputs it reserves
+    would exceed ``max_output_tokens``. Oversized items get a group of
+    their own. Items are measured with ``tokenizer`` (default encoding
+    if None).
+    """
+    max_items = max(1, min(max_items, max_output_tokens // max(1, output_tokens_per_item)))
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    counts = (tokenizer or get_tokenizer()).count_batch(items)
+    for index, item_tokens in enumerate(counts):
+        tokens = item_tokens + 8  # Per-item JSON framing
+        if current and (len(current) >= max_items or current_tokens + tokens > max_prompt_tokens):
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
 class BatchProcessor:
     """
     Accumulates items and processes them in batches to optimize LLM usage.
+    
+    ``processor_func`` returns one result per item; a result that is an
+    Exception fails only that item's future. If ``max_batch_tokens`` is
+    set, a batch is also closed once the summed ``size_func`` of its items
+    would exceed it.
     """
     def __init__(self, 
                  processor_func: Callable[[List[Any]], Awaitable[List[Any]]], 
                  batch_size: int = 10, 
-                 linger_ms: int = 100):
+                 linger_ms: int = 100,
+                 max_batch_tokens: Optional[int] = None,
+                 size_func: Callable[[Any], int] = lambda item: estimate_tokens(str(item))):
         self.processor_func = processor_func
         self.batch_size = batch_size
         self.linger_ms = linger_ms / 1000.0  # Convert to seconds
+        self.max_batch_tokens = max_batch_tokens
+        self.size_func = size_func
         self.queue = asyncio.Queue()
         self._running = False
         self._task = None
+        # An item that did not fit the previous batch opens the next one
+        self._carry = None
+        self._inflight = set()
 
     async def start(self):
         self._running = True
@@ -34,10 +139,37 @@ class BatchProcessor:
                 pass
 
     async def add(self, item: Any) -> asyncio.Future:
-        future = asyncio.Future()
+        if not self._running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
         await self.queue.put((item, future))
         return future
 
+    async def submit(self, item: Any) -> Any:
+        """Add an item and wait for its result."""
+        return await (await self.add(item))
+
+    def _fits(self, batch_tokens: int, item: Any) -> bool:
+        if self.max_batch_tokens is None:
+            return True
+        return batch_tokens + self.size_func(item) <= self.max_batch_tokens
+
+    async def _dispatch(self, batch: List[Any], futures: List[asyncio.Future]) -> None:
+        try:
+            results = await self.processor_func(batch)
+            for i, result in enumerate(results):
+                if futures[i].done():
+                    continue
+                if isinstance(result, Exception):
+                    futures[i].set_exception(result)
+                else:
+                    futures[i].set_result(result)
+        except Exception as e:
+            logger.error(f"Batch processing failed: {e}")
+            for f in futures:
+                if not f.done():
+                    f.set_exception(e)
+
     async def _process_loop(self):
         while self._running:
             batch = []
@@ -45,9 +177,13 @@ class BatchProcessor:
             
             try:
                 # Wait for the first item indefinitely (or until cancelled)
-                item, future = await self.queue.get()
+                if self._carry is not None:
+                    (item, future), self._carry = self._carry, None
+                else:
+                    item, future = await self.queue.get()
                 batch.append(item)
                 futures.append(future)
+                batch_tokens = self.size_func(item) if self.max_batch_tokens else 0
                 
                 # Calculate deadline for the batch
                 deadline = time.time() + self.linger_ms
@@ -60,23 +196,21 @@ class BatchProcessor:
                         
                     try:
                         item, future = await asyncio.wait_for(self.queue.get(), timeout=remaining)
-                        batch.append(item)
-                        futures.append(future)
                     except asyncio.TimeoutError:
                         break
+                    if not self._fits(batch_tokens, item):
+                        self._carry = (item, future)
+                        break
+                    batch.append(item)
+                    futures.append(future)
+                    if self.max_batch_tokens:
+                        batch_tokens += self.size_func(item)
                 
-                # Process the batch
+                # Process the batch without blocking collection of the next one
                 if batch:
-                    try:
-                        results = await self.processor_func(batch)
-                        for i, result in enumerate(results):
-                            if not futures[i].done():
-                                futures[i].set_result(result)
-                    except Exception as e:
-                        logger.error(f"Batch processing failed: {e}")
-                        for f in futures:
-                            if not f.done():
-                                f.set_exception(e)
+                    task = asyncio.create_task(self._dispatch(batch, futures))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
                                 
             except asyncio.CancelledError:
                 break
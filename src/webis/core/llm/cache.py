@@ -0,0 +1,293 @@
+"""
+Storage backends for the LLM response cache.
+
+Backends store opaque serialized values under string keys:
+- MemoryCacheBackend: in-process LRU bounded by entry count and bytes
+- SQLiteCacheBackend: on-disk cache shared by all processes on a node
+
+Both support an optional TTL. Use them through ``ResponseCache``.
+
+Example:
+    >>> cache = ResponseCache(backend=SQLiteCacheBackend("~/.webis/llm_cache.db", ttl=7 * 86400))
+    >>> router = LLMRouter(cache=cache)
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Base class for response cache storage."""
+
+    # Whether claim()/release() coordinate in-flight requests across processes
+    coalesces_across_processes: bool = False
+
+    def __init__(self):
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value, or None if missing or expired."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def claim(self, key: str) -> bool:
+        """Take ownership of an in-flight request; False if another process holds it."""
+        return True
+
+    def release(self, key: str) -> None:
+        """Give up ownership taken with ``claim``."""
+
+    def __len__(self) -> int:
+        return 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU cache.
+
+    Args:
+        max_entries: Maximum number of entries
+        max_bytes: Maximum total size of stored values (None = unbounded)
+        ttl: Entry lifetime in seconds (None = no expiry)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.max_bytes is not None and len(value) > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, value)
+            self.total_bytes += len(value)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.total_bytes -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        stats["bytes"] = self.total_bytes
+        return stats
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite-backed cache that survives restarts.
+
+    The database runs in WAL mode, so any number of worker processes on
+    the same node can read and write it concurrently. Eviction is least
+    recently used once ``max_entries`` is exceeded.
+
+    With ``coalesce_across_processes`` the backend also records which
+    requests are in flight, so identical requests from other processes
+    wait for the first one instead of calling the provider. Ownership is
+    a lease, so a crashed owner blocks others for at most
+    ``inflight_lease`` seconds.
+
+    Args:
+        path: Database file path
+        ttl: Entry lifetime in seconds (None = no expiry)
+        max_entries: Maximum number of rows (None = unbounded)
+        coalesce_across_processes: Coordinate in-flight requests
+        inflight_lease: Seconds an in-flight claim stays valid
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        coalesce_across_processes: bool = False,
+        inflight_lease: float = 120.0,
+    ):
+        super().__init__()
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.coalesces_across_processes = coalesce_across_processes
+        self.inflight_lease = inflight_lease
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_inflight ("
+            " key TEXT PRIMARY KEY,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        now = time.time()
+        with conn:
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return bytes(value)
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            if self.max_entries is not None:
+                cursor = conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+
+    def claim(self, key: str) -> bool:
+        if not self.coalesces_across_processes:
+            return True
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "DELETE FROM llm_inflight WHERE key = ? AND expires_at <= ?", (key, now)
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO llm_inflight (key, expires_at) VALUES (?, ?)",
+                (key, now + self.inflight_lease),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        if not self.coalesces_across_processes:
+            return
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM llm_inflight WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns the number removed."""
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+        removed = max(cursor.rowcount, 0)
+        self.expirations += removed
+        return removed
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+]
@@ -0,0 +1,310 @@
+"""
+Client-side rate limiting for LLM calls.
+
+Each model endpoint gets a ``ModelRateLimiter`` combining:
+- A requests-per-minute token bucket
+- A tokens-per-minute token bucket (debited with an estimate up front,
+  then corrected with the actual usage)
+- An AIMD concurrency limit that halves on 429/5xx and grows back by
+  about one slot per limit's worth of successful calls
+
+All state is thread-safe and shared between sync callers and asyncio
+tasks on any event loop.
+
+Example:
+    >>> limiter = get_rate_limiter(BUILTIN_MODELS["gpt-4o-mini"])
+    >>> with limiter.slot(estimated_tokens=1200) as slot:
+    ...     response = provider.chat(messages, config)
+    ...     slot.used_tokens = response.total_tokens
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    from webis.core.llm.base import ModelConfig
+
+# HTTP statuses that mean the provider is overloaded or throttling us
+OVERLOAD_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Whether an exception from a provider signals throttling or overload."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status in OVERLOAD_STATUS_CODES:
+        return True
+    return type(error).__name__ in ("RateLimitError", "InternalServerError", "APITimeoutError")
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at ``per_minute`` tokens a minute.
+
+    Requests larger than the capacity are clamped to it so they can
+    still proceed once the bucket is full.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens if available; otherwise return seconds to wait."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def acquire(self, amount: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, amount: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def adjust(self, delta: float) -> None:
+        """Credit (positive) or debit (negative) tokens after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens + delta)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD concurrency limit.
+
+    The limit grows by ``1 / limit`` per successful call (about one slot
+    per round trip at full load) and is multiplied by ``backoff`` on an
+    overload signal. Waiting callers, sync or async, are admitted in
+    FIFO order as slots free up.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial: Optional[int] = None,
+        backoff: float = 0.5,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = max(1, min_limit)
+        self.backoff = backoff
+        self.limit = float(initial or max(self.min_limit, max_limit // 2))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Any] = deque()
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._has_room() and not self._waiters:
+                self.in_flight += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        # The slot is handed over by release() before the event is set
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._has_room() and not self._waiters:
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        # Called with the lock held
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            self.in_flight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(_resolve_waiter, future)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._admit_waiters()
+
+    def on_overload(self) -> None:
+        with self._lock:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+
+
+def _resolve_waiter(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimitSlot:
+    """Handle for one admitted call; set ``used_tokens`` once usage is known."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+
+
+class ModelRateLimiter:
+    """
+    Request, token and concurrency budgets for one model endpoint.
+
+    Args:
+        rpm: Requests per minute (None = unlimited)
+        tpm: Tokens per minute (None = unlimited)
+        max_concurrency: Upper bound of the adaptive concurrency limit
+            (None = no concurrency control)
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrencyLimit(max_concurrency) if max_concurrency else None
+        self.throttled = 0
+
+    def _settle(self, slot: RateLimitSlot) -> None:
+        if self.tokens is not None and slot.used_tokens is not None:
+            self.tokens.adjust(slot.estimated_tokens - slot.used_tokens)
+
+    @contextmanager
+    def slot(self, estimated_tokens: int = 0) -> Iterator[RateLimitSlot]:
+        """Block until the call fits all budgets, then hold a concurrency slot."""
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        try:
+            if self.requests is not None:
+                self.requests.acquire(1)
+            if self.tokens is not None:
+                self.tokens.acquire(estimated_tokens)
+            slot = RateLimitSlot(estimated_tokens)
+            yield slot
+            self._settle(slot)
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release()
+
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens: int = 0) -> AsyncIterator[RateLimitSlot]:
+        """Async variant of ``slot``."""
+        if self.concurrency is not None:
+            await self.concurrency.aacquire()
+        try:
+            if self.requests is not None:
+                await self.requests.aacquire(1)
+            if self.tokens is not None:
+                await self.tokens.aacquire(estimated_tokens)
+            slot = RateLimitSlot(estimated_tokens)
+            yield slot
+            self._settle(slot)
+        finally:
+            if self.concurrency is not None:
+                self.concurrency.release()
+
+    def on_success(self) -> None:
+        if self.concurrency is not None:
+            self.concurrency.on_success()
+
+    def on_overload(self) -> None:
+        self.throttled += 1
+        if self.concurrency is not None:
+            self.concurrency.on_overload()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": int(self.concurrency.limit) if self.concurrency else None,
+            "in_flight": self.concurrency.in_flight if self.concurrency else None,
+            "throttled": self.throttled,
+        }
+
+
+_limiters: Dict[Tuple, ModelRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config: "ModelConfig") -> Optional[ModelRateLimiter]:
+    """
+    Get the process-wide limiter for a model endpoint.
+
+    Returns None if the config sets no limits. Routers and plugins using
+    the same endpoint share one set of budgets.
+    """
+    if not (config.rpm or config.tpm or config.max_concurrency):
+        return None
+
+    key = (config.provider, config.base_url, config.name, config.rpm, config.tpm, config.max_concurrency)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = ModelRateLimiter(
+                rpm=config.rpm, tpm=config.tpm, max_concurrency=config.max_concurrency
+            )
+        return limiter
+
+
+__all__ = [
+    "TokenBucket",
+    "AdaptiveConcurrencyLimit",
+    "ModelRateLimiter",
+    "RateLimitSlot",
+    "get_rate_limiter",
+    "is_overload_error",
+]
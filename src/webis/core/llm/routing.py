@@ -0,0 +1,129 @@
+"""
+Latency and error tracking for LLM routing.
+
+``LatencyTracker`` keeps a rolling window of call latencies and outcomes
+per model. ``LLMRouter`` uses it to hedge slow calls (start the next
+model once the current one exceeds its p95) and, with a routing
+objective, to order models by a cost/latency score.
+
+Example:
+    >>> router = LLMRouter().enable_hedging()
+    >>> router.set_routing_objective(cost_weight=1.0, latency_weight=0.5)
+    >>> router.get_usage_stats()["latency"]["deepseek-v3"]["p95_ms"]
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from webis.core.llm.base import ModelConfig
+
+
+class ModelStats:
+    """
+    Rolling latency percentiles and error rate of one model.
+
+    Args:
+        window: Number of most recent calls kept
+    """
+
+    def __init__(self, window: int = 200):
+        self._calls: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool = True) -> None:
+        with self._lock:
+            self._calls.append((latency_ms, ok))
+
+    @property
+    def samples(self) -> int:
+        return len(self._calls)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-100) of successful calls, or None without data."""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._calls if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, math.ceil(q / 100 * len(latencies)) - 1))
+        return latencies[index]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._calls:
+                return 0.0
+            return sum(1 for _, ok in self._calls if not ok) / len(self._calls)
+
+    def summary(self) -> Dict[str, Any]:
+        p50, p95 = self.p50, self.p95
+        return {
+            "samples": self.samples,
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate, 4),
+        }
+
+
+class LatencyTracker:
+    """``ModelStats`` per model name."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._models: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str) -> ModelStats:
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None:
+                stats = self._models[model] = ModelStats(self.window)
+            return stats
+
+    def record(self, model: str, latency_ms: float, ok: bool = True) -> None:
+        self.get(model).record(latency_ms, ok)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            models = dict(self._models)
+        return {name: stats.summary() for name, stats in models.items()}
+
+
+def routing_score(
+    config: "ModelConfig",
+    stats: ModelStats,
+    cost_weight: float = 1.0,
+    latency_weight: float = 1.0,
+) -> float:
+    """
+    Cost/latency objective of a model; lower is better.
+
+    Cost is the model's input plus output price per million tokens
+    (USD), latency its rolling p50 in seconds. A model without latency
+    samples scores as if it were instant, so it gets tried and measured.
+    The sum is divided by the success rate, so unreliable models sink.
+    """
+    cost = config.cost_per_1m_input + config.cost_per_1m_output
+    p50 = stats.p50
+    latency = p50 / 1000 if p50 is not None else 0.0
+    score = cost_weight * cost + latency_weight * latency
+    return score / max(1e-3, 1.0 - stats.error_rate)
+
+
+__all__ = [
+    "ModelStats",
+    "LatencyTracker",
+    "routing_score",
+]
@@ -0,0 +1,161 @@
+"""
+Single-flight request coalescing for Webis.
+
+Concurrent calls that share a key wait on the first in-flight call and
+receive its result instead of issuing their own. Works across threads
+and event loops within a process; leaders and followers may mix sync
+and async callers freely.
+
+The call's errors are shared with its followers, but the leader's own
+interruption (cancellation, KeyboardInterrupt) is not: the flight is
+abandoned and one of the followers runs the call instead.
+
+Example:
+    >>> flights = SingleFlight()
+    >>> response = flights.do(key, lambda: provider.chat(messages, config))
+    >>> response = await flights.ado(key, lambda: provider.achat(messages, config))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Outcome of a flight whose leader was interrupted before finishing
+_ABANDONED = object()
+
+
+class _Flight:
+    """An in-flight call and the callers waiting for its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+    def finish(self, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.result = result
+            self.error = error
+            self._done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._resolve, future)
+
+    def _resolve(self, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(self.result)
+
+    def _outcome(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def wait(self) -> Any:
+        self._done.wait()
+        return self._outcome()
+
+    async def wait_async(self) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._done.is_set():
+                return self._outcome()
+            self._waiters.append((loop, future))
+        return await future
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    Only calls that overlap in time are coalesced; once the leader
+    finishes, the key is released and the next call runs again (callers
+    are expected to consult their cache first).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[_Flight, bool]:
+        """Return the flight for ``key`` and whether the caller leads it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _land(self, key: str, flight: _Flight, result: Any, error: Optional[BaseException]) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.finish(result, error)
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``func`` unless a call with ``key`` is already in flight.
+
+        Returns:
+            Tuple of (result, shared), where shared is True if the result
+            came from another caller's call
+        """
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                break
+            result = flight.wait()
+            if result is not _ABANDONED:
+                return result, True
+
+        try:
+            result = func()
+        except Exception as e:
+            self._land(key, flight, None, e)
+            raise
+        except BaseException:
+            self._land(key, flight, _ABANDONED, None)
+            raise
+        self._land(key, flight, result, None)
+        return result, False
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of ``do``; ``func`` returns an awaitable."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                break
+            result = await flight.wait_async()
+            if result is not _ABANDONED:
+                return result, True
+
+        try:
+            result = await func()
+        except Exception as e:
+            self._land(key, flight, None, e)
+            raise
+        except BaseException:
+            # e.g. the leader's task was cancelled: a follower takes over
+            self._land(key, flight, _ABANDONED, None)
+            raise
+        self._land(key, flight, result, None)
+        return result, False
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+__all__ = [
+    "SingleFlight",
+]
@@ -0,0 +1,230 @@
+"""
+Token counting and token-budgeted truncation.
+
+``get_tokenizer`` returns a cached per-model ``Tokenizer``. It uses
+tiktoken encodings when the package (and its encoding files) are
+available, and otherwise a script-aware estimate that counts CJK
+characters as one token each and other text as about four characters
+per token. Set ``WEBIS_TOKENIZER=heuristic`` to skip tiktoken entirely.
+
+``fit_to_budget`` trims content to what fits in a model's context
+window after the completion and the prompt around the content.
+
+Example:
+    >>> config = BUILTIN_MODELS["gpt-4o-mini"]
+    >>> get_tokenizer(config).count("hello world")
+    >>> text = fit_to_budget(doc.clean_content, config, output_tokens=500, max_input_tokens=4000)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from webis.core.llm.base import ModelConfig
+
+logger = logging.getLogger(__name__)
+
+# Encoding for models tiktoken does not know (most open-weight models
+# tokenize within ~15% of it)
+DEFAULT_ENCODING = "cl100k_base"
+
+# Han, kana, hangul and full-width forms: roughly one token per character
+_CJK_RE = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]"
+)
+
+
+class Tokenizer:
+    """
+    Counts and truncates text in a model's tokens.
+
+    Args:
+        encoding: A tiktoken ``Encoding``, or None for the heuristic estimate
+        name: Encoding name, for logging
+    """
+
+    def __init__(self, encoding: Any = None, name: str = "heuristic"):
+        self.encoding = encoding
+        self.name = name
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real encoder rather than an estimate."""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode_ordinary(text))
+        return _estimate(text)
+
+    def count_batch(self, texts: Sequence[str], num_threads: int = 8) -> List[int]:
+        """Count many texts at once (tiktoken encodes them in parallel)."""
+        if self.encoding is not None:
+            encoded = self.encoding.encode_ordinary_batch(list(texts), num_threads=num_threads)
+            return [len(tokens) for tokens in encoded]
+        return [_estimate(text) if text else 0 for text in texts]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut ``text`` to at most ``max_tokens`` tokens."""
+        if max_tokens <= 0 or not text:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode_ordinary(text)
+            if len(tokens) <= max_tokens:
+                return text
+            # A cut inside a multi-byte character decodes to U+FFFD
+            return self.encoding.decode(tokens[:max_tokens]).rstrip("\ufffd")
+
+        if _estimate(text) <= max_tokens:
+            return text
+        # Longest prefix within budget; the estimate grows with length
+        low, high = 0, len(text)
+        while low < high:
+            mid = (low + high + 1) // 2
+            if _estimate(text[:mid]) <= max_tokens:
+                low = mid
+            else:
+                high = mid - 1
+        return text[:low]
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Split ``text`` into consecutive pieces of at most ``max_tokens`` tokens."""
+        pieces: List[str] = []
+        while text:
+            # Always make progress, even if one character exceeds the budget
+            piece = self.truncate(text, max_tokens) or text[:1]
+            pieces.append(piece)
+            text = text[len(piece):]
+        return pieces
+
+
+def _estimate(text: str) -> int:
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name: str) -> Any:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # Not installed, or the encoding file cannot be downloaded
+        logger.info(f"tiktoken encoding {name} unavailable, estimating tokens: {e}")
+        return None
+
+
+def _encoding_name(model: str) -> str:
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_name_for_model(model.rsplit("/", 1)[-1])
+    except (ImportError, KeyError):
+        return DEFAULT_ENCODING
+
+
+@lru_cache(maxsize=None)
+def _tokenizer_for(model: str) -> Tokenizer:
+    if os.getenv("WEBIS_TOKENIZER", "").lower() == "heuristic":
+        return Tokenizer()
+    name = _encoding_name(model) if model else DEFAULT_ENCODING
+    encoding = _load_encoding(name)
+    return Tokenizer(encoding, name) if encoding is not None else Tokenizer()
+
+
+def get_tokenizer(model: Union[str, "ModelConfig", None] = None) -> Tokenizer:
+    """
+    Get the cached tokenizer for a model.
+
+    Args:
+        model: Model name or ``ModelConfig`` (None = default encoding)
+    """
+    if model is not None and not isinstance(model, str):
+        model = model.name
+    return _tokenizer_for(model or "")
+
+
+def input_budget(
+    model_config: "ModelConfig",
+    output_tokens: Optional[int] = None,
+    reserved_tokens: int = 0,
+    max_input_tokens: Optional[int] = None,
+) -> int:
+    """
+    Tokens left for content in one call.
+
+    Args:
+        model_config: Target model
+        output_tokens: Completion budget (defaults to ``model_config.max_tokens``)
+        reserved_tokens: Tokens used by the prompt around the content
+        max_input_tokens: Optional cap below the context window (cost control)
+    """
+    if output_tokens is None:
+        output_tokens = model_config.max_tokens
+    budget = model_config.context_window - output_tokens - reserved_tokens
+    if max_input_tokens is not None:
+        budget = min(budget, max_input_tokens)
+    if budget <= 0:
+        raise ValueError(
+            f"No input budget left for {model_config.name}: context window "
+            f"{model_config.context_window}, output {output_tokens}, reserved {reserved_tokens}"
+        )
+    return budget
+
+
+def fit_to_budget(
+    content: Union[str, Sequence[str]],
+    model_config: "ModelConfig",
+    output_tokens: Optional[int] = None,
+    reserved_tokens: int = 0,
+    max_input_tokens: Optional[int] = None,
+) -> Union[str, List[str]]:
+    """
+    Trim content to a model's input budget, measured in its tokens.
+
+    A string is truncated. A sequence of chunks is selected in order,
+    whole chunks only, stopping at the first chunk that does not fit; if
+    not even the first chunk fits it is truncated.
+
+    Args:
+        content: Text, or ordered chunks to select from
+        model_config: Target model
+        output_tokens: Completion budget (defaults to ``model_config.max_tokens``)
+        reserved_tokens: Tokens used by the prompt around the content
+        max_input_tokens: Optional cap below the context window
+
+    Returns:
+        The trimmed text, or the selected chunks
+    """
+    budget = input_budget(model_config, output_tokens, reserved_tokens, max_input_tokens)
+    tokenizer = get_tokenizer(model_config)
+    if isinstance(content, str):
+        return tokenizer.truncate(content, budget)
+
+    selected: List[str] = []
+    used = 0
+    for chunk, tokens in zip(content, tokenizer.count_batch(content)):
+        if used + tokens > budget:
+            if not selected:
+                selected.append(tokenizer.truncate(chunk, budget))
+            break
+        selected.append(chunk)
+        used += tokens
+    return selected
+
+
+__all__ = [
+    "Tokenizer",
+    "get_tokenizer",
+    "input_budget",
+    "fit_to_budget",
+]
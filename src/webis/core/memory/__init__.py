@@ -2,4 +2,5 @@ from .db import init_db, get_session
 from .models import DocumentModel, RunModel
 from .vector_store import VectorStore
 from .retriever import HybridRetriever
-from .deduplication import Deduplicator
+from .deduplication import Deduplicator, load_seen_filter
+from .repository import DocumentRepository
@@ -1,20 +1,71 @@
 """
 Database connection manager.
+
+The engine comes from ``WEBIS_DB_URL`` (default: local SQLite file).
+SQLite connections run in WAL mode with relaxed fsync so readers never
+block the writer; other databases (Postgres) get a pre-pinged connection
+pool sized by ``WEBIS_DB_POOL_SIZE`` / ``WEBIS_DB_MAX_OVERFLOW``.
 """
 
 import os
-from typing import Generator
+from typing import Generator, Optional
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlmodel import create_engine, Session, SQLModel
 
 # Default to local SQLite for development
 DATABASE_URL = os.environ.get("WEBIS_DB_URL", "sqlite:///webis.db")
 
-engine = create_engine(DATABASE_URL, echo=False)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 30000,
+    "temp_store": "MEMORY",
+    # Negative = KiB: 64 MB page cache
+    "cache_size": -64000,
+}
+
+# Keys per IN (...) list; stays below SQLite's 999-parameter limit
+IN_BATCH_SIZE = 450
+
+
+def create_db_engine(url: str = DATABASE_URL, echo: bool = False) -> Engine:
+    """
+    Create an engine tuned for the database behind ``url``.
+
+    Args:
+        url: SQLAlchemy database URL
+        echo: Log all SQL statements
+    """
+    if url.startswith("sqlite"):
+        db_engine = create_engine(url, echo=echo, connect_args={"check_same_thread": False})
+
+        @event.listens_for(db_engine, "connect")
+        def _set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+        return db_engine
+
+    return create_engine(
+        url,
+        echo=echo,
+        pool_size=int(os.environ.get("WEBIS_DB_POOL_SIZE", "10")),
+        max_overflow=int(os.environ.get("WEBIS_DB_MAX_OVERFLOW", "20")),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+
+
+engine = create_db_engine(DATABASE_URL)
 
-def init_db():
+def init_db(db_engine: Optional[Engine] = None):
     """Initialize the database tables."""
-    SQLModel.metadata.create_all(engine)
+    db_engine = db_engine or engine
+    SQLModel.metadata.create_all(db_engine)
 
 def get_session() -> Generator[Session, None, None]:
     """Get a database session."""
@@ -1,54 +1,195 @@
+"""
+Document deduplication against the ``documents`` table.
+
+A document is a duplicate if a stored document has its URL or the MD5
+hash of its content. ``Deduplicator.filter_new`` checks a whole batch
+with a few set-based ``WHERE url IN (...) OR content_hash IN (...)``
+queries instead of two SELECTs per document. By default ``filter_new``
+first consults a process-wide Bloom filter of every stored URL and hash,
+loaded once per database: a document whose keys are not in it is new
+without a query, so most new documents never hit the database and only
+possible duplicates are looked up.
+
+The filter knows what was stored when it was loaded, plus what this
+process has passed or written since (``DocumentRepository`` reports its
+writes). Rows written by other processes afterwards are missed until
+``load_seen_filter(session, reload=True)``: ``filter_new`` can then pass
+a document another process already stored. That is acceptable for a
+pre-filter, since ``DocumentRepository`` resolves existing rows before
+writing, but not for a yes/no answer, so ``is_duplicate`` and
+``get_existing_doc`` always ask the database. Pass ``use_filter=False``
+where ``filter_new`` itself must be exact across processes.
+"""
+
 import hashlib
-from typing import Optional
-from sqlmodel import Session, select
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_
+from sqlmodel import Session, col, select
+
+from webis.core.memory.db import IN_BATCH_SIZE
 from webis.core.memory.models import DocumentModel
 from webis.core.schema import WebisDocument
+from webis.core.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    """MD5 of a document's content, as stored in ``DocumentModel.content_hash``."""
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+def _keys(url: Optional[str], hash_: str) -> List[str]:
+    # URLs and hashes share one filter; prefixes keep them apart
+    return [f"h:{hash_}", f"u:{url}"] if url else [f"h:{hash_}"]
+
+
+_seen: Dict[str, BloomFilter] = {}
+_seen_lock = threading.Lock()
+
+
+def load_seen_filter(session: Session, error_rate: float = 0.01, reload: bool = False) -> BloomFilter:
+    """
+    Get the process-wide filter of URLs and hashes stored in the session's database.
+
+    Built from one streamed scan of ``documents`` on first use.
+
+    Args:
+        session: Session bound to the database
+        error_rate: False-positive rate (a false positive costs one lookup)
+        reload: Rebuild the filter to pick up rows written by other processes
+    """
+    key = str(session.get_bind().url)
+    with _seen_lock:
+        seen = _seen.get(key)
+        if seen is None or reload:
+            count = session.exec(select(func.count()).select_from(DocumentModel)).one()
+            # Room for growth before the filter has to add a stage
+            seen = BloomFilter(capacity=max(100_000, 2 * count), error_rate=error_rate)
+            statement = select(DocumentModel.url, DocumentModel.content_hash).execution_options(yield_per=10_000)
+            for url, hash_ in session.exec(statement):
+                if url:
+                    seen.add(f"u:{url}")
+                if hash_:
+                    seen.add(f"h:{hash_}")
+            _seen[key] = seen
+            logger.info(f"Loaded dedup filter with {count} documents ({seen.nbytes / 1e6:.1f} MB)")
+        return seen
+
+
+def mark_stored(db_engine: Any, urls: Iterable[Optional[str]], hashes: Iterable[Optional[str]]) -> None:
+    """Add written URLs and hashes to the database's filter, if this process loaded one."""
+    seen = _seen.get(str(db_engine.url))
+    if seen is None:
+        return
+    seen.update(f"u:{url}" for url in urls if url)
+    seen.update(f"h:{hash_}" for hash_ in hashes if hash_)
+
 
 class Deduplicator:
     """
     Handles document deduplication logic.
+
+    Args:
+        session: Database session
+        use_filter: In ``filter_new``, skip the query for documents the
+            Bloom filter rules out. Rows other processes stored after the
+            filter was loaded are missed (see the module docstring).
     """
-    
-    def __init__(self, session: Session):
+
+    def __init__(self, session: Session, use_filter: bool = True):
         self.session = session
+        self.use_filter = use_filter
+        self._seen: Optional[BloomFilter] = None
+
+    @property
+    def seen(self) -> Optional[BloomFilter]:
+        """The database's filter, loaded on first use (None with ``use_filter=False``)."""
+        if self.use_filter and self._seen is None:
+            self._seen = load_seen_filter(self.session)
+        return self._seen
 
     def compute_hash(self, content: str) -> str:
         """Compute MD5 hash of content."""
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return content_hash(content)
+
+    def _maybe_stored(self, seen: Optional[BloomFilter], keys: Sequence[str]) -> bool:
+        return seen is None or any(key in seen for key in keys)
+
+    def _stored_keys(self, urls: List[str], hashes: List[str]) -> Set[str]:
+        """Filter keys of the given URLs and hashes that are in the database."""
+        stored: Set[str] = set()
+        for start in range(0, max(len(urls), len(hashes)), IN_BATCH_SIZE):
+            statement = select(DocumentModel.url, DocumentModel.content_hash).where(
+                or_(
+                    col(DocumentModel.url).in_(urls[start:start + IN_BATCH_SIZE]),
+                    col(DocumentModel.content_hash).in_(hashes[start:start + IN_BATCH_SIZE]),
+                )
+            )
+            for url, hash_ in self.session.exec(statement):
+                if url:
+                    stored.add(f"u:{url}")
+                if hash_:
+                    stored.add(f"h:{hash_}")
+        return stored
+
+    def filter_new(self, docs: Iterable[WebisDocument]) -> List[WebisDocument]:
+        """
+        Drop documents already stored, or repeated earlier in the batch.
+
+        Returns:
+            The new documents, in input order
+        """
+        batch: List[Tuple[WebisDocument, List[str]]] = []
+        batch_keys: Set[str] = set()
+        for doc in docs:
+            keys = _keys(doc.meta.url, content_hash(doc.content))
+            if any(key in batch_keys for key in keys):
+                continue
+            batch_keys.update(keys)
+            batch.append((doc, keys))
+
+        seen = self.seen
+        candidates = [keys for _, keys in batch if self._maybe_stored(seen, keys)]
+        stored: Set[str] = set()
+        if candidates:
+            urls = [key[2:] for keys in candidates for key in keys if key.startswith("u:")]
+            hashes = [keys[0][2:] for keys in candidates]
+            stored = self._stored_keys(urls, hashes)
+
+        new = [(doc, keys) for doc, keys in batch if not any(key in stored for key in keys)]
+        if seen is not None:
+            # Added before the caller stores them; if it doesn't, the only
+            # cost is a lookup for these keys later
+            for _, keys in new:
+                seen.update(keys)
+        logger.debug(
+            f"Dedup: {len(new)} new of {len(batch)} unique documents, "
+            f"{len(candidates)} looked up"
+        )
+        return [doc for doc, _ in new]
 
     def is_duplicate(self, doc: WebisDocument) -> bool:
         """
         Check if document already exists based on URL or content hash.
         """
-        # Check by URL if available
-        if doc.meta.url:
-            statement = select(DocumentModel).where(DocumentModel.url == doc.meta.url)
-            result = self.session.exec(statement).first()
-            if result:
-                return True
-
-        # Check by content hash
-        content_hash = self.compute_hash(doc.content)
-        statement = select(DocumentModel).where(DocumentModel.content_hash == content_hash)
-        result = self.session.exec(statement).first()
-        
-        if result:
-            return True
-            
-        return False
+        hash_ = content_hash(doc.content)
+        urls = [doc.meta.url] if doc.meta.url else []
+        return bool(self._stored_keys(urls, [hash_]))
 
     def get_existing_doc(self, doc: WebisDocument) -> Optional[DocumentModel]:
         """
-        Retrieve existing document if it exists.
+        Retrieve existing document if it exists (a URL match wins over a hash match).
         """
+        hash_ = content_hash(doc.content)
+        condition = DocumentModel.content_hash == hash_
         if doc.meta.url:
-            statement = select(DocumentModel).where(DocumentModel.url == doc.meta.url)
-            result = self.session.exec(statement).first()
-            if result:
-                return result
-
-        content_hash = self.compute_hash(doc.content)
-        statement = select(DocumentModel).where(DocumentModel.content_hash == content_hash)
-        result = self.session.exec(statement).first()
-        
-        return result
+            condition = or_(DocumentModel.url == doc.meta.url, condition)
+        matches = self.session.exec(select(DocumentModel).where(condition)).all()
+        for match in matches:
+            if doc.meta.url and match.url == doc.meta.url:
+                return match
+        return matches[0] if matches else None
@@ -0,0 +1,239 @@
+"""
+Bulk persistence of documents.
+
+``DocumentRepository.bulk_upsert`` writes ``WebisDocument`` batches as
+``documents`` rows with Core multi-row ``INSERT ... ON CONFLICT DO
+UPDATE`` statements, one transaction per chunk, instead of one ORM
+``session.add`` and flush per document.
+
+A document already stored under the same URL or content hash is
+updated in place: each chunk resolves existing rows with one set-based
+``SELECT ... WHERE url IN (...) OR content_hash IN (...)``, takes over
+their ids, and upserts on the primary key. ``url`` and ``content_hash``
+are plain indexes, not unique keys, so the database cannot detect a
+concurrent writer inserting the same key; instead each chunk takes the
+database's write lock (an advisory lock on Postgres) before its lookup,
+and writers serialize per chunk.
+
+Example:
+    >>> repo = DocumentRepository()          # engine from WEBIS_DB_URL
+    >>> repo.bulk_upsert(result.documents)
+    {'inserted': 950, 'updated': 50, 'skipped': 0}
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import false, func, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from webis.core.memory.db import IN_BATCH_SIZE
+from webis.core.memory.deduplication import content_hash, mark_stored
+from webis.core.memory.models import DocumentModel
+from webis.core.schema import WebisDocument
+
+logger = logging.getLogger(__name__)
+
+# Columns an upsert leaves alone on existing rows
+_KEEP_ON_UPDATE = ("id", "created_at")
+
+# Postgres advisory lock key serializing bulk writers
+_WRITE_LOCK_KEY = 0x77656269  # "webi"
+
+
+def document_row(doc: WebisDocument, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Flatten a ``WebisDocument`` into a ``documents`` row."""
+    now = now or datetime.utcnow()
+    meta = doc.meta
+    custom = dict(meta.custom)
+    if meta.__pydantic_extra__:
+        custom.update(meta.__pydantic_extra__)
+    return {
+        "id": doc.id,
+        "content": doc.content,
+        "clean_content": doc.clean_content,
+        "doc_type": doc.doc_type.value,
+        "url": meta.url,
+        "content_hash": content_hash(doc.content),
+        "title": meta.title,
+        "author": meta.author,
+        "published_at": meta.published_at,
+        "source_plugin": meta.source_plugin,
+        "meta_custom": custom,
+        "tags": list(meta.tags),
+        "parent_id": doc.parent_id,
+        "processing_history": doc.processing_history,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _collapse(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Within one statement each id, URL and hash may appear once; the
+    # last version of a document wins
+    kept: Dict[int, Dict[str, Any]] = {}
+    seen: Dict[Tuple[str, str], int] = {}
+    for i, row in enumerate(rows):
+        keys = [("id", row["id"]), ("hash", row["content_hash"])]
+        if row["url"] is not None:
+            keys.append(("url", row["url"]))
+        for key in keys:
+            if key in seen:
+                kept.pop(seen[key], None)
+            seen[key] = i
+        kept[i] = row
+    return list(kept.values())
+
+
+class DocumentRepository:
+    """
+    Batched reads and writes of ``DocumentModel`` rows.
+
+    Args:
+        db_engine: SQLAlchemy engine (default: the global engine from ``WEBIS_DB_URL``)
+        chunk_size: Documents per transaction
+        max_retries: Retries of a chunk that conflicted with a concurrent writer
+    """
+
+    def __init__(self, db_engine: Optional[Engine] = None, chunk_size: int = 1000, max_retries: int = 3):
+        if db_engine is None:
+            from webis.core.memory.db import engine as db_engine
+        self.engine = db_engine
+        self.chunk_size = max(1, chunk_size)
+        self.max_retries = max_retries
+        self.table = DocumentModel.__table__
+
+    def _insert(self):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(self.table)
+        if dialect == "sqlite":
+            return sqlite.insert(self.table)
+        raise NotImplementedError(f"bulk_upsert does not support the {dialect} dialect")
+
+    def _upsert_statement(self):
+        insert = self._insert()
+        return insert.on_conflict_do_update(
+            index_elements=[self.table.c.id],
+            set_={
+                column.name: insert.excluded[column.name]
+                for column in self.table.columns
+                if column.name not in _KEEP_ON_UPDATE
+            },
+        )
+
+    def _lock_writes(self, conn: Connection) -> None:
+        """Hold off other bulk writers until this transaction ends."""
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _WRITE_LOCK_KEY})
+        elif dialect == "sqlite":
+            # A write statement takes SQLite's write lock even if it matches no row
+            conn.execute(self.table.update().where(false()).values(id=self.table.c.id))
+
+    def _existing(self, conn: Connection, rows: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+        """Ids of stored rows sharing a URL or content hash with ``rows``."""
+        table = self.table
+        urls = [row["url"] for row in rows if row["url"] is not None]
+        hashes = [row["content_hash"] for row in rows]
+        found: Dict[Tuple[str, str], str] = {}
+        for start in range(0, max(len(urls), len(hashes)), IN_BATCH_SIZE):
+            batch_urls = urls[start:start + IN_BATCH_SIZE]
+            batch_hashes = hashes[start:start + IN_BATCH_SIZE]
+            statement = select(table.c.id, table.c.url, table.c.content_hash).where(
+                or_(table.c.url.in_(batch_urls), table.c.content_hash.in_(batch_hashes))
+            )
+            for row_id, url, row_hash in conn.execute(statement):
+                if url is not None:
+                    found[("url", url)] = row_id
+                if row_hash is not None:
+                    found[("hash", row_hash)] = row_id
+        return found
+
+    def _write_chunk(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        with self.engine.begin() as conn:
+            self._lock_writes(conn)
+            existing = self._existing(conn, rows)
+            pending = []
+            ids = set()
+            for row in rows:
+                by_url = existing.get(("url", row["url"])) if row["url"] is not None else None
+                by_hash = existing.get(("hash", row["content_hash"]))
+                if by_url and by_hash and by_url != by_hash:
+                    # Its URL and its content belong to two different stored
+                    # documents; updating either would break the other's key
+                    logger.debug(f"Skipping {row['id']}: content already stored under another URL")
+                    counts["skipped"] += 1
+                    continue
+                match = by_url or by_hash
+                target = match or row["id"]
+                if target in ids:
+                    # Another document of this chunk already writes that row
+                    counts["skipped"] += 1
+                    continue
+                if match:
+                    row = {**row, "id": match}
+                    counts["updated"] += 1
+                else:
+                    counts["inserted"] += 1
+                ids.add(target)
+                pending.append(row)
+            if pending:
+                # executemany: batched into multi-row VALUES by SQLAlchemy
+                conn.execute(self._upsert_statement(), pending)
+        mark_stored(self.engine, (row["url"] for row in pending), (row["content_hash"] for row in pending))
+        return counts
+
+    def bulk_upsert(self, docs: Iterable[WebisDocument]) -> Dict[str, int]:
+        """
+        Insert or update documents in chunked transactions.
+
+        Returns:
+            Counts of inserted, updated and skipped documents
+        """
+        totals = {"inserted": 0, "updated": 0, "skipped": 0}
+        now = datetime.utcnow()
+        chunk: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            rows = _collapse(chunk)
+            totals["skipped"] += len(chunk) - len(rows)
+            for attempt in range(self.max_retries + 1):
+                try:
+                    counts = self._write_chunk(rows)
+                    break
+                except IntegrityError as e:
+                    # An id written by another writer outside bulk_upsert
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning(f"Upsert chunk conflicted with a concurrent write, retrying: {e}")
+            for key, value in counts.items():
+                totals[key] += value
+            chunk.clear()
+
+        for doc in docs:
+            chunk.append(document_row(doc, now))
+            if len(chunk) >= self.chunk_size:
+                flush()
+        if chunk:
+            flush()
+
+        logger.info(
+            f"Upserted documents: {totals['inserted']} inserted, "
+            f"{totals['updated']} updated, {totals['skipped']} skipped"
+        )
+        return totals
+
+    def count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar_one()
+
+
+__all__ = [
+    "DocumentRepository",
+    "document_row",
+]
@@ -1,10 +1,23 @@
 """
 Vector Store abstraction for Webis.
+
+Writes are chunked upserts, so large loads stay within the client's
+batch limit and re-ingesting an id replaces it instead of failing.
+Vectors can be passed in precomputed (lists, NumPy arrays or
+``EmbeddingMatrix``), and with an ``embedding_backend`` the store embeds
+missing document vectors and query texts with the same model as
+``EmbeddingPlugin``, instead of Chroma's default embedding function.
+
+Example:
+    >>> backend = get_embedding_backend("local")
+    >>> store = VectorStore(embedding_backend=backend)
+    >>> store.upsert_documents(result.documents)      # chunks + their embeddings
+    >>> store.query_many(query_texts=["rate cuts", "oil supply"], n_results=10)
 """
 
 import logging
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Sequence
 
 try:
     import chromadb
@@ -12,52 +25,292 @@ try:
 except ImportError:
     chromadb = None
 
+from webis.core.embedding.matrix import EmbeddingMatrix
+from webis.core.schema import WebisDocument
+
 logger = logging.getLogger(__name__)
 
+# Collection metadata key recording which model produced its vectors
+_MODEL_KEY = "webis_embedding_model"
+
+# Query result fields holding one list per query
+_PER_QUERY_KEYS = ("ids", "documents", "metadatas", "distances", "embeddings", "uris", "data")
+
+
+def _numpy() -> Optional[Any]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _slice_vectors(vectors: Any, start: int, stop: int) -> Any:
+    """Rows ``start:stop`` of a matrix, array or list, in a form Chroma accepts."""
+    if isinstance(vectors, EmbeddingMatrix):
+        rows = vectors.take_rows(start, stop)
+        return rows.to_numpy() if _numpy() is not None else rows.tolist()
+    return vectors[start:stop]
+
+
+def _stack(rows: List[Any]) -> Any:
+    np = _numpy()
+    if np is not None:
+        return np.stack([np.asarray(row, dtype="float32") for row in rows])
+    return [list(row) for row in rows]
+
+
+def _scalar_metadata(values: Dict[str, Any]) -> Dict[str, Any]:
+    # Chroma metadata values must be str, int, float or bool
+    return {k: v for k, v in values.items() if isinstance(v, (str, int, float, bool))}
+
+
 class VectorStore:
     """
     Wrapper for Vector Database (ChromaDB).
+
+    Args:
+        collection_name: Chroma collection
+        persist_dir: Directory of the persistent client
+        embedding_backend: Backend embedding query texts and documents
+            passed without vectors (default: Chroma's embedding function)
+        batch_size: Records per upsert or query call (capped by the client's limit)
     """
-    
-    def __init__(self, collection_name: str = "webis_docs", persist_dir: str = "./chroma_db"):
+
+    def __init__(
+        self,
+        collection_name: str = "webis_docs",
+        persist_dir: str = "./chroma_db",
+        embedding_backend: Optional[Any] = None,
+        batch_size: int = 1000,
+    ):
         if chromadb is None:
             raise ImportError("chromadb is required. Install with `pip install chromadb`")
-            
+
         self.client = chromadb.PersistentClient(path=persist_dir)
-        self.collection = self.client.get_or_create_collection(name=collection_name)
-        
+        self.embedding_backend = embedding_backend
+        metadata = {_MODEL_KEY: embedding_backend.model_id} if embedding_backend else None
+        self.collection = self.client.get_or_create_collection(name=collection_name, metadata=metadata)
+
+        stored_model = (self.collection.metadata or {}).get(_MODEL_KEY)
+        if embedding_backend and stored_model and stored_model != embedding_backend.model_id:
+            logger.warning(
+                f"Collection {collection_name} holds {stored_model} vectors, "
+                f"but queries will be embedded with {embedding_backend.model_id}"
+            )
+
+        max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        self.batch_size = min(batch_size, max_batch_size()) if max_batch_size else batch_size
+
     def add_documents(
-        self, 
-        ids: List[str], 
-        documents: List[str], 
+        self,
+        ids: List[str],
+        documents: List[str],
         metadatas: Optional[List[Dict[str, Any]]] = None,
         embeddings: Optional[List[List[float]]] = None
     ):
         """
-        Add documents to the vector store.
+        Add documents to the vector store (upserted in batches).
         """
         if not ids or not documents:
             return
-            
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings
-        )
-        logger.info(f"Added {len(ids)} documents to vector store")
-        
+
+        self.upsert_batch(ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def upsert_batch(
+        self,
+        ids: Sequence[str],
+        documents: Optional[Sequence[str]] = None,
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+        embeddings: Optional[Any] = None,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Insert or replace records in chunks of ``batch_size``.
+
+        Args:
+            ids: Record IDs; a repeated ID keeps its last record
+            documents: Texts
+            metadatas: Metadata per record
+            embeddings: Precomputed vectors (``EmbeddingMatrix``, NumPy array
+                or list of vectors); without them, ``documents`` are embedded
+                by the embedding backend or by Chroma
+            batch_size: Records per call (default: the store's)
+
+        Returns:
+            Number of records written
+        """
+        if not ids:
+            return 0
+        if embeddings is None and documents is None:
+            raise ValueError("upsert_batch needs documents or embeddings")
+
+        rows = sorted({record_id: i for i, record_id in enumerate(ids)}.values())
+        if len(rows) < len(ids):
+            logger.debug(f"Upserting {len(rows)} of {len(ids)} records: repeated ids keep their last record")
+        batch_size = batch_size or self.batch_size
+
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            contiguous = batch[-1] - batch[0] == len(batch) - 1
+            texts = [documents[i] for i in batch] if documents is not None else None
+
+            if embeddings is not None:
+                if contiguous:
+                    vectors = _slice_vectors(embeddings, batch[0], batch[-1] + 1)
+                else:
+                    vectors = _stack([embeddings[i] for i in batch])
+            elif self.embedding_backend is not None:
+                vectors = self.embedding_backend.embed_documents(texts)
+            else:
+                vectors = None
+
+            self.collection.upsert(
+                ids=[ids[i] for i in batch],
+                documents=texts,
+                metadatas=[metadatas[i] for i in batch] if metadatas is not None else None,
+                embeddings=vectors,
+            )
+
+        logger.info(f"Upserted {len(rows)} records to vector store")
+        return len(rows)
+
+    def upsert_documents(self, docs: Iterable[WebisDocument], batch_size: Optional[int] = None) -> int:
+        """
+        Load the chunks of pipeline documents, with their stored embeddings.
+
+        Each chunk becomes a record keyed by the chunk ID, with the
+        document's ID, URL, title and source as metadata. Chunks without
+        an embedding are embedded by the embedding backend (or Chroma).
+        Documents without chunks are skipped.
+
+        Returns:
+            Number of chunks written
+        """
+        batch_size = batch_size or self.batch_size
+        written = 0
+        # Chunks with and without vectors go in separate calls
+        pending: Dict[bool, Dict[str, list]] = {
+            True: {"ids": [], "documents": [], "metadatas": [], "embeddings": []},
+            False: {"ids": [], "documents": [], "metadatas": [], "embeddings": []},
+        }
+
+        def flush(with_vectors: bool) -> None:
+            nonlocal written
+            records = pending[with_vectors]
+            if not records["ids"]:
+                return
+            written += self.upsert_batch(
+                records["ids"],
+                documents=records["documents"],
+                metadatas=records["metadatas"],
+                embeddings=_stack(records["embeddings"]) if with_vectors else None,
+                batch_size=batch_size,
+            )
+            for values in records.values():
+                values.clear()
+
+        for doc in docs:
+            meta = _scalar_metadata({
+                "doc_id": doc.id,
+                "url": doc.meta.url,
+                "title": doc.meta.title,
+                "source_plugin": doc.meta.source_plugin,
+                "doc_type": doc.doc_type.value,
+            })
+            for chunk in doc.chunks:
+                vector = doc.chunk_embedding(chunk)
+                records = pending[vector is not None]
+                records["ids"].append(chunk.id)
+                records["documents"].append(chunk.content)
+                records["metadatas"].append({**meta, "chunk_index": chunk.index, **_scalar_metadata(chunk.metadata)})
+                if vector is not None:
+                    records["embeddings"].append(vector)
+                if len(records["ids"]) >= batch_size:
+                    flush(vector is not None)
+
+        flush(True)
+        flush(False)
+        return written
+
     def query(
-        self, 
-        query_text: str, 
-        n_results: int = 5, 
-        where: Optional[Dict] = None
+        self,
+        query_text: str,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        query_embedding: Optional[Sequence[float]] = None,
     ) -> Dict[str, Any]:
         """
         Query the vector store.
+
+        The query is embedded by the embedding backend if the store has
+        one, unless ``query_embedding`` is given.
         """
+        if query_embedding is None and self.embedding_backend is not None:
+            query_embedding = self.embedding_backend.embed_query(query_text)
+        if query_embedding is not None:
+            return self.collection.query(
+                query_embeddings=_stack([query_embedding]),
+                n_results=n_results,
+                where=where
+            )
         return self.collection.query(
             query_texts=[query_text],
             n_results=n_results,
             where=where
         )
+
+    def query_many(
+        self,
+        query_embeddings: Optional[Any] = None,
+        query_texts: Optional[Sequence[str]] = None,
+        n_results: int = 5,
+        where: Optional[Dict] = None,
+        include: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run many queries in batched calls.
+
+        Args:
+            query_embeddings: Precomputed query vectors (``EmbeddingMatrix``,
+                NumPy array or list of vectors)
+            query_texts: Query texts, embedded by the embedding backend
+                if the store has one, otherwise by Chroma
+            n_results: Results per query
+            where: Metadata filter applied to every query
+            include: Fields to return (Chroma's default if None)
+            batch_size: Queries per call (default: the store's)
+
+        Returns:
+            Chroma's result dict, with one list per query under each key
+        """
+        if (query_embeddings is None) == (query_texts is None):
+            raise ValueError("Pass exactly one of query_embeddings or query_texts")
+        if query_texts is not None and self.embedding_backend is not None:
+            query_embeddings = self.embedding_backend.embed_documents(list(query_texts))
+            query_texts = None
+
+        total = len(query_embeddings) if query_embeddings is not None else len(query_texts)
+        batch_size = batch_size or self.batch_size
+        extra = {"include": include} if include is not None else {}
+        merged: Dict[str, Any] = {}
+
+        for start in range(0, total, batch_size):
+            stop = min(start + batch_size, total)
+            if query_embeddings is not None:
+                result = self.collection.query(
+                    query_embeddings=_slice_vectors(query_embeddings, start, stop),
+                    n_results=n_results, where=where, **extra
+                )
+            else:
+                result = self.collection.query(
+                    query_texts=list(query_texts[start:stop]), n_results=n_results, where=where, **extra
+                )
+            for key, values in result.items():
+                if key in _PER_QUERY_KEYS and values is not None:
+                    merged.setdefault(key, []).extend(values)
+                else:
+                    merged.setdefault(key, values)
+
+        return merged
@@ -0,0 +1,300 @@
+"""
+Near-duplicate detection with MinHash signatures and LSH banding.
+
+The same news article syndicated to twenty sites differs in boilerplate,
+so content hashes never match. Two texts are near-duplicates when the
+Jaccard similarity of their word shingles (runs of ``shingle_size``
+words) reaches a threshold. A MinHash signature estimates that
+similarity. LSH splits each signature into bands, and documents that
+share any band are candidates. A lookup is therefore one dict probe per
+band, and each candidate is then checked against the threshold on its
+full signature.
+
+``NearDuplicateIndex`` keeps the buckets in memory and, given a path,
+persists signatures to SQLite so the index survives restarts and grows
+incrementally across runs.
+
+Example:
+    >>> index = NearDuplicateIndex("~/.webis/near_duplicates.db", threshold=0.8)
+    >>> signature = index.signature(doc.clean_content)
+    >>> index.match_or_insert(doc.id, signature)    # None if new, else (id, similarity)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Permutations are (a * x + b) mod p over 32-bit shingle hashes; with a
+# and b below 2**31 the products fit in uint64, so NumPy and pure Python
+# produce the same signatures
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_COEFFICIENT_LIMIT = 1 << 31
+
+# Signatures persisted per transaction
+_FLUSH_EVERY = 1000
+
+
+def _numpy() -> Optional[Any]:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def shingle_hashes(text: str, size: int = 5) -> Set[int]:
+    """32-bit hashes of the lower-cased word ``size``-grams of ``text``."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+@lru_cache(maxsize=None)
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band for a Jaccard ``threshold``.
+
+    Two documents of similarity s share a band with probability
+    1 - (1 - s**r)**b. This picks the (b, r) whose curve has the least
+    weighted error: probability mass below the threshold (false
+    candidates) plus missing mass above it (missed duplicates). Missed
+    duplicates weigh more, because candidates are verified anyway.
+    """
+    if not 0 < threshold < 1:
+        raise ValueError(f"threshold must be between 0 and 1, got {threshold}")
+    steps = 200
+
+    def area(bands: int, rows: int, low: float, high: float, missed: bool) -> float:
+        width = (high - low) / steps
+        total = 0.0
+        for i in range(steps):
+            s = low + (i + 0.5) * width
+            p = 1 - (1 - s ** rows) ** bands
+            total += (1 - p if missed else p) * width
+        return total
+
+    best, best_error = (1, num_perm), float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = (
+            0.3 * area(bands, rows, 0.0, threshold, missed=False)
+            + 0.7 * area(bands, rows, threshold, 1.0, missed=True)
+        )
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class MinHasher:
+    """
+    MinHash signatures of shingle sets.
+
+    Args:
+        num_perm: Signature length
+        seed: Seed of the permutations; signatures are only comparable
+            between hashers with the same seed and length
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.randrange(1, _COEFFICIENT_LIMIT) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, _COEFFICIENT_LIMIT) for _ in range(num_perm)]
+        np = _numpy()
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)
+            self._b = np.array(self.b, dtype=np.uint64)
+
+    def signature(self, hashes: Sequence[int]) -> array:
+        """Signature of a non-empty set of 32-bit hashes, as ``array('I')``."""
+        np = _numpy()
+        if np is not None:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            permuted = (np.outer(values, self._a) + self._b) % _PRIME & _MAX_HASH
+            return array("I", permuted.min(axis=0).astype(np.uint32).tobytes())
+        return array("I", [
+            min(((a * x + b) % _PRIME) & _MAX_HASH for x in hashes)
+            for a, b in zip(self.a, self.b)
+        ])
+
+
+def similarity(first: array, second: array) -> float:
+    """Jaccard similarity estimated from two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH index of document signatures.
+
+    Args:
+        path: SQLite file keeping signatures across runs (None = memory only)
+        threshold: Jaccard similarity from which documents are near-duplicates
+        num_perm: MinHash signature length
+        shingle_size: Words per shingle
+        seed: Permutation seed
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        self.path = os.path.expanduser(path) if path else None
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[str, array] = {}
+        self._pending: List[Tuple[str, bytes]] = []
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # One connection, only used with the lock held
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS params (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS signatures (doc_id TEXT PRIMARY KEY, signature BLOB NOT NULL)"
+            )
+            self._check_params({"num_perm": num_perm, "seed": seed, "shingle_size": shingle_size})
+            for doc_id, blob in self._conn.execute("SELECT doc_id, signature FROM signatures"):
+                signature = array("I")
+                signature.frombytes(blob)
+                self._add(doc_id, signature)
+
+    def _check_params(self, params: Dict[str, int]) -> None:
+        stored = dict(self._conn.execute("SELECT name, value FROM params"))
+        if not stored:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO params (name, value) VALUES (?, ?)",
+                    [(name, str(value)) for name, value in params.items()],
+                )
+            return
+        changed = [name for name, value in params.items() if stored.get(name) != str(value)]
+        if changed:
+            raise ValueError(
+                f"Near-duplicate index {self.path} was built with "
+                + ", ".join(f"{name}={stored.get(name)}" for name in changed)
+            )
+
+    def signature(self, text: Optional[str]) -> Optional[array]:
+        """MinHash signature of a text, or None if it has no words."""
+        hashes = shingle_hashes(text or "", self.shingle_size)
+        if not hashes:
+            return None
+        return self.hasher.signature(list(hashes))
+
+    def _band_keys(self, signature: array) -> List[bytes]:
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def _add(self, doc_id: str, signature: array) -> None:
+        # Called with the lock held (or from __init__)
+        if doc_id in self._signatures:
+            return
+        self._signatures[doc_id] = signature
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(key, []).append(doc_id)
+
+    def _query(self, signature: array, threshold: float) -> List[Tuple[str, float]]:
+        candidates: Set[str] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        matches = [(doc_id, similarity(signature, self._signatures[doc_id])) for doc_id in candidates]
+        return sorted((m for m in matches if m[1] >= threshold), key=lambda m: -m[1])
+
+    def query(self, signature: array, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Indexed documents similar to ``signature``, most similar first."""
+        with self._lock:
+            return self._query(signature, self.threshold if threshold is None else threshold)
+
+    def insert(self, doc_id: str, signature: array) -> None:
+        with self._lock:
+            self._insert(doc_id, signature)
+
+    def _insert(self, doc_id: str, signature: array) -> None:
+        self._add(doc_id, signature)
+        if self._conn is not None:
+            self._pending.append((doc_id, signature.tobytes()))
+            if len(self._pending) >= _FLUSH_EVERY:
+                self._flush()
+
+    def match_or_insert(self, doc_id: str, signature: array) -> Optional[Tuple[str, float]]:
+        """
+        Atomically look up a document and index it if it is new.
+
+        Returns:
+            ``(doc_id, similarity)`` of the closest indexed near-duplicate,
+            or None if the document was new and has been inserted (or was
+            already indexed under ``doc_id``, e.g. when it is reprocessed)
+        """
+        with self._lock:
+            if doc_id in self._signatures:
+                return None
+            matches = self._query(signature, self.threshold)
+            if matches:
+                return matches[0]
+            self._insert(doc_id, signature)
+            return None
+
+    def _flush(self) -> None:
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO signatures (doc_id, signature) VALUES (?, ?)", self._pending
+                )
+            self._pending.clear()
+
+    def flush(self) -> None:
+        """Persist signatures inserted since the last flush."""
+        with self._lock:
+            if self._conn is not None:
+                self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush()
+                self._conn.close()
+                self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._signatures
+
+
+__all__ = [
+    "NearDuplicateIndex",
+    "MinHasher",
+    "shingle_hashes",
+    "lsh_params",
+    "similarity",
+]
@@ -0,0 +1,1127 @@
+"""
+Pipeline engine for Webis.
+
+Orchestrates the execution of source plugins, processors, and extractors
+in a configurable workflow.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+
+from webis.core.schema import (
+    WebisDocument,
+    StructuredResult,
+    PipelineContext,
+    DocumentStatus,
+)
+from webis.core.plugin import (
+    SourcePlugin,
+    ProcessorPlugin,
+    ExtractorPlugin,
+    PluginRegistry,
+    EXECUTOR_MODES,
+    get_default_registry,
+)
+from webis.core.execution.distributed_executor import DistributedExecutor
+from webis.core.pipeline.dag import DagScheduler, critical_path
+from webis.core.pipeline.stream import StreamPipeline
+from webis.core.utils.errors import WebisError
+
+logger = logging.getLogger(__name__)
+
+
+class _StageFailure(Exception):
+    """Raised when a stage fails fatally; carries the documents produced so far."""
+    
+    def __init__(self, documents: List[WebisDocument]):
+        super().__init__("Pipeline stage failed")
+        self.documents = documents
+
+
+class PipelineStreamError(WebisError):
+    """
+    Raised by ``Pipeline.run_stream`` once the stream is exhausted, if a
+    stage failed without ``continue_on_error`` and dropped documents.
+    """
+    
+    def __init__(self, failed_stages: List[str], errors: List[Dict[str, Any]]):
+        super().__init__(
+            f"Streaming stages failed: {failed_stages}",
+            suggestion="Inspect .errors, or set continue_on_error on stages that may fail",
+            code="PIPELINE_STREAM_FAILED",
+        )
+        self.failed_stages = failed_stages
+        self.errors = errors
+
+
+# Marks a dict key or model attribute absent from one of the copies
+_MISSING = object()
+
+
+def _merge_branch_value(base: Any, first: Any, other: Any, path: str, conflicts: List[str]) -> Any:
+    """
+    Three-way merge of one value of two branch copies of a document.
+    
+    A change made on only one branch is kept. Models and dicts are merged
+    per field and key, and lists that both branches extended are joined.
+    Where both branches changed a value differently, ``first`` wins and
+    ``path`` (the dotted prefix of the value) is recorded in ``conflicts``.
+    """
+    if other == first or other == base:
+        return first
+    if first == base:
+        return other
+    if base is _MISSING and type(first) is type(other) and isinstance(first, (dict, list)):
+        # Both branches added the same key: merge from empty
+        base = type(first)()
+    
+    if isinstance(first, BaseModel) and type(first) is type(other) is type(base):
+        names = set(type(first).model_fields)
+        for model in (base, first, other):
+            names.update(model.model_extra or {})
+        for name in sorted(names):
+            value = getattr(first, name, _MISSING)
+            merged = _merge_branch_value(
+                getattr(base, name, _MISSING), value, getattr(other, name, _MISSING), f"{path}{name}.", conflicts
+            )
+            if merged is not value and merged is not _MISSING:
+                setattr(first, name, merged)
+        return first
+    
+    if isinstance(first, dict) and isinstance(other, dict) and isinstance(base, dict):
+        merged_dict = {}
+        for key in [*first, *(key for key in other if key not in first)]:
+            value = _merge_branch_value(
+                base.get(key, _MISSING), first.get(key, _MISSING), other.get(key, _MISSING),
+                f"{path}{key}.", conflicts,
+            )
+            if value is not _MISSING:
+                merged_dict[key] = value
+        return merged_dict
+    
+    if (
+        isinstance(first, list) and isinstance(other, list) and isinstance(base, list)
+        and first[:len(base)] == base and other[:len(base)] == base
+    ):
+        return first + [item for item in other[len(base):] if item not in first]
+    
+    conflicts.append(path.rstrip("."))
+    return first
+
+
+@dataclass
+class PipelineStage:
+    """Represents a single stage in the pipeline."""
+    
+    name: str
+    plugin_name: str
+    plugin_type: str  # "source", "processor", "extractor"
+    config: Dict[str, Any] = field(default_factory=dict)
+    
+    # Execution control
+    enabled: bool = True
+    continue_on_error: bool = False
+    timeout_seconds: Optional[float] = None
+    max_retries: int = 0
+    condition: Optional[Callable[[PipelineContext, List[WebisDocument]], bool]] = None
+    
+    # DAG wiring: names of stages whose output feeds this stage
+    depends_on: List[str] = field(default_factory=list)
+    
+    # Processor parallelism (None = use the plugin's defaults)
+    concurrency: Optional[int] = None
+    executor: Optional[str] = None  # "thread", "process", "async"
+
+    def should_run(self, context: PipelineContext, documents: List[WebisDocument]) -> bool:
+        """Check if this stage should run based on condition."""
+        if not self.enabled:
+            return False
+        if self.condition:
+            try:
+                return self.condition(context, documents)
+            except Exception as e:
+                logger.warning(f"Condition check failed for stage {self.name}: {e}")
+                return False
+        return True
+
+
+@dataclass
+class PipelineResult:
+    """Result of a pipeline execution."""
+    
+    success: bool
+    documents: List[WebisDocument]
+    structured_results: List[StructuredResult]
+    context: PipelineContext
+    
+    # Timing
+    started_at: float = 0.0
+    completed_at: float = 0.0
+    
+    # Error tracking
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    
+    # Per-stage wall time (seconds) and the longest dependency chain
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    critical_path_seconds: float = 0.0
+    
+    @property
+    def duration_seconds(self) -> float:
+        return self.completed_at - self.started_at
+    
+    @property
+    def total_stage_seconds(self) -> float:
+        """Sum of all stage wall times (what a serial run would have taken)."""
+        return sum(self.stage_timings.values())
+    
+    @property
+    def document_count(self) -> int:
+        return len(self.documents)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "success": self.success,
+            "document_count": self.document_count,
+            "duration_seconds": self.duration_seconds,
+            "errors": self.errors,
+            "stage_timings": self.stage_timings,
+            "critical_path": self.critical_path,
+            "critical_path_seconds": self.critical_path_seconds,
+            "tokens_used": self.context.total_tokens_used,
+            "cost_usd": self.context.total_cost_usd,
+        }
+
+
+class Pipeline:
+    """
+    The main pipeline engine for Webis.
+    
+    Coordinates the flow of data through source plugins, processors,
+    and extractors.
+    
+    Example:
+        >>> pipe = Pipeline()
+        >>> pipe.add_source("news_api")
+        >>> pipe.add_processor("html_cleaner")
+        >>> pipe.add_processor("chunker")
+        >>> pipe.add_extractor("news_extractor")
+        >>> result = pipe.run("Latest AI news")
+    
+    Stages that declare ``depends_on`` switch the pipeline to DAG mode, where
+    stages without a dependency between them run concurrently:
+    
+        >>> pipe = Pipeline()
+        >>> pipe.add_source("gnews")
+        >>> pipe.add_source("github")
+        >>> pipe.add_processor("html_fetcher", depends_on=["source_gnews", "source_github"])
+    """
+    
+    def __init__(
+        self,
+        registry: Optional[PluginRegistry] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        self.registry = registry or get_default_registry()
+        self.config = config or {}
+        
+        self._stages: List[PipelineStage] = []
+        self._hooks: Dict[str, List[Callable]] = {
+            "before_run": [],
+            "after_run": [],
+            "before_stage": [],
+            "after_stage": [],
+            "on_error": [],
+        }
+        
+        # Processor worker pools, kept per (run, stage) for a whole run
+        self._pools: Dict[Tuple[str, str], DistributedExecutor] = {}
+        self._pools_lock = threading.Lock()
+    
+    def add_source(
+        self, 
+        plugin_name: str, 
+        stage_name: Optional[str] = None,
+        condition: Optional[Callable] = None,
+        max_retries: int = 0,
+        depends_on: Optional[List[str]] = None,
+        **config
+    ) -> "Pipeline":
+        """Add a source plugin stage."""
+        self._stages.append(PipelineStage(
+            name=stage_name or f"source_{plugin_name}",
+            plugin_name=plugin_name,
+            plugin_type="source",
+            config=config,
+            condition=condition,
+            max_retries=max_retries,
+            depends_on=list(depends_on or []),
+        ))
+        return self
+    
+    def add_processor(
+        self, 
+        plugin_name: str, 
+        stage_name: Optional[str] = None,
+        condition: Optional[Callable] = None,
+        max_retries: int = 0,
+        depends_on: Optional[List[str]] = None,
+        concurrency: Optional[int] = None,
+        executor: Optional[str] = None,
+        **config
+    ) -> "Pipeline":
+        """
+        Add a processor plugin stage.
+        
+        ``concurrency`` and ``executor`` ("thread", "process" or "async")
+        control how many documents the stage processes at once; by default
+        the plugin's ``default_concurrency``/``default_executor`` apply.
+        """
+        if executor is not None and executor not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor '{executor}'. Available: {EXECUTOR_MODES}")
+        self._stages.append(PipelineStage(
+            name=stage_name or f"process_{plugin_name}",
+            plugin_name=plugin_name,
+            plugin_type="processor",
+            config=config,
+            condition=condition,
+            max_retries=max_retries,
+            depends_on=list(depends_on or []),
+            concurrency=concurrency,
+            executor=executor,
+        ))
+        return self
+    
+    def add_extractor(
+        self, 
+        plugin_name: str, 
+        stage_name: Optional[str] = None,
+        condition: Optional[Callable] = None,
+        max_retries: int = 0,
+        depends_on: Optional[List[str]] = None,
+        **config
+    ) -> "Pipeline":
+        """Add an extractor plugin stage."""
+        self._stages.append(PipelineStage(
+            name=stage_name or f"extract_{plugin_name}",
+            plugin_name=plugin_name,
+            plugin_type="extractor",
+            config=config,
+            condition=condition,
+            max_retries=max_retries,
+            depends_on=list(depends_on or []),
+        ))
+        return self
+    
+    def add_hook(self, event: str, callback: Callable) -> "Pipeline":
+        """
+        Add a hook callback for pipeline events.
+        
+        Events:
+        - before_run: Called before pipeline starts
+        - after_run: Called after pipeline completes
+        - before_stage: Called before each stage
+        - after_stage: Called after each stage
+        - on_error: Called when an error occurs
+        """
+        if event not in self._hooks:
+            raise ValueError(f"Unknown event: {event}")
+        self._hooks[event].append(callback)
+        return self
+    
+    def _trigger_hooks(self, event: str, **kwargs) -> None:
+        """Trigger all hooks for an event."""
+        for callback in self._hooks.get(event, []):
+            try:
+                callback(**kwargs)
+            except Exception as e:
+                logger.warning(f"Hook error for {event}: {e}")
+    
+    def run(
+        self,
+        task: str,
+        limit: int = 10,
+        output_dir: Optional[str] = None,
+        dag: Optional[bool] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> PipelineResult:
+        """
+        Execute the pipeline.
+        
+        Args:
+            task: Natural language task description
+            limit: Maximum documents to fetch (per source stage)
+            output_dir: Output directory for results
+            dag: Force DAG (True) or linear (False) execution. By default DAG
+                mode is used when any stage declares ``depends_on`` or the
+                pipeline config sets ``"dag": True``.
+            stream: Pipe documents through the processor stages as they are
+                fetched (see ``run_stream``); extractor stages then run on the
+                collected output. Accepts ``batch_size`` and ``queue_size``.
+            **kwargs: Additional parameters passed to plugins
+            
+        Returns:
+            PipelineResult with documents and structured data
+        """
+        started_at = time.time()
+        
+        # Initialize context
+        context = PipelineContext(
+            task=task,
+            config=self.config,
+            output_dir=output_dir,
+        )
+        
+        documents: List[WebisDocument] = []
+        structured_results: List[StructuredResult] = []
+        errors: List[Dict[str, Any]] = []
+        stage_timings: Dict[str, float] = {}
+        
+        if dag is None:
+            dag = bool(self.config.get("dag")) or any(s.depends_on for s in self._stages)
+        # Invalid graphs (unknown dependencies, cycles) are configuration errors
+        dependencies = self._stage_dependencies() if dag and not stream else None
+        
+        self._trigger_hooks("before_run", context=context)
+        
+        success = True
+        try:
+            if stream:
+                documents = self._run_streaming(
+                    context, structured_results, errors, stage_timings, limit=limit, **kwargs
+                )
+            elif dependencies is not None:
+                documents = self._run_dag(
+                    dependencies, context, structured_results, errors, stage_timings,
+                    limit=limit, **kwargs
+                )
+            else:
+                documents = self._run_linear(
+                    context, structured_results, errors, stage_timings, limit=limit, **kwargs
+                )
+        except _StageFailure as e:
+            logger.error(f"Pipeline failed: {e.__cause__}")
+            documents = e.documents
+            success = False
+        except Exception as e:
+            logger.error(f"Pipeline failed: {e}")
+            success = False
+        finally:
+            self._close_pools(context)
+        
+        if success:
+            self._trigger_hooks("after_run", context=context)
+        
+        if stream:
+            # Stages overlap for the whole run, so there is no single chain
+            path_seconds, path = 0.0, []
+        else:
+            path_seconds, path = critical_path(
+                dependencies or self._linear_dependencies(stage_timings),
+                stage_timings,
+            )
+        
+        return PipelineResult(
+            success=success,
+            documents=documents,
+            structured_results=structured_results,
+            context=context,
+            started_at=started_at,
+            completed_at=time.time(),
+            errors=errors,
+            stage_timings=stage_timings,
+            critical_path=[name for name in path if name in stage_timings],
+            critical_path_seconds=path_seconds,
+        )
+    
+    def _run_linear(
+        self,
+        context: PipelineContext,
+        structured_results: List[StructuredResult],
+        errors: List[Dict[str, Any]],
+        stage_timings: Dict[str, float],
+        limit: int = 10,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """Run stages one after another, each replacing the document list."""
+        documents: List[WebisDocument] = []
+        for stage in self._stages:
+            if not stage.should_run(context, documents):
+                logger.info(f"Skipping stage {stage.name} (condition not met or disabled)")
+                continue
+            
+            context.current_stage = stage.name
+            self._trigger_hooks("before_stage", stage=stage, context=context)
+            
+            stage_started = time.time()
+            try:
+                result = self._execute_stage(stage, documents, context, limit=limit, **kwargs)
+                
+                # Update state based on result type
+                if stage.plugin_type in ("source", "processor"):
+                    documents = result
+                elif stage.plugin_type == "extractor" and result:
+                    structured_results.append(result)
+                
+                self._trigger_hooks("after_stage", stage=stage, context=context)
+                
+            except Exception as e:
+                self._record_error(stage, e, errors, context)
+                if not stage.continue_on_error:
+                    # Surface the partial state gathered so far
+                    raise _StageFailure(documents) from e
+            finally:
+                stage_timings[stage.name] = time.time() - stage_started
+        
+        return documents
+    
+    def _run_dag(
+        self,
+        dependencies: Dict[str, List[str]],
+        context: PipelineContext,
+        structured_results: List[StructuredResult],
+        errors: List[Dict[str, Any]],
+        stage_timings: Dict[str, float],
+        limit: int = 10,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """
+        Run stages as a dependency graph on a bounded worker pool.
+        
+        Each stage receives the merged output of its upstream stages. An
+        output feeding several stages is copied for each of them, since
+        concurrent branches would otherwise mutate the same documents. Where
+        branches meet again, the copies of a document are merged: what each
+        branch changed relative to the document before the fork is kept, and
+        if two branches changed the same value differently, the first
+        upstream stage wins (with a warning). The final document list is the
+        merged output of all sink stages.
+        
+        Stages run concurrently, so ``context.current_stage`` is not set;
+        stage hooks receive the stage instead.
+        """
+        stages = {stage.name: stage for stage in self._stages}
+        outputs: Dict[str, List[WebisDocument]] = {}
+        extracted: Dict[str, StructuredResult] = {}
+        consumers = Counter(dep for deps in dependencies.values() for dep in deps)
+        # Documents as they were at the outermost fork, for merging branches
+        fork_bases: Dict[str, WebisDocument] = {}
+        
+        def branch_copies(dep: str) -> List[WebisDocument]:
+            if consumers[dep] <= 1:
+                return outputs[dep]
+            for doc in outputs[dep]:
+                fork_bases.setdefault(doc.id, doc)
+            return [doc.model_copy(deep=True) for doc in outputs[dep]]
+        
+        def stage_inputs(name: str) -> List[WebisDocument]:
+            return self._merge_documents((branch_copies(dep) for dep in dependencies[name]), fork_bases)
+        
+        def run_stage(name: str) -> List[WebisDocument]:
+            stage = stages[name]
+            inputs = stage_inputs(name)
+            passthrough = [] if stage.plugin_type == "source" else inputs
+            
+            if not stage.should_run(context, inputs):
+                logger.info(f"Skipping stage {stage.name} (condition not met or disabled)")
+                outputs[name] = passthrough
+                return passthrough
+            
+            self._trigger_hooks("before_stage", stage=stage, context=context)
+            
+            try:
+                result = self._execute_stage(stage, inputs, context, limit=limit, **kwargs)
+            except Exception as e:
+                self._record_error(stage, e, errors, context)
+                if not stage.continue_on_error:
+                    raise
+                outputs[name] = passthrough
+                return passthrough
+            
+            if stage.plugin_type == "extractor":
+                if result:
+                    extracted[name] = result
+                result = inputs
+            
+            self._trigger_hooks("after_stage", stage=stage, context=context)
+            outputs[name] = result
+            return result
+        
+        max_workers = self.config.get("max_workers", 4)
+        run_result = DagScheduler(dependencies, max_workers=max_workers).run(run_stage)
+        
+        for name, timing in run_result.timings.items():
+            stage_timings[name] = timing.duration_seconds
+        structured_results.extend(
+            extracted[name] for name in dependencies if name in extracted
+        )
+        
+        upstream = {dep for deps in dependencies.values() for dep in deps}
+        documents = self._merge_documents(
+            (outputs[name] for name in dependencies if name not in upstream and name in outputs), fork_bases
+        )
+        
+        if run_result.error is not None:
+            raise _StageFailure(documents) from run_result.error
+        return documents
+    
+    def run_stream(
+        self,
+        task: str,
+        limit: int = 10,
+        output_dir: Optional[str] = None,
+        batch_size: int = 8,
+        queue_size: int = 32,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> Iterator[WebisDocument]:
+        """
+        Execute the source and processor stages as a stream.
+        
+        Each processor stage runs in its own thread, connected to its
+        neighbours by bounded queues. Documents are yielded as soon as they
+        have passed through every processor, and a slow stage throttles the
+        sources instead of letting fetched documents pile up in memory.
+        
+        Extractor stages need the complete document set and are not run
+        here; use ``run(task, stream=True)`` to run them on the output.
+        Stage ``depends_on`` wiring is ignored: all sources feed the first
+        processor. Source stages are not retried, since a partially
+        consumed fetch cannot be replayed.
+        
+        Stage errors are appended to ``context.get("stream_errors")`` as
+        they happen. A stage that fails without ``continue_on_error`` drops
+        the documents it was processing; the stream then raises
+        ``PipelineStreamError`` after yielding everything else.
+        
+        Args:
+            task: Natural language task description
+            limit: Maximum documents to fetch (per source stage)
+            output_dir: Output directory for results
+            batch_size: Maximum documents handed to ``process_batch`` at once
+            queue_size: Capacity of each inter-stage queue
+            context: Optional context to run in (to inspect state afterwards)
+            **kwargs: Additional parameters passed to plugins
+            
+        Yields:
+            Processed documents, in completion order
+        
+        Raises:
+            PipelineStreamError: If a stage failed without ``continue_on_error``
+        """
+        context = context or PipelineContext(
+            task=task,
+            config=self.config,
+            output_dir=output_dir,
+        )
+        errors: List[Dict[str, Any]] = []
+        failures: List[str] = []
+        context.set("stream_errors", errors)
+        stream, sources = self._build_stream(
+            context, errors, failures, limit=limit, batch_size=batch_size, queue_size=queue_size, **kwargs
+        )
+        try:
+            yield from stream.run(sources, context)
+        finally:
+            self._close_pools(context)
+        if failures:
+            raise PipelineStreamError(sorted(set(failures)), errors)
+    
+    def _run_streaming(
+        self,
+        context: PipelineContext,
+        structured_results: List[StructuredResult],
+        errors: List[Dict[str, Any]],
+        stage_timings: Dict[str, float],
+        limit: int = 10,
+        batch_size: int = 8,
+        queue_size: int = 32,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """Stream sources through processors, then run extractors on the output."""
+        failures: List[str] = []
+        stream, sources = self._build_stream(
+            context, errors, failures,
+            limit=limit, batch_size=batch_size, queue_size=queue_size, **kwargs
+        )
+        documents = list(stream.run(sources, context))
+        stage_timings.update(stream.stage_timings)
+        if failures:
+            raise _StageFailure(documents) from RuntimeError(
+                f"Streaming stages failed: {sorted(set(failures))}"
+            )
+        
+        for stage in self._stages:
+            if stage.plugin_type != "extractor":
+                continue
+            if not stage.should_run(context, documents):
+                logger.info(f"Skipping stage {stage.name} (condition not met or disabled)")
+                continue
+            
+            context.current_stage = stage.name
+            self._trigger_hooks("before_stage", stage=stage, context=context)
+            stage_started = time.time()
+            try:
+                result = self._execute_stage(stage, documents, context, **kwargs)
+                if result:
+                    structured_results.append(result)
+                self._trigger_hooks("after_stage", stage=stage, context=context)
+            except Exception as e:
+                self._record_error(stage, e, errors, context)
+                if not stage.continue_on_error:
+                    raise _StageFailure(documents) from e
+            finally:
+                stage_timings[stage.name] = time.time() - stage_started
+        
+        return documents
+    
+    def _build_stream(
+        self,
+        context: PipelineContext,
+        errors: List[Dict[str, Any]],
+        failures: List[str],
+        limit: int = 10,
+        batch_size: int = 8,
+        queue_size: int = 32,
+        **kwargs
+    ) -> Tuple[StreamPipeline, List[Iterator[WebisDocument]]]:
+        """
+        Translate source and processor stages into a StreamPipeline.
+        
+        Stage errors are recorded in ``errors``; stages that fail without
+        ``continue_on_error`` drop the affected documents and add their
+        name to ``failures``.
+        """
+        stream = StreamPipeline(queue_size=queue_size)
+        sources: List[Iterator[WebisDocument]] = []
+        
+        for stage in self._stages:
+            if stage.plugin_type == "source":
+                if stage.should_run(context, []):
+                    sources.append(self._guarded_source(
+                        stage, context, errors, failures, limit=limit, **kwargs
+                    ))
+            elif stage.plugin_type == "processor" and stage.enabled:
+                stream.add_stage(
+                    stage.name,
+                    self._stream_processor(stage, context, errors, failures, **kwargs),
+                    batch_size=batch_size,
+                )
+        
+        return stream, sources
+    
+    def _guarded_source(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        errors: List[Dict[str, Any]],
+        failures: List[str],
+        limit: int = 10,
+        **kwargs
+    ) -> Iterator[WebisDocument]:
+        try:
+            yield from self._iter_source_stage(stage, context, limit=limit, **kwargs)
+        except Exception as e:
+            self._record_error(stage, e, errors, context)
+            if not stage.continue_on_error:
+                failures.append(stage.name)
+    
+    def _stream_processor(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        errors: List[Dict[str, Any]],
+        failures: List[str],
+        **kwargs
+    ) -> Callable[[List[WebisDocument], PipelineContext], List[WebisDocument]]:
+        """Bind a processor stage to a batch function for the stream."""
+        plugin = self.registry.get_processor(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Processor plugin not found: {stage.plugin_name}")
+        
+        plugin.initialize(context)
+        merged_kwargs = {**stage.config, **kwargs}
+        
+        def process(docs: List[WebisDocument], ctx: PipelineContext) -> List[WebisDocument]:
+            if not stage.should_run(ctx, docs):
+                return docs
+            try:
+                return self._with_retries(stage, lambda: self._process_documents(
+                    stage, plugin, docs, ctx, **merged_kwargs
+                ))
+            except Exception as e:
+                self._record_error(stage, e, errors, ctx)
+                if stage.continue_on_error:
+                    return docs
+                failures.append(stage.name)
+                return []
+        
+        return process
+    
+    def _with_retries(self, stage: PipelineStage, func: Callable[[], Any]) -> Any:
+        """Call ``func`` under the stage's retry policy."""
+        # Apply retry decorator if max_retries > 0
+        if stage.max_retries > 0:
+            func = retry(
+                stop=stop_after_attempt(stage.max_retries + 1),
+                wait=wait_exponential(multiplier=1, min=2, max=10),
+                reraise=True
+            )(func)
+        return func()
+    
+    def _execute_stage(
+        self,
+        stage: PipelineStage,
+        documents: List[WebisDocument],
+        context: PipelineContext,
+        limit: int = 10,
+        **kwargs
+    ) -> Any:
+        """Execute a single stage, applying its retry policy."""
+        def execute_stage():
+            if stage.plugin_type == "source":
+                return self._run_source_stage(
+                    stage, context, limit=limit, **kwargs
+                )
+            elif stage.plugin_type == "processor":
+                return self._run_processor_stage(
+                    stage, documents, context, **kwargs
+                )
+            elif stage.plugin_type == "extractor":
+                return self._run_extractor_stage(
+                    stage, documents, context, **kwargs
+                )
+            return None
+
+        return self._with_retries(stage, execute_stage)
+    
+    def _record_error(
+        self,
+        stage: PipelineStage,
+        error: Exception,
+        errors: List[Dict[str, Any]],
+        context: PipelineContext,
+    ) -> None:
+        error_info = {
+            "stage": stage.name,
+            "plugin": stage.plugin_name,
+            "error": str(error),
+        }
+        errors.append(error_info)
+        self._trigger_hooks("on_error", error=error_info, context=context)
+    
+    def _stage_dependencies(self) -> Dict[str, List[str]]:
+        """
+        Build the stage dependency graph used in DAG mode.
+        
+        Stages with explicit ``depends_on`` use it as-is. Source stages
+        without it are roots. Any other stage without it depends on every
+        previously declared stage that nothing depends on yet, so a plain
+        linear pipeline keeps its order and trailing stages fan in from
+        all preceding sources.
+        """
+        dependencies: Dict[str, List[str]] = {}
+        frontier: List[str] = []
+        for stage in self._stages:
+            if stage.name in dependencies:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            
+            if stage.depends_on:
+                deps = list(stage.depends_on)
+            elif stage.plugin_type == "source":
+                deps = []
+            else:
+                deps = list(frontier)
+            
+            dependencies[stage.name] = deps
+            frontier = [name for name in frontier if name not in deps] + [stage.name]
+        return dependencies
+    
+    def _linear_dependencies(self, stage_timings: Dict[str, float]) -> Dict[str, List[str]]:
+        """Dependency chain of the stages that ran in linear mode."""
+        dependencies: Dict[str, List[str]] = {}
+        previous: List[str] = []
+        for stage in self._stages:
+            if stage.name in stage_timings and stage.name not in dependencies:
+                dependencies[stage.name] = previous
+                previous = [stage.name]
+        return dependencies
+    
+    @staticmethod
+    def _merge_documents(
+        groups: Iterable[List[WebisDocument]],
+        bases: Optional[Dict[str, WebisDocument]] = None,
+    ) -> List[WebisDocument]:
+        """
+        Concatenate document lists, joining repeats of the same document ID.
+        
+        Args:
+            groups: Document lists, in upstream order
+            bases: Documents as they were before they were copied for
+                parallel branches, by ID. A repeat of one of these gets the
+                changes of its branch merged onto the first copy; other
+                repeats are dropped.
+        """
+        merged: Dict[str, WebisDocument] = {}
+        for group in groups:
+            for doc in group:
+                first = merged.setdefault(doc.id, doc)
+                base = bases.get(doc.id) if bases else None
+                if first is doc or base is None:
+                    continue
+                conflicts: List[str] = []
+                _merge_branch_value(base, first, doc, "", conflicts)
+                if conflicts:
+                    logger.warning(
+                        f"Branches changed {', '.join(conflicts)} of document {doc.id} differently; "
+                        f"keeping the value from the first upstream stage"
+                    )
+        return list(merged.values())
+    
+    def _run_source_stage(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        limit: int = 10,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """Execute a source plugin stage."""
+        documents = list(self._iter_source_stage(stage, context, limit=limit, **kwargs))
+        
+        logger.info(f"Source '{stage.plugin_name}' fetched {len(documents)} documents")
+        return documents
+    
+    def _iter_source_stage(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        limit: int = 10,
+        **kwargs
+    ) -> Iterator[WebisDocument]:
+        """Look up and initialize a source plugin, returning its document iterator."""
+        plugin = self.registry.get_source(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Source plugin not found: {stage.plugin_name}")
+        
+        plugin.initialize(context)
+        merged_kwargs = {**stage.config, **kwargs}
+        
+        def iterate() -> Iterator[WebisDocument]:
+            count = 0
+            for doc in plugin.fetch(context.task, limit=limit, context=context, **merged_kwargs):
+                doc.status = DocumentStatus.COMPLETED
+                doc.add_processing_step(stage.plugin_name, {"stage": stage.name})
+                yield doc
+                
+                count += 1
+                if count >= limit:
+                    break
+        
+        return iterate()
+    
+    def _run_processor_stage(
+        self,
+        stage: PipelineStage,
+        documents: List[WebisDocument],
+        context: PipelineContext,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """Execute a processor plugin stage."""
+        plugin = self.registry.get_processor(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Processor plugin not found: {stage.plugin_name}")
+        
+        plugin.initialize(context)
+        
+        merged_kwargs = {**stage.config, **kwargs}
+        processed = self._process_documents(stage, plugin, documents, context, **merged_kwargs)
+        
+        logger.info(
+            f"Processor '{stage.plugin_name}' processed {len(documents)} -> {len(processed)} documents"
+        )
+        return processed
+    
+    def _process_documents(
+        self,
+        stage: PipelineStage,
+        plugin: ProcessorPlugin,
+        documents: List[WebisDocument],
+        context: PipelineContext,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """Run a processor over documents with the stage's concurrency settings."""
+        concurrency = stage.concurrency or plugin.default_concurrency
+        # Offline batch mode: hand the whole stage to the plugin so its LLM
+        # calls go out as one provider batch job
+        if concurrency <= 1 or context.config.get("llm_mode") == "offline_batch":
+            return plugin.process_batch(documents, context=context, **kwargs)
+        executor = stage.executor or plugin.default_executor
+        if executor == "async" and (plugin.supports_columns or plugin.prefers_batches):
+            # Column and batch-level processors work on whole chunks, not
+            # per-document coroutines
+            executor = "thread"
+        return plugin.process_batch_concurrent(
+            documents,
+            context=context,
+            pool=self._stage_pool(stage, context, concurrency, executor),
+            **kwargs
+        )
+    
+    def _stage_pool(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        concurrency: int,
+        executor: str,
+    ) -> DistributedExecutor:
+        """The stage's worker pool for this run, created on first use."""
+        key = (context.run_id, stage.name)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is not None and (pool.mode, pool.max_workers) == (executor, concurrency):
+                return pool
+            stale = pool
+            pool = self._pools[key] = DistributedExecutor(max_workers=concurrency, mode=executor)
+        if stale is not None:
+            stale.shutdown()
+        return pool
+    
+    def _close_pools(self, context: PipelineContext) -> None:
+        """Shut down the worker pools of a run."""
+        with self._pools_lock:
+            keys = [key for key in self._pools if key[0] == context.run_id]
+            pools = [self._pools.pop(key) for key in keys]
+        for pool in pools:
+            pool.shutdown()
+    
+    def _run_extractor_stage(
+        self,
+        stage: PipelineStage,
+        documents: List[WebisDocument],
+        context: PipelineContext,
+        **kwargs
+    ) -> Optional[StructuredResult]:
+        """Execute an extractor plugin stage."""
+        plugin = self.registry.get_extractor(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Extractor plugin not found: {stage.plugin_name}")
+        
+        if not documents:
+            logger.warning(f"No documents to extract from in stage '{stage.name}'")
+            return None
+        
+        plugin.initialize(context)
+        
+        merged_kwargs = {**stage.config, **kwargs}
+        result = plugin.extract(documents, context=context, **merged_kwargs)
+        
+        logger.info(f"Extractor '{stage.plugin_name}' produced result: {result.schema_id}")
+        return result
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], registry: Optional[PluginRegistry] = None) -> "Pipeline":
+        """
+        Create a pipeline from a configuration dictionary.
+        
+        Example config:
+            {
+                "stages": [
+                    {"type": "source", "plugin": "news_api", "config": {"api_key": "..."}},
+                    {"type": "processor", "plugin": "html_cleaner"},
+                    {"type": "extractor", "plugin": "news_extractor"}
+                ]
+            }
+        
+        Stages may name their upstream stages with ``"depends_on": [...]``
+        to run as a DAG; set ``"max_workers"`` at the top level to bound
+        how many stages run at once.
+        """
+        pipeline = cls(registry=registry, config=config)
+        
+        for stage_config in config.get("stages", []):
+            stage_type = stage_config.get("type")
+            plugin_name = stage_config.get("plugin")
+            plugin_config = stage_config.get("config", {})
+            stage_name = stage_config.get("name")
+            depends_on = stage_config.get("depends_on")
+            
+            if stage_type == "source":
+                pipeline.add_source(
+                    plugin_name, stage_name=stage_name, depends_on=depends_on, **plugin_config
+                )
+            elif stage_type == "processor":
+                pipeline.add_processor(
+                    plugin_name,
+                    stage_name=stage_name,
+                    depends_on=depends_on,
+                    concurrency=stage_config.get("concurrency"),
+                    executor=stage_config.get("executor"),
+                    **plugin_config
+                )
+            elif stage_type == "extractor":
+                pipeline.add_extractor(
+                    plugin_name, stage_name=stage_name, depends_on=depends_on, **plugin_config
+                )
+        
+        return pipeline
+    
+    @classmethod
+    def from_preset(cls, preset_name: str, registry: Optional[PluginRegistry] = None) -> "Pipeline":
+        """
+        Create a pipeline from a preset configuration.
+        
+        Available presets:
+        - "news_analyst": Fetch and analyze news articles
+        - "research_assistant": Fetch and summarize academic papers
+        - "web_scraper": General web scraping and cleaning
+        """
+        presets = {
+            "news_analyst": {
+                "stages": [
+                    {"type": "source", "plugin": "news_search"},
+                    {"type": "processor", "plugin": "html_cleaner"},
+                    # Syndicated copies of an article stop here, before chunking and LLM calls
+                    {"type": "processor", "plugin": "near_dedup"},
+                    {"type": "processor", "plugin": "chunker"},
+                    {"type": "extractor", "plugin": "news_extractor"},
+                ]
+            },
+            "research_assistant": {
+                "stages": [
+                    {"type": "source", "plugin": "semantic_scholar"},
+                    {"type": "processor", "plugin": "pdf_extractor"},
+                    {"type": "processor", "plugin": "chunker"},
+                    {"type": "extractor", "plugin": "paper_summarizer"},
+                ]
+            },
+            "web_scraper": {
+                "stages": [
+                    {"type": "source", "plugin": "web_search"},
+                    {"type": "processor", "plugin": "html_cleaner"},
+                ]
+            },
+        }
+        
+        if preset_name not in presets:
+            raise ValueError(f"Unknown preset: {preset_name}. Available: {list(presets.keys())}")
+        
+        return cls.from_config(presets[preset_name], registry=registry)
+
+
+__all__ = [
+    "PipelineStage",
+    "PipelineResult",
+    "Pipeline",
+    "PipelineStreamError",
+]
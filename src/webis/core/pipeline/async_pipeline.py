@@ -0,0 +1,256 @@
+"""
+Asyncio pipeline runner for Webis.
+
+Drives every stage on a single event loop using the async plugin
+protocol (``afetch`` / ``aprocess_batch`` / ``aextract``). Sources fetch
+concurrently; each processor stage then handles all documents in one
+``aprocess_batch`` call, which fans out ``aprocess`` under the stage's
+concurrency bound (so thousands of fetches and LLM calls can be in
+flight per worker) or keeps a plugin's batch implementation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from webis.core.pipeline import Pipeline, PipelineResult, PipelineStage
+from webis.core.schema import (
+    WebisDocument,
+    StructuredResult,
+    PipelineContext,
+    DocumentStatus,
+)
+from webis.core.plugin import ProcessorPlugin
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPipeline(Pipeline):
+    """
+    Pipeline variant executed with asyncio.
+
+    Stages are declared exactly as for Pipeline. All source stages run
+    concurrently; processor and extractor stages then run in order on the
+    collected output (in source order). A processor stage handles at most
+    ``concurrency`` documents at a time, defaulting to the pipeline config
+    value ``"stage_concurrency"`` (64), and a failing document cancels
+    the rest of its stage. Stage ``depends_on`` wiring is not used here.
+
+    Plugins that only implement the sync interface are offloaded to the
+    event loop's default thread pool by the base-class adapters; those
+    overriding ``process_batch`` or ``process_columns`` get the whole
+    stage in one call.
+
+    Example:
+        >>> pipe = AsyncPipeline()
+        >>> pipe.add_source("hackernews")
+        >>> pipe.add_processor("html_fetcher", concurrency=200)
+        >>> pipe.add_processor("summarizer", concurrency=32)
+        >>> result = asyncio.run(pipe.arun("AI agents", limit=500))
+    """
+
+    default_stage_concurrency: int = 64
+
+    async def arun(
+        self,
+        task: str,
+        limit: int = 10,
+        output_dir: Optional[str] = None,
+        **kwargs
+    ) -> PipelineResult:
+        """
+        Execute the pipeline on the running event loop.
+
+        Args:
+            task: Natural language task description
+            limit: Maximum documents to fetch (per source stage)
+            output_dir: Output directory for results
+            **kwargs: Additional parameters passed to plugins
+
+        Returns:
+            PipelineResult with documents and structured data
+        """
+        started_at = time.time()
+
+        context = PipelineContext(
+            task=task,
+            config=self.config,
+            output_dir=output_dir,
+        )
+
+        errors: List[Dict[str, Any]] = []
+        spans: Dict[str, List[float]] = {}
+        structured_results: List[StructuredResult] = []
+        failed = False
+
+        self._trigger_hooks("before_run", context=context)
+
+        fetched: Dict[int, List[WebisDocument]] = {}
+
+        def record_span(stage: PipelineStage, stage_started: float) -> None:
+            span = spans.setdefault(stage.name, [stage_started, stage_started])
+            span[0] = min(span[0], stage_started)
+            span[1] = max(span[1], time.time())
+
+        def handle_error(stage: PipelineStage, error: Exception) -> bool:
+            """Record a stage error; returns True if the run should stop."""
+            nonlocal failed
+            self._record_error(stage, error, errors, context)
+            if not stage.continue_on_error:
+                failed = True
+            return failed
+
+        async def run_source(index: int, stage: PipelineStage) -> None:
+            stage_started = time.time()
+            docs = fetched[index] = []
+            try:
+                plugin = self.registry.get_source(stage.plugin_name)
+                if not plugin:
+                    raise ValueError(f"Source plugin not found: {stage.plugin_name}")
+                plugin.initialize(context)
+
+                merged_kwargs = {**stage.config, **kwargs}
+                async for doc in plugin.afetch(
+                    context.task, limit=limit, context=context, **merged_kwargs
+                ):
+                    doc.status = DocumentStatus.COMPLETED
+                    doc.add_processing_step(stage.plugin_name, {"stage": stage.name})
+                    docs.append(doc)
+                    if len(docs) >= limit or failed:
+                        break
+                logger.info(f"Source '{stage.plugin_name}' fetched {len(docs)} documents")
+            except Exception as e:
+                handle_error(stage, e)
+            finally:
+                record_span(stage, stage_started)
+
+        # Processors are resolved before fetching, so a missing plugin fails fast
+        processors: Dict[str, Tuple[ProcessorPlugin, int, Dict[str, Any]]] = {}
+        for stage in self._stages:
+            if stage.plugin_type != "processor" or not stage.enabled:
+                continue
+            try:
+                processors[stage.name] = self._bind_processor(stage, context, **kwargs)
+            except Exception as e:
+                if handle_error(stage, e):
+                    break
+
+        if not failed:
+            await asyncio.gather(*(
+                run_source(index, stage)
+                for index, stage in enumerate(self._stages)
+                if stage.plugin_type == "source" and stage.should_run(context, [])
+            ))
+        documents = [doc for index in sorted(fetched) for doc in fetched[index]]
+
+        for stage in self._stages:
+            if failed:
+                break
+            if stage.plugin_type == "source":
+                continue
+            if stage.plugin_type == "processor" and stage.name not in processors:
+                # Failed to bind, with continue_on_error set
+                continue
+            if not stage.should_run(context, documents):
+                logger.info(f"Skipping stage {stage.name} (condition not met or disabled)")
+                continue
+
+            context.current_stage = stage.name
+            self._trigger_hooks("before_stage", stage=stage, context=context)
+            stage_started = time.time()
+            try:
+                if stage.plugin_type == "processor":
+                    plugin, concurrency, stage_kwargs = processors[stage.name]
+                    processed = await self._with_async_retries(
+                        stage, plugin.aprocess_batch, documents,
+                        context=context, concurrency=concurrency, **stage_kwargs
+                    )
+                    logger.info(
+                        f"Processor '{stage.plugin_name}' processed {len(documents)} -> {len(processed)} documents"
+                    )
+                    documents = processed
+                elif stage.plugin_type == "extractor":
+                    result = await self._run_async_extractor(stage, documents, context, **kwargs)
+                    if result:
+                        structured_results.append(result)
+                self._trigger_hooks("after_stage", stage=stage, context=context)
+            except Exception as e:
+                handle_error(stage, e)
+            finally:
+                record_span(stage, stage_started)
+
+        if failed:
+            logger.error("Pipeline failed")
+        else:
+            self._trigger_hooks("after_run", context=context)
+
+        return PipelineResult(
+            success=not failed,
+            documents=documents,
+            structured_results=structured_results,
+            context=context,
+            started_at=started_at,
+            completed_at=time.time(),
+            errors=errors,
+            # Active span of each stage; sources overlap, so there is no critical path
+            stage_timings={name: end - start for name, (start, end) in spans.items()},
+        )
+
+    def _bind_processor(
+        self,
+        stage: PipelineStage,
+        context: PipelineContext,
+        **kwargs
+    ) -> Tuple[ProcessorPlugin, int, Dict[str, Any]]:
+        """Resolve and initialize a processor stage with its concurrency bound."""
+        plugin = self.registry.get_processor(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Processor plugin not found: {stage.plugin_name}")
+        plugin.initialize(context)
+        concurrency = stage.concurrency or self.config.get(
+            "stage_concurrency", self.default_stage_concurrency
+        )
+        return plugin, concurrency, {**stage.config, **kwargs}
+
+    async def _run_async_extractor(
+        self,
+        stage: PipelineStage,
+        documents: List[WebisDocument],
+        context: PipelineContext,
+        **kwargs
+    ) -> Optional[StructuredResult]:
+        plugin = self.registry.get_extractor(stage.plugin_name)
+        if not plugin:
+            raise ValueError(f"Extractor plugin not found: {stage.plugin_name}")
+
+        if not documents:
+            logger.warning(f"No documents to extract from in stage '{stage.name}'")
+            return None
+
+        plugin.initialize(context)
+        merged_kwargs = {**stage.config, **kwargs}
+        result = await self._with_async_retries(
+            stage, plugin.aextract, documents, context=context, **merged_kwargs
+        )
+        logger.info(f"Extractor '{stage.plugin_name}' produced result: {result.schema_id}")
+        return result
+
+    async def _with_async_retries(self, stage: PipelineStage, func, *args, **kwargs) -> Any:
+        """Await ``func`` under the stage's retry policy."""
+        if stage.max_retries > 0:
+            func = retry(
+                stop=stop_after_attempt(stage.max_retries + 1),
+                wait=wait_exponential(multiplier=1, min=2, max=10),
+                reraise=True
+            )(func)
+        return await func(*args, **kwargs)
+
+
+__all__ = [
+    "AsyncPipeline",
+]
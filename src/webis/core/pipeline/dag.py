@@ -0,0 +1,162 @@
+"""
+DAG scheduling for the Webis pipeline engine.
+
+Resolves stage dependencies into a graph and runs every stage as soon as
+all of its upstream stages have finished, so that independent branches
+(e.g. several source stages) overlap on a bounded worker pool.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from webis.core.execution.distributed_executor import DistributedExecutor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageTiming:
+    """Wall-clock timing of a single stage execution."""
+
+    started_at: float
+    completed_at: float
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.completed_at - self.started_at
+
+
+@dataclass
+class DagRunResult:
+    """Outcome of a DAG scheduler run."""
+
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+
+def validate_dag(dependencies: Dict[str, List[str]]) -> List[str]:
+    """
+    Validate a dependency mapping and return a topological order.
+
+    Args:
+        dependencies: Mapping of node name -> names of its upstream nodes.
+            Insertion order is used to break ties, so the returned order is
+            stable with respect to declaration order.
+
+    Raises:
+        ValueError: If a node depends on an unknown node or the graph has a cycle.
+    """
+    for node, deps in dependencies.items():
+        for dep in deps:
+            if dep not in dependencies:
+                raise ValueError(f"Stage '{node}' depends on unknown stage '{dep}'")
+
+    remaining = {node: set(deps) for node, deps in dependencies.items()}
+    order: List[str] = []
+    while remaining:
+        ready = [node for node, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle detected among stages: {sorted(remaining)}")
+        for node in ready:
+            order.append(node)
+            del remaining[node]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+def critical_path(
+    dependencies: Dict[str, List[str]],
+    durations: Dict[str, float],
+) -> Tuple[float, List[str]]:
+    """
+    Compute the longest (critical) path through the DAG.
+
+    Nodes without a duration (e.g. never executed) count as zero.
+
+    Returns:
+        Tuple of (total seconds along the path, node names on the path).
+    """
+    best: Dict[str, Tuple[float, List[str]]] = {}
+    for node in validate_dag(dependencies):
+        upstream = [best[dep] for dep in dependencies[node]]
+        base_time, base_path = max(upstream, key=lambda item: item[0], default=(0.0, []))
+        best[node] = (base_time + durations.get(node, 0.0), base_path + [node])
+    return max(best.values(), key=lambda item: item[0], default=(0.0, []))
+
+
+class DagScheduler:
+    """
+    Runs a dependency graph of tasks on a bounded thread pool.
+
+    Each node is submitted once all of its dependencies have completed.
+    If a task raises, no further nodes are scheduled; in-flight tasks are
+    allowed to finish and the first error is reported in the result.
+
+    Example:
+        >>> scheduler = DagScheduler({"a": [], "b": [], "c": ["a", "b"]}, max_workers=2)
+        >>> result = scheduler.run(lambda name: name.upper())
+        >>> result.outputs["c"]
+        'C'
+    """
+
+    def __init__(self, dependencies: Dict[str, List[str]], max_workers: int = 4):
+        self.dependencies = dependencies
+        self.order = validate_dag(dependencies)
+        self.max_workers = max(1, max_workers)
+
+    def run(self, task: Callable[[str], Any]) -> DagRunResult:
+        result = DagRunResult()
+        pending = {node: set(deps) for node, deps in self.dependencies.items()}
+        running: Dict[concurrent.futures.Future, str] = {}
+
+        def timed(node: str) -> Any:
+            started_at = time.time()
+            try:
+                return task(node)
+            finally:
+                result.timings[node] = StageTiming(started_at, time.time())
+
+        with DistributedExecutor(max_workers=self.max_workers, mode="thread") as executor:
+            while pending or running:
+                if result.error is None:
+                    ready = [node for node in self.order if node in pending and not pending[node]]
+                    for node in ready:
+                        del pending[node]
+                        running[executor.submit(timed, node)] = node
+
+                if not running:
+                    # Nothing left that can make progress (upstream failed)
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    node = running.pop(future)
+                    try:
+                        result.outputs[node] = future.result()
+                    except Exception as e:
+                        logger.error(f"Stage '{node}' failed: {e}")
+                        if result.error is None:
+                            result.error = e
+                        continue
+                    for deps in pending.values():
+                        deps.discard(node)
+
+        return result
+
+
+__all__ = [
+    "StageTiming",
+    "DagRunResult",
+    "DagScheduler",
+    "validate_dag",
+    "critical_path",
+]
@@ -1,36 +1,195 @@
-from typing import Iterator, Callable, Any, Iterable
+from typing import Iterator, Callable, Any, Dict, Iterable, List, Optional, Sequence, Union
+from dataclasses import dataclass
 import logging
+import queue
+import threading
+import time
 from webis.core.schema import WebisDocument, PipelineContext
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a stream on a stage queue
+_END = object()
+
+BatchFunc = Callable[[List[WebisDocument], PipelineContext], List[WebisDocument]]
+
+
+@dataclass
+class StreamStage:
+    """A stage of a stream pipeline, operating on micro-batches of documents."""
+    name: str
+    func: BatchFunc
+    batch_size: int = 1
+
+
+def _per_document(processor: Callable[[WebisDocument, PipelineContext], WebisDocument]) -> BatchFunc:
+    """Adapt a single-document processor callable to the batch interface."""
+    def run_batch(docs: List[WebisDocument], context: PipelineContext) -> List[WebisDocument]:
+        return [processor(doc, context) for doc in docs]
+    return run_batch
+
+
 class StreamPipeline:
     """
     A pipeline that processes documents one by one as they are yielded from the source,
     rather than waiting for the entire list to be fetched.
+
+    Every stage runs in its own thread and stages are connected by bounded
+    queues, so a document flows through all stages as soon as the source
+    yields it, while a full queue blocks the upstream stage (backpressure).
+    Stages pick up whatever is queued, up to their batch size, so they batch
+    under load without delaying the first document.
     """
-    def __init__(self, processors: Iterable[Callable[[WebisDocument, PipelineContext], WebisDocument]]):
+    def __init__(
+        self,
+        processors: Iterable[Callable[[WebisDocument, PipelineContext], WebisDocument]] = (),
+        queue_size: int = 32,
+    ):
         self.processors = list(processors)
+        self.queue_size = max(1, queue_size)
+        self.stages: List[StreamStage] = [
+            StreamStage(name=getattr(p, "__name__", f"stage_{i}"), func=_per_document(p))
+            for i, p in enumerate(self.processors)
+        ]
+
+        # Populated by run()
+        self.errors: List[Dict[str, Any]] = []
+        self.stage_timings: Dict[str, float] = {}
 
-    def run(self, source_iterator: Iterator[WebisDocument], context: PipelineContext) -> Iterator[WebisDocument]:
+    def add_stage(self, name: str, func: BatchFunc, batch_size: int = 1) -> "StreamPipeline":
+        """Append a batch stage: ``func(docs, context) -> docs``."""
+        self.stages.append(StreamStage(name=name, func=func, batch_size=max(1, batch_size)))
+        return self
+
+    def run(
+        self,
+        source_iterator: Union[Iterator[WebisDocument], Sequence[Iterator[WebisDocument]]],
+        context: PipelineContext,
+    ) -> Iterator[WebisDocument]:
         """
         Yields processed documents as they become available.
+
+        Args:
+            source_iterator: A document iterator, or a sequence of iterators
+                that are drained concurrently into the first stage.
+            context: Pipeline context shared by all stages
         """
-        for doc in source_iterator:
-            processed_doc = doc
+        if isinstance(source_iterator, (list, tuple)):
+            sources = list(source_iterator)
+        else:
+            sources = [source_iterator]
+
+        self.errors = []
+        self.stage_timings = {stage.name: 0.0 for stage in self.stages}
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        threads = [
+            threading.Thread(
+                target=self._feed_sources, args=(sources, queues[0], stop), daemon=True
+            )
+        ]
+        for i, stage in enumerate(self.stages):
+            threads.append(threading.Thread(
+                target=self._run_stage,
+                args=(stage, queues[i], queues[i + 1], context, stop),
+                daemon=True,
+            ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _END:
+                    break
+                yield item
+        finally:
+            # Unblock producers if the consumer stopped early
+            stop.set()
+
+    def _put(self, q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
             try:
-                for processor in self.processors:
-                    # Check for dry run or other flags in context if needed
-                    if context.is_dry_run:
-                        continue
-                        
-                    processed_doc = processor(processed_doc, context)
-                    
-                yield processed_doc
-                
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed_sources(
+        self,
+        sources: List[Iterator[WebisDocument]],
+        out_queue: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        def drain(source: Iterator[WebisDocument]) -> None:
+            try:
+                for doc in source:
+                    if not self._put(out_queue, doc, stop):
+                        return
             except Exception as e:
-                # Handle error for this specific document without breaking the stream
-                logger.error(f"Error processing document {doc.id}: {e}", exc_info=True)
-                # Optionally track errors in context if needed
-                # if "errors" not in context.state: context.state["errors"] = []
-                # context.state["errors"].append({"doc_id": doc.id, "error": str(e)})
+                logger.error(f"Error reading from source: {e}", exc_info=True)
+                self.errors.append({"stage": "source", "error": str(e)})
+
+        feeders = [threading.Thread(target=drain, args=(s,), daemon=True) for s in sources[1:]]
+        for feeder in feeders:
+            feeder.start()
+        if sources:
+            drain(sources[0])
+        for feeder in feeders:
+            feeder.join()
+        self._put(out_queue, _END, stop)
+
+    def _run_stage(
+        self,
+        stage: StreamStage,
+        in_queue: queue.Queue,
+        out_queue: queue.Queue,
+        context: PipelineContext,
+        stop: threading.Event,
+    ) -> None:
+        finished = False
+        while not finished and not stop.is_set():
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                break
+
+            # Take whatever else is already queued, up to the batch size
+            batch = [item]
+            while len(batch) < stage.batch_size:
+                try:
+                    item = in_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _END:
+                    finished = True
+                    break
+                batch.append(item)
+
+            # Check for dry run or other flags in context if needed
+            if context.is_dry_run:
+                processed = batch
+            else:
+                started = time.time()
+                try:
+                    processed = stage.func(batch, context)
+                except Exception as e:
+                    # Handle error for this batch without breaking the stream
+                    logger.error(f"Error processing batch in stage {stage.name}: {e}", exc_info=True)
+                    self.errors.append({
+                        "stage": stage.name,
+                        "doc_ids": [doc.id for doc in batch],
+                        "error": str(e),
+                    })
+                    processed = []
+                self.stage_timings[stage.name] += time.time() - started
+
+            for doc in processed:
+                if not self._put(out_queue, doc, stop):
+                    return
+
+        self._put(out_queue, _END, stop)
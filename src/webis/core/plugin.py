@@ -14,17 +14,25 @@ Example:
     >>> 
     >>> registry = PluginRegistry()
     >>> registry.register(MySearchPlugin())
+
+Every plugin type also has an async counterpart (``afetch``, ``aprocess``,
+``aextract``, ``asend``). The defaults run the sync implementation in a
+worker thread; network-bound plugins can override them natively.
 """
 
 from __future__ import annotations
 
+import asyncio
 import importlib
 import logging
+import math
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterator, List, Optional, Type, TypeVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Type, TypeVar
 
 from webis.core.schema import WebisDocument, PipelineContext
+from webis.core.batch import DocumentBatch
+from webis.core.execution.distributed_executor import DistributedExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -156,6 +164,27 @@ class SourcePlugin(BasePlugin):
         """
         raise NotImplementedError
     
+    async def afetch(
+        self,
+        query: str,
+        limit: int = 10,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> AsyncIterator[WebisDocument]:
+        """
+        Async counterpart of fetch().
+        
+        Default implementation drives the sync iterator from a worker
+        thread, one document at a time, so the event loop is never blocked.
+        """
+        iterator = iter(self.fetch(query, limit=limit, context=context, **kwargs))
+        done = object()
+        while True:
+            doc = await asyncio.to_thread(next, iterator, done)
+            if doc is done:
+                break
+            yield doc
+    
     def estimate_count(self, query: str, **kwargs) -> Optional[int]:
         """
         Estimate the number of results for a query.
@@ -193,6 +222,11 @@ class ProcessorPlugin(BasePlugin):
     modifies_content: bool = True
     is_filter: bool = False  # If True, can return None to filter out docs
     
+    # Parallelism used when a pipeline stage does not configure its own.
+    # "thread"/"async" suit IO-bound work, "process" suits CPU-bound parsing.
+    default_concurrency: int = 1
+    default_executor: str = "thread"
+    
     @abstractmethod
     def process(
         self, 
@@ -222,9 +256,14 @@ class ProcessorPlugin(BasePlugin):
         """
         Process multiple documents.
         
-        Default implementation calls process() for each document.
+        Default implementation runs process_columns() if the plugin
+        implements it, and otherwise calls process() for each document.
         Override for batch-optimized processing.
         """
+        if self.supports_columns:
+            batch = self.process_columns(DocumentBatch.from_documents(docs), context=context, **kwargs)
+            return batch.to_documents()
+        
         results = []
         for doc in docs:
             processed = self.process(doc, context=context, **kwargs)
@@ -232,6 +271,165 @@ class ProcessorPlugin(BasePlugin):
                 results.append(processed)
         return results
     
+    def process_columns(
+        self,
+        batch: DocumentBatch,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> DocumentBatch:
+        """
+        Process a batch column by column (optional hook).
+        
+        Override to transform whole columns at once, e.g. one regex pass
+        over all contents with ``webis.core.batch.sub_column``. When
+        implemented, process_batch() - and so the pipeline engine - uses
+        it instead of calling process() per document.
+        
+        Args:
+            batch: Columnar view of the documents
+            context: Pipeline context
+            **kwargs: Additional processor-specific parameters
+            
+        Returns:
+            The batch, with replaced columns and filtered rows
+        """
+        raise NotImplementedError
+    
+    @property
+    def supports_columns(self) -> bool:
+        """Whether this plugin implements process_columns()."""
+        return type(self).process_columns is not ProcessorPlugin.process_columns
+    
+    @property
+    def prefers_batches(self) -> bool:
+        """
+        Whether this plugin overrides process_batch() or process_columns()
+        but not aprocess(): its work is batch-level (shared calls, dedup
+        across documents), so it must not be split into per-document
+        coroutines.
+        """
+        cls = type(self)
+        has_batch_path = cls.process_batch is not ProcessorPlugin.process_batch or self.supports_columns
+        return has_batch_path and cls.aprocess is ProcessorPlugin.aprocess
+    
+    async def aprocess(
+        self,
+        doc: WebisDocument,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> Optional[WebisDocument]:
+        """
+        Async counterpart of process().
+        
+        Default implementation runs process() in a worker thread.
+        """
+        return await asyncio.to_thread(self.process, doc, context=context, **kwargs)
+    
+    async def aprocess_batch(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """
+        Async counterpart of process_batch().
+        
+        Plugins that override process_batch() or process_columns() but not
+        aprocess() keep their batch path, run once in a worker thread.
+        Otherwise aprocess() runs for all documents concurrently (at most
+        ``concurrency`` at a time if given), preserving input order; if one
+        fails, the others are cancelled and the error is raised.
+        """
+        if self.prefers_batches:
+            return await asyncio.to_thread(self.process_batch, docs, context=context, **kwargs)
+        
+        semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        
+        async def run_one(doc: WebisDocument) -> Optional[WebisDocument]:
+            if semaphore is None:
+                return await self.aprocess(doc, context=context, **kwargs)
+            async with semaphore:
+                return await self.aprocess(doc, context=context, **kwargs)
+        
+        tasks = [asyncio.ensure_future(run_one(doc)) for doc in docs]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return [doc for doc in results if doc is not None]
+    
+    def process_batch_concurrent(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        concurrency: int = 4,
+        executor: str = "thread",
+        pool: Optional[DistributedExecutor] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        """
+        Process multiple documents concurrently, preserving input order.
+        
+        Documents are split into contiguous chunks that are passed to
+        process_batch() on a DistributedExecutor, so batch-optimized
+        overrides are still used; the "async" executor instead drives
+        aprocess() per document on an event loop, unless the plugin
+        ``prefers_batches``, whose chunks then run in the loop's worker
+        threads. Filtered-out documents are dropped exactly as in
+        process_batch().
+        
+        Args:
+            docs: Input documents
+            context: Pipeline context
+            concurrency: Maximum number of chunks processed at once
+            executor: "thread", "process" or "async"
+            pool: Executor to run on, owned by the caller so that its
+                workers (or event loop) are reused across calls; its
+                ``mode`` and ``max_workers`` replace ``executor`` and
+                ``concurrency``. Without it, a pool is created per call.
+            **kwargs: Additional processor-specific parameters
+        
+        With the "process" executor the plugin, documents and context are
+        pickled to worker processes, so changes a plugin makes to the
+        context there are not seen by the caller.
+        """
+        if pool is not None:
+            executor, concurrency = pool.mode, pool.max_workers
+        if executor not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor '{executor}'. Available: {EXECUTOR_MODES}")
+        if concurrency <= 1 or len(docs) <= 1:
+            return self.process_batch(docs, context=context, **kwargs)
+        
+        if pool is None:
+            with DistributedExecutor(max_workers=concurrency, mode=executor) as pool:
+                return self.process_batch_concurrent(docs, context=context, pool=pool, **kwargs)
+        
+        if executor == "async" and not self.prefers_batches:
+            # One task per document, driven through aprocess()
+            async def run_one(doc: WebisDocument) -> Optional[WebisDocument]:
+                return await self.aprocess(doc, context=context, **kwargs)
+            
+            results = pool.map(run_one, docs)
+            return [doc for doc in results if doc is not None]
+        
+        if executor == "process":
+            # Amortize pickling over a few chunks per worker
+            chunk_size = math.ceil(len(docs) / (concurrency * 4))
+        elif type(self).process_batch is not ProcessorPlugin.process_batch or self.supports_columns:
+            # Includes "async" for plugins that prefer batches: plain callables
+            # run on the loop's worker threads
+            chunk_size = math.ceil(len(docs) / concurrency)
+        else:
+            chunk_size = 1
+        chunks = [docs[i:i + chunk_size] for i in range(0, len(docs), chunk_size)]
+        
+        results = pool.map(_ChunkTask(self, context, kwargs), chunks)
+        return [doc for chunk in results for doc in chunk]
+    
     def can_process(self, doc: WebisDocument) -> bool:
         """Check if this processor can handle the given document type."""
         if not self.supported_types:
@@ -239,6 +437,26 @@ class ProcessorPlugin(BasePlugin):
         return doc.doc_type.value in self.supported_types
 
 
+EXECUTOR_MODES = ("thread", "process", "async")
+
+
+class _ChunkTask:
+    """Picklable callable running process_batch() on one chunk of documents."""
+    
+    def __init__(
+        self,
+        plugin: ProcessorPlugin,
+        context: Optional[PipelineContext],
+        kwargs: Dict[str, Any],
+    ):
+        self.plugin = plugin
+        self.context = context
+        self.kwargs = kwargs
+    
+    def __call__(self, docs: List[WebisDocument]) -> List[WebisDocument]:
+        return self.plugin.process_batch(docs, context=self.context, **self.kwargs)
+
+
 class ExtractorPlugin(BasePlugin):
     """
     Base class for structured extraction plugins.
@@ -268,6 +486,19 @@ class ExtractorPlugin(BasePlugin):
             StructuredResult with extracted data
         """
         raise NotImplementedError
+    
+    async def aextract(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> "StructuredResult":
+        """
+        Async counterpart of extract().
+        
+        Default implementation runs extract() in a worker thread.
+        """
+        return await asyncio.to_thread(self.extract, docs, context=context, **kwargs)
 
 
 class NotificationPlugin(BasePlugin):
@@ -298,6 +529,20 @@ class NotificationPlugin(BasePlugin):
             True if sent successfully
         """
         raise NotImplementedError
+    
+    async def asend(
+        self,
+        message: str,
+        title: Optional[str] = None,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> bool:
+        """
+        Async counterpart of send().
+        
+        Default implementation runs send() in a worker thread.
+        """
+        return await asyncio.to_thread(self.send, message, title=title, context=context, **kwargs)
 
 
 # Type variable for plugin types
@@ -485,6 +730,7 @@ __all__ = [
     "ProcessorPlugin",
     "ExtractorPlugin",
     "NotificationPlugin",
+    "EXECUTOR_MODES",
     "PluginRegistry",
     "get_default_registry",
 ]
@@ -0,0 +1,218 @@
+"""
+Lean in-engine document representation.
+
+``WebisDocument`` is a Pydantic model: every construction validates its
+fields and nested ``DocumentMetadata``, and every processing step formats
+a timestamp string. That is the right contract at plugin and API
+boundaries, but costly for code that builds or shuffles millions of
+documents. ``DocumentRecord`` and ``ChunkRecord`` hold the same data in
+``__slots__`` objects with plain-dict metadata and ``(plugin, unix time,
+details)`` history tuples, and convert to and from ``WebisDocument``
+without re-validating.
+
+Example:
+    >>> records = [DocumentRecord(content=text, meta={"url": url}) for text, url in rows]
+    >>> docs = to_documents(records)          # hand to plugins
+    >>> records = to_records(plugin.process_batch(docs))
+
+See ``benchmarks/benchmark_documents.py`` for the cost comparison.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from webis.core.schema import (
+    DocumentChunk,
+    DocumentMetadata,
+    DocumentStatus,
+    DocumentType,
+    WebisDocument,
+)
+
+# (plugin name, timestamp, details); the timestamp is a unix time for
+# steps recorded on a record, or the ISO string of a converted document
+HistoryStep = Tuple[str, Union[float, str], Dict[str, Any]]
+
+
+@lru_cache(maxsize=None)
+def _field_defaults(model: Type[BaseModel]) -> Tuple[Tuple[str, Any, Optional[Callable[[], Any]]], ...]:
+    return tuple(
+        (name, field.default, field.default_factory)
+        for name, field in model.model_fields.items()
+    )
+
+
+def _construct(model: Type[BaseModel], values: Dict[str, Any]) -> Any:
+    # model_construct() inspects each default factory it has to call, which
+    # costs far more than validation; fill in the defaults here instead
+    values = dict(values)
+    for name, default, factory in _field_defaults(model):
+        if name not in values:
+            values[name] = factory() if factory is not None else default
+    return model.model_construct(**values)
+
+
+class ChunkRecord:
+    """Slotted counterpart of ``DocumentChunk``."""
+
+    __slots__ = ("id", "content", "index", "start_char", "end_char", "embedding_row", "metadata")
+
+    def __init__(
+        self,
+        content: str,
+        index: int,
+        id: Optional[str] = None,
+        start_char: Optional[int] = None,
+        end_char: Optional[int] = None,
+        embedding_row: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id or str(uuid.uuid4())
+        self.content = content
+        self.index = index
+        self.start_char = start_char
+        self.end_char = end_char
+        self.embedding_row = embedding_row
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def from_chunk(cls, chunk: DocumentChunk) -> "ChunkRecord":
+        return cls(
+            chunk.content, chunk.index, chunk.id, chunk.start_char, chunk.end_char,
+            chunk.embedding_row, chunk.metadata,
+        )
+
+    def to_chunk(self) -> DocumentChunk:
+        return DocumentChunk.model_construct(
+            id=self.id,
+            content=self.content,
+            index=self.index,
+            start_char=self.start_char,
+            end_char=self.end_char,
+            embedding_row=self.embedding_row,
+            metadata=self.metadata,
+        )
+
+
+class DocumentRecord:
+    """
+    Slotted counterpart of ``WebisDocument``.
+
+    Args:
+        content: Raw content
+        id: Document ID (default: a new UUID)
+        clean_content: Cleaned text
+        doc_type: Document type
+        status: Processing status
+        meta: ``DocumentMetadata`` fields (and extra fields) as a dict
+        chunks: Chunk records
+        embeddings: ``EmbeddingMatrix`` of chunk vectors
+        parent_id: Parent document ID
+        history: Processing steps as ``(plugin, timestamp, details)``
+    """
+
+    __slots__ = (
+        "id", "content", "clean_content", "doc_type", "status", "meta",
+        "chunks", "embeddings", "parent_id", "history",
+    )
+
+    def __init__(
+        self,
+        content: str,
+        id: Optional[str] = None,
+        clean_content: Optional[str] = None,
+        doc_type: DocumentType = DocumentType.UNKNOWN,
+        status: DocumentStatus = DocumentStatus.PENDING,
+        meta: Optional[Dict[str, Any]] = None,
+        chunks: Optional[List[ChunkRecord]] = None,
+        embeddings: Any = None,
+        parent_id: Optional[str] = None,
+        history: Optional[List[HistoryStep]] = None,
+    ):
+        self.id = id or str(uuid.uuid4())
+        self.content = content
+        self.clean_content = clean_content
+        self.doc_type = doc_type
+        self.status = status
+        self.meta = meta if meta is not None else {}
+        self.chunks = chunks if chunks is not None else []
+        self.embeddings = embeddings
+        self.parent_id = parent_id
+        self.history = history if history is not None else []
+
+    def add_processing_step(self, plugin_name: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """Record a processing step (formatted only on conversion)."""
+        self.history.append((plugin_name, time.time(), details or {}))
+
+    @classmethod
+    def from_document(cls, doc: WebisDocument) -> "DocumentRecord":
+        meta = dict(doc.meta.__dict__)
+        if doc.meta.__pydantic_extra__:
+            meta.update(doc.meta.__pydantic_extra__)
+        return cls(
+            content=doc.content,
+            id=doc.id,
+            clean_content=doc.clean_content,
+            doc_type=doc.doc_type,
+            status=doc.status,
+            meta=meta,
+            chunks=[ChunkRecord.from_chunk(chunk) for chunk in doc.chunks],
+            embeddings=doc.embeddings,
+            parent_id=doc.parent_id,
+            history=[
+                (step.get("plugin", ""), step.get("timestamp", ""), step.get("details") or {})
+                for step in doc.processing_history
+            ],
+        )
+
+    def to_document(self) -> WebisDocument:
+        """Build the equivalent ``WebisDocument`` without re-validating fields."""
+        return WebisDocument.model_construct(
+            id=self.id,
+            content=self.content,
+            clean_content=self.clean_content,
+            doc_type=self.doc_type,
+            status=self.status,
+            meta=_construct(DocumentMetadata, self.meta),
+            chunks=[chunk.to_chunk() for chunk in self.chunks],
+            embeddings=self.embeddings,
+            parent_id=self.parent_id,
+            processing_history=[
+                {
+                    "plugin": plugin,
+                    "timestamp": (
+                        datetime.fromtimestamp(timestamp).isoformat()
+                        if isinstance(timestamp, float) else timestamp
+                    ),
+                    "details": details,
+                }
+                for plugin, timestamp, details in self.history
+            ],
+        )
+
+    def __repr__(self) -> str:
+        return f"DocumentRecord(id={self.id!r}, doc_type={self.doc_type.value!r}, status={self.status.value!r})"
+
+
+def to_records(docs: Iterable[WebisDocument]) -> List[DocumentRecord]:
+    return [DocumentRecord.from_document(doc) for doc in docs]
+
+
+def to_documents(records: Iterable[DocumentRecord]) -> List[WebisDocument]:
+    return [record.to_document() for record in records]
+
+
+__all__ = [
+    "DocumentRecord",
+    "ChunkRecord",
+    "HistoryStep",
+    "to_records",
+    "to_documents",
+]
@@ -7,12 +7,20 @@ ensuring type safety and consistent interfaces across plugins.
 
 from __future__ import annotations
 
+import logging
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+
+from webis.core.embedding.matrix import EmbeddingMatrix
+
+if TYPE_CHECKING:
+    from webis.core.http import HttpClient
+
+logger = logging.getLogger(__name__)
 
 
 class DocumentType(str, Enum):
@@ -54,13 +62,31 @@ class DocumentMetadata(BaseModel):
 
 
 class DocumentChunk(BaseModel):
-    """A chunk of text from a document."""
+    """A chunk of text extracted from a document, ready for embedding."""
+    
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Chunk ID")
+    content: str = Field(..., description="Chunk text content")
+    index: int = Field(..., description="Chunk index within the document")
+    start_char: Optional[int] = Field(default=None, description="Start character position")
+    end_char: Optional[int] = Field(default=None, description="End character position")
+    embedding_row: Optional[int] = Field(
+        default=None, description="Row of this chunk's vector in the document's embeddings"
+    )
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Chunk-level metadata")
     
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    content: str
-    index: int
-    embedding: Optional[List[float]] = None
-    metadata: Dict[str, Any] = Field(default_factory=dict)
+    @model_validator(mode="before")
+    @classmethod
+    def _drop_legacy_embedding(cls, data: Any) -> Any:
+        # Chunks used to carry their own vector; it now lives in the document's
+        # matrix, where WebisDocument moves it before validating its chunks
+        if isinstance(data, dict) and "embedding" in data:
+            if data["embedding"] is not None:
+                logger.warning(
+                    f"Discarding the embedding of chunk {data.get('index')}: chunks no longer hold "
+                    f"vectors (use WebisDocument.set_chunk_embeddings)"
+                )
+            data = {k: v for k, v in data.items() if k != "embedding"}
+        return data
 
 
 class WebisDocument(BaseModel):
@@ -89,7 +115,9 @@ class WebisDocument(BaseModel):
     
     # Processing artifacts
     chunks: List["DocumentChunk"] = Field(default_factory=list, description="Text chunks for embedding")
-    embeddings: Optional[List[List[float]]] = Field(default=None, description="Vector embeddings")
+    embeddings: Optional[EmbeddingMatrix] = Field(
+        default=None, description="Chunk vectors, one contiguous float32/float16 matrix"
+    )
     
     # Lineage tracking
     parent_id: Optional[str] = Field(default=None, description="Parent document ID (for derived docs)")
@@ -98,6 +126,36 @@ class WebisDocument(BaseModel):
         description="Record of processing steps applied"
     )
     
+    @model_validator(mode="before")
+    @classmethod
+    def _lift_legacy_chunk_embeddings(cls, data: Any) -> Any:
+        # Older payloads kept each vector on its chunk instead of in ``embeddings``;
+        # chunks without one are left without a row
+        if not isinstance(data, dict) or data.get("embeddings") is not None:
+            return data
+        chunks = list(data.get("chunks") or [])
+        vectors = []
+        for i, chunk in enumerate(chunks):
+            if isinstance(chunk, dict) and chunk.get("embedding") is not None:
+                chunk = {k: v for k, v in chunk.items() if k != "embedding"}
+                vectors.append(chunks[i]["embedding"])
+                chunks[i] = {**chunk, "embedding_row": len(vectors) - 1}
+        if vectors:
+            data = {**data, "chunks": chunks, "embeddings": vectors}
+        return data
+    
+    @model_validator(mode="after")
+    def _link_legacy_embedding_rows(self) -> "WebisDocument":
+        # Legacy payloads have one row per chunk, in chunk order, but no row links
+        if (
+            self.embeddings is not None
+            and len(self.embeddings) == len(self.chunks)
+            and all(chunk.embedding_row is None for chunk in self.chunks)
+        ):
+            for row, chunk in enumerate(self.chunks):
+                chunk.embedding_row = row
+        return self
+    
     def add_processing_step(self, plugin_name: str, details: Optional[Dict[str, Any]] = None) -> None:
         """Record a processing step in the document's history."""
         self.processing_history.append({
@@ -106,22 +164,40 @@ class WebisDocument(BaseModel):
             "details": details or {}
         })
     
+    def set_chunk_embeddings(self, vectors: Any, dtype: Optional[str] = None) -> None:
+        """
+        Store one vector per chunk, in chunk order.
+        
+        Args:
+            vectors: ``EmbeddingMatrix``, NumPy array or list of vectors
+            dtype: Storage precision, "float32" or "float16" (default: as given)
+        """
+        matrix = EmbeddingMatrix.validate(vectors)
+        if dtype:
+            matrix = matrix.astype(dtype)
+        if len(matrix) != len(self.chunks):
+            raise ValueError(f"Got {len(matrix)} embeddings for {len(self.chunks)} chunks")
+        self.embeddings = matrix
+        for row, chunk in enumerate(self.chunks):
+            chunk.embedding_row = row
+    
+    def chunk_embedding(self, chunk: "DocumentChunk") -> Optional[Any]:
+        """Vector of a chunk (NumPy row view, or list without NumPy)."""
+        if self.embeddings is None or chunk.embedding_row is None:
+            return None
+        return self.embeddings[chunk.embedding_row]
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for serialization."""
+        """
+        Convert to dictionary for serialization.
+        
+        Embeddings are emitted as ``{"dtype", "shape", "data"}`` with the
+        raw buffer base64-encoded; ``WebisDocument.model_validate`` reads
+        that form back.
+        """
         return self.model_dump(mode="json")
 
 
-class DocumentChunk(BaseModel):
-    """A chunk of text extracted from a document, ready for embedding."""
-    
-    text: str = Field(..., description="Chunk text content")
-    index: int = Field(..., description="Chunk index within the document")
-    start_char: Optional[int] = Field(default=None, description="Start character position")
-    end_char: Optional[int] = Field(default=None, description="End character position")
-    embedding: Optional[List[float]] = Field(default=None, description="Vector embedding")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Chunk-level metadata")
-
-
 class Lineage(BaseModel):
     """Tracks the provenance of structured data."""
     
@@ -199,6 +275,12 @@ class PipelineContext(BaseModel):
         """Record token usage and cost."""
         self.total_tokens_used += tokens
         self.total_cost_usd += cost
+    
+    @property
+    def http(self) -> "HttpClient":
+        """Shared pooled HTTP client configured by the ``"http"`` config key."""
+        from webis.core.http import get_http_client
+        return get_http_client(self)
 
 
 # Re-export for convenience
@@ -0,0 +1,264 @@
+"""
+Persistent sets of seen keys with expiry.
+
+Deduplication state for monitoring jobs: which URLs or content hashes a
+job has already emitted. Every operation takes a batch of keys, and
+``add_new`` is an atomic check-and-insert, so concurrent workers sharing
+a store never both treat the same key as new.
+
+Backends:
+- SQLiteSeenStore: one keyed table, shared by all processes on a node
+- RedisSeenStore: one Redis key per seen key, shared across nodes
+
+With a TTL, a key is forgotten ``ttl`` seconds after it was last seen,
+which bounds the store to the keys of one monitoring window.
+
+Example:
+    >>> store = open_seen_store("redis://localhost:6379/0", ttl=30 * 86400)
+    >>> store.add_new(["https://a", "https://b", "https://a"])
+    [True, True, False]
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Sequence, Set
+
+# SQLite's default limit on bound parameters is 999
+_SQL_BATCH = 500
+
+
+class SeenStore(ABC):
+    """
+    Base class for seen-key stores.
+
+    Args:
+        ttl: Seconds a key is remembered after it was last seen (None = forever)
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+
+    @abstractmethod
+    def add_new(self, keys: Sequence[str]) -> List[bool]:
+        """
+        Record keys as seen.
+
+        Returns:
+            For each key, whether it was new: not stored (or expired) and
+            not repeated earlier in ``keys``
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def contains_many(self, keys: Sequence[str]) -> List[bool]:
+        """For each key, whether it is stored and not expired."""
+        raise NotImplementedError
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        self.add_new(list(keys))
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget all keys."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release connections."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored, unexpired keys."""
+        raise NotImplementedError
+
+
+class SQLiteSeenStore(SeenStore):
+    """
+    SQLite-backed seen-key store.
+
+    Keys are rows of one table, so a batch costs one indexed lookup and
+    one insert per key instead of rewriting the whole history. Each
+    ``add_new`` runs in an immediate transaction, which serializes it
+    against other processes. Expired rows are purged at most once per
+    ``purge_interval`` seconds.
+
+    Args:
+        path: Database file path
+        ttl: Seconds a key is remembered after it was last seen (None = forever)
+        purge_interval: Minimum seconds between purges of expired rows
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, purge_interval: float = 3600.0):
+        super().__init__(ttl)
+        self.path = os.path.expanduser(path)
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_keys ("
+            " key TEXT PRIMARY KEY,"
+            " expires_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_seen_keys_expires ON seen_keys (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _stored(self, conn: sqlite3.Connection, keys: Sequence[str], now: float) -> Set[str]:
+        stored: Set[str] = set()
+        for start in range(0, len(keys), _SQL_BATCH):
+            batch = keys[start:start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key FROM seen_keys WHERE key IN ({placeholders})"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (*batch, now),
+            )
+            stored.update(key for key, in rows)
+        return stored
+
+    def add_new(self, keys: Sequence[str]) -> List[bool]:
+        if not keys:
+            return []
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            stored = self._stored(conn, keys, now)
+            new = []
+            for key in keys:
+                new.append(key not in stored)
+                stored.add(key)
+            # Refreshes the expiry of keys seen again, and revives expired ones
+            conn.executemany(
+                "INSERT OR REPLACE INTO seen_keys (key, expires_at) VALUES (?, ?)",
+                [(key, expires_at) for key in dict.fromkeys(keys)],
+            )
+            if self.ttl and now - self._last_purge >= self.purge_interval:
+                conn.execute("DELETE FROM seen_keys WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+                self._last_purge = now
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return new
+
+    def contains_many(self, keys: Sequence[str]) -> List[bool]:
+        stored = self._stored(self._conn(), keys, time.time())
+        return [key in stored for key in keys]
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns the number removed."""
+        cursor = self._conn().execute(
+            "DELETE FROM seen_keys WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        return max(cursor.rowcount, 0)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM seen_keys")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM seen_keys WHERE expires_at IS NULL OR expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+class RedisSeenStore(SeenStore):
+    """
+    Redis-backed seen-key store.
+
+    Each seen key is a Redis string ``<namespace>:<key>`` rather than a
+    member of one set, because only keys can expire. A batch is one
+    pipelined round trip of ``SET ... GET`` commands. Each command is
+    atomic, so workers on any node agree on which of them saw a key first.
+
+    Args:
+        url: Redis URL
+        ttl: Seconds a key is remembered after it was last seen (None = forever)
+        namespace: Prefix of the Redis keys
+    """
+
+    def __init__(self, url: str, ttl: Optional[float] = None, namespace: str = "webis:seen"):
+        super().__init__(ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("redis package required: pip install redis")
+        self.client = redis.from_url(url)
+        self.namespace = namespace
+
+    def _name(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def add_new(self, keys: Sequence[str]) -> List[bool]:
+        if not keys:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        ttl = int(self.ttl) if self.ttl else None
+        for key in keys:
+            # Returns the previous value: None if the key was not set
+            pipe.set(self._name(key), 1, ex=ttl, get=True)
+        return [previous is None for previous in pipe.execute()]
+
+    def contains_many(self, keys: Sequence[str]) -> List[bool]:
+        if not keys:
+            return []
+        return [value is not None for value in self.client.mget([self._name(key) for key in keys])]
+
+    def clear(self) -> None:
+        names = list(self.client.scan_iter(match=f"{self.namespace}:*", count=1000))
+        for start in range(0, len(names), 1000):
+            self.client.delete(*names[start:start + 1000])
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.namespace}:*", count=1000))
+
+
+def open_seen_store(location: str, ttl: Optional[float] = None, **options) -> SeenStore:
+    """
+    Open a store by location: a ``redis://`` (or ``rediss://``) URL, or a SQLite file path.
+
+    Args:
+        location: Redis URL or database file path
+        ttl: Seconds a key is remembered after it was last seen (None = forever)
+        **options: Backend-specific options
+    """
+    if location.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSeenStore(location, ttl=ttl, **options)
+    return SQLiteSeenStore(location, ttl=ttl, **options)
+
+
+__all__ = [
+    "SeenStore",
+    "SQLiteSeenStore",
+    "RedisSeenStore",
+    "open_seen_store",
+]
@@ -0,0 +1,84 @@
+"""
+Scalable Bloom filter for string keys.
+
+Answers "definitely not seen" or "maybe seen" in constant time, using
+about 1.2 bytes per key at a 1% false-positive rate. When a filter fills
+up, a new one with twice the capacity and half the error rate is added,
+so the total false-positive rate stays below twice the target without
+knowing the final key count in advance.
+"""
+
+import hashlib
+import math
+import threading
+from typing import Iterable, List
+
+
+class _Filter:
+    __slots__ = ("bits", "size", "hashes", "capacity", "error_rate", "count")
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, h1: int, h2: int) -> List[int]:
+        # Kirsch-Mitzenmacher: k positions from two independent hashes
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+
+def _hash_pair(key: str):
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Probabilistic set of strings with no false negatives.
+
+    Args:
+        capacity: Keys the first filter holds at ``error_rate``
+        error_rate: Target false-positive rate
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+        self._filters = [_Filter(max(1, capacity), error_rate)]
+        # Setting bits is read-modify-write; concurrent adds could lose one
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self._filters)
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _hash_pair(key)
+        for f in self._filters:
+            bits = f.bits
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in f.positions(h1, h2)):
+                return True
+        return False
+
+    def add(self, key: str) -> None:
+        h1, h2 = _hash_pair(key)
+        with self._lock:
+            f = self._filters[-1]
+            if f.count >= f.capacity:
+                f = _Filter(f.capacity * 2, f.error_rate / 2)
+                self._filters.append(f)
+            bits = f.bits
+            for p in f.positions(h1, h2):
+                bits[p >> 3] |= 1 << (p & 7)
+            f.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(f.bits) for f in self._filters)
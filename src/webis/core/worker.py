@@ -27,13 +27,21 @@ def run_pipeline_task(self, query: str, pipeline_config: Dict[str, Any]):
             plugin_name = stage.get("plugin")
             config = stage.get("config", {})
             name = stage.get("name")
+            depends_on = stage.get("depends_on")
             
             if stage_type == "source":
-                pipeline.add_source(plugin_name, stage_name=name, **config)
+                pipeline.add_source(plugin_name, stage_name=name, depends_on=depends_on, **config)
             elif stage_type == "processor":
-                pipeline.add_processor(plugin_name, stage_name=name, **config)
+                pipeline.add_processor(
+                    plugin_name,
+                    stage_name=name,
+                    depends_on=depends_on,
+                    concurrency=stage.get("concurrency"),
+                    executor=stage.get("executor"),
+                    **config
+                )
             elif stage_type == "extractor":
-                pipeline.add_extractor(plugin_name, stage_name=name, **config)
+                pipeline.add_extractor(plugin_name, stage_name=name, depends_on=depends_on, **config)
             else:
                 logger.warning(f"Unknown stage type: {stage_type}")
 
@@ -1,10 +1,11 @@
-from .utils import get_logger, HttpClient
+from .utils import get_logger, HttpClient, get_http_client
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata
 from webis.core.plugin import SourcePlugin, ProcessorPlugin
 
 __all__ = [
     "get_logger",
     "HttpClient",
+    "get_http_client",
     "WebisDocument",
     "DocumentType",
     "DocumentMetadata",
@@ -1,8 +1,10 @@
 import logging
-import requests
-from typing import Optional, Dict, Any
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+# Plugins share the core pooled client (see webis.core.http)
+from webis.core.http import HttpClient, get_http_client
+
+__all__ = ["get_logger", "HttpClient", "get_http_client"]
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -18,35 +20,3 @@ def get_logger(name: str) -> logging.Logger:
         logger.addHandler(handler)
         logger.setLevel(logging.INFO)
     return logger
-
-class HttpClient:
-    """
-    A robust HTTP client for plugins with built-in retries and timeout defaults.
-    """
-    def __init__(self, 
-                 retries: int = 3, 
-                 backoff_factor: float = 0.3, 
-                 timeout: int = 30,
-                 headers: Optional[Dict[str, str]] = None):
-        self.timeout = timeout
-        self.session = requests.Session()
-        
-        if headers:
-            self.session.headers.update(headers)
-            
-        retry_strategy = Retry(
-            total=retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-
-    def get(self, url: str, **kwargs) -> requests.Response:
-        kwargs.setdefault("timeout", self.timeout)
-        return self.session.get(url, **kwargs)
-
-    def post(self, url: str, **kwargs) -> requests.Response:
-        kwargs.setdefault("timeout", self.timeout)
-        return self.session.post(url, **kwargs)
@@ -1,12 +1,12 @@
 from typing import Optional
 import os
-import requests
 import json
 import hmac
 import hashlib
 import base64
 import time
 import urllib.parse
+from webis.core.http import get_http_client
 from webis.core.plugin import NotificationPlugin
 from webis.core.schema import PipelineContext
 
@@ -58,7 +58,7 @@ class DingTalkNotificationPlugin(NotificationPlugin):
         }
 
         try:
-            response = requests.post(url, json=payload)
+            response = get_http_client(context).post(url, json=payload)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -1,6 +1,6 @@
 from typing import Optional
 import os
-import requests
+from webis.core.http import get_http_client
 from webis.core.plugin import NotificationPlugin
 from webis.core.schema import PipelineContext
 
@@ -46,7 +46,7 @@ class SlackNotificationPlugin(NotificationPlugin):
             ]
 
         try:
-            response = requests.post(self.webhook_url, json=payload)
+            response = get_http_client(context).post(self.webhook_url, json=payload)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -3,6 +3,7 @@ from .html_fetcher_plugin import HtmlFetcherPlugin
 from .summarizer_plugin import SummarizerPlugin
 from .chunking_plugin import ChunkingPlugin
 from .embedding_plugin import EmbeddingPlugin
+from .near_duplicate_plugin import NearDuplicatePlugin
 
 __all__ = [
     "HtmlCleanerPlugin",
@@ -10,4 +11,5 @@ __all__ = [
     "SummarizerPlugin",
     "ChunkingPlugin",
     "EmbeddingPlugin",
+    "NearDuplicatePlugin",
 ]
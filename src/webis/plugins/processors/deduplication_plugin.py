@@ -1,53 +1,92 @@
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 import os
 import json
 import hashlib
+import logging
 from webis.core.pipeline import PipelineContext
 from webis.core.plugin import Plugin
+from webis.core.seen_store import SeenStore, open_seen_store
+
+logger = logging.getLogger(__name__)
 
 class DeduplicationPlugin(Plugin):
     """
     Plugin to filter out duplicate items based on URL or content hash.
+
+    Seen keys live in a keyed store (a SQLite file by default, or Redis),
+    so each run only reads and writes the keys of its own items, and
+    workers sharing the store never both emit the same item.
+
+    Args:
+        state_file: Store location: a SQLite path or a ``redis://`` URL.
+            A ``.json`` path (the former state format) maps to
+            ``<name>.db`` next to it, and an existing JSON state is
+            imported on first use.
+        key_field: Item field used as the key
+        ttl: Seconds an item is remembered after it was last seen (None = forever)
     """
-    def __init__(self, state_file: str = "dedup_state.json", key_field: str = "url"):
+    def __init__(self, state_file: str = "dedup_state.json", key_field: str = "url", ttl: Optional[float] = None):
         self.state_file = state_file
         self.key_field = key_field
-        self.seen_keys: Set[str] = set()
+        self.ttl = ttl
+        self.store: Optional[SeenStore] = None
 
     def initialize(self, context: PipelineContext):
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, "r") as f:
-                    self.seen_keys = set(json.load(f))
-            except Exception:
-                self.seen_keys = set()
+        if self.store is not None:
+            return
+        location = self.state_file
+        legacy_file = None
+        if location.endswith(".json"):
+            legacy_file = location
+            location = os.path.splitext(location)[0] + ".db"
+        self.store = open_seen_store(location, ttl=self.ttl)
+        if legacy_file and os.path.exists(legacy_file):
+            self._import_legacy(legacy_file)
+
+    def _import_legacy(self, path: str) -> None:
+        # Workers starting together may all import the file; adding keys is
+        # idempotent, and only the first rename succeeds
+        try:
+            with open(path, "r") as f:
+                keys = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Could not read legacy dedup state {path}: {e}")
+            return
+        for start in range(0, len(keys), 10000):
+            self.store.add_many(keys[start:start + 10000])
+        try:
+            os.replace(path, path + ".imported")
+        except FileNotFoundError:
+            return
+        logger.info(f"Imported {len(keys)} keys from {path}")
+
+    def _key(self, item: Dict[str, Any]) -> Optional[str]:
+        key = item.get(self.key_field)
+        if not key:
+            # If key field missing, try to hash the content if available
+            content = item.get("content") or item.get("text")
+            if content:
+                key = hashlib.md5(content.encode("utf-8")).hexdigest()
+        return key
 
     def run(self, context: PipelineContext, **kwargs) -> Dict[str, Any]:
         items = kwargs.get("items") or context.get("items")
         if not items:
             return {"items": [], "filtered_count": 0}
+        if self.store is None:
+            self.initialize(context)
 
-        new_items = []
-        for item in items:
-            key = item.get(self.key_field)
-            if not key:
-                # If key field missing, try to hash the content if available
-                content = item.get("content") or item.get("text")
-                if content:
-                    key = hashlib.md5(content.encode("utf-8")).hexdigest()
-                else:
-                    continue
-            
-            if key not in self.seen_keys:
-                self.seen_keys.add(key)
-                new_items.append(item)
-
-        # Save state
-        self._save_state()
+        keyed = [(item, self._key(item)) for item in items]
+        keyed = [(item, key) for item, key in keyed if key]
+        is_new = self.store.add_new([key for _, key in keyed])
+        new_items: List[Dict[str, Any]] = [item for (item, _), new in zip(keyed, is_new) if new]
 
         context.set("items", new_items)
         return {"items": new_items, "filtered_count": len(items) - len(new_items)}
 
-    def _save_state(self):
-        with open(self.state_file, "w") as f:
-            json.dump(list(self.seen_keys), f)
+    def cleanup(self):
+        if self.store is not None:
+            self.store.close()
+            self.store = None
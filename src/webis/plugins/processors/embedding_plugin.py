@@ -4,19 +4,34 @@ Embedding Processor Plugin for Webis.
 
 import logging
 import os
-from typing import Optional
-
-from langchain_openai import OpenAIEmbeddings
+from typing import List, Optional
 
+from webis.core.embedding import CachedEmbedder, EmbeddingCache, get_embedding_backend
 from webis.core.plugin import ProcessorPlugin
 from webis.core.schema import WebisDocument, PipelineContext
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CACHE_PATH = "~/.webis/embedding_cache.db"
+
 
 class EmbeddingPlugin(ProcessorPlugin):
     """
     Generate embeddings for document chunks.
+    
+    Chunks of all documents in a batch are embedded together: duplicate
+    texts (boilerplate such as cookie banners and footers) are sent once,
+    and vectors are cached on disk by (model, sha256(text)) across runs.
+    Set ``cache_path`` to None to keep the cache in memory only.
+    
+    ``backend`` selects where vectors come from: "openai" (default),
+    "local" (sentence-transformers on CPU via ONNX Runtime, int8 by
+    default) or "hashing" (deterministic, for offline tests). Extra
+    constructor arguments go in ``backend_options``.
+    
+    Vectors are stored per document as one contiguous matrix
+    (``doc.embeddings``, ``dtype`` "float32" or "float16"), and each chunk
+    records its row in ``chunk.embedding_row``.
     """
     
     name = "embedder"
@@ -25,16 +40,28 @@ class EmbeddingPlugin(ProcessorPlugin):
     
     def __init__(self, config: Optional[dict] = None):
         super().__init__(config)
-        self.model = self.config.get("model", "text-embedding-3-small")
-        self.api_key = self.config.get("api_key") or os.environ.get("OPENAI_API_KEY")
+        options = dict(self.config.get("backend_options") or {})
+        if self.config.get("model"):
+            options["model"] = self.config["model"]
+        backend_name = self.config.get("backend", "openai")
+        if backend_name == "openai" and self.config.get("api_key"):
+            options["api_key"] = self.config["api_key"]
         
-        if not self.api_key:
-            logger.warning("OPENAI_API_KEY not found, embedding will fail")
-            
-        self.embeddings = OpenAIEmbeddings(
-            model=self.model,
-            api_key=self.api_key
+        # Local models are loaded once per process and shared between instances
+        self.backend = get_embedding_backend(backend_name, **options)
+        self.model = self.backend.model
+        
+        cache_path = self.config.get(
+            "cache_path", os.environ.get("WEBIS_EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
         )
+        self.embedder = CachedEmbedder(
+            self.backend,
+            self.backend.model_id,
+            cache=EmbeddingCache(cache_path),
+            batch_size=self.config.get("batch_size", self.backend.max_batch_size),
+        )
+        # "float16" halves memory and payload size again
+        self.dtype = self.config.get("dtype", "float32")
 
     def process(
         self, 
@@ -42,22 +69,40 @@ class EmbeddingPlugin(ProcessorPlugin):
         context: Optional[PipelineContext] = None,
         **kwargs
     ) -> Optional[WebisDocument]:
+        return self.process_batch([doc], context=context, **kwargs)[0]
+
+    def process_batch(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        for doc in docs:
+            if not doc.chunks:
+                logger.warning(f"Document {doc.id} has no chunks to embed")
         
-        if not doc.chunks:
-            logger.warning(f"Document {doc.id} has no chunks to embed")
-            return doc
-            
-        texts = [chunk.content for chunk in doc.chunks]
+        chunks = [chunk for doc in docs for chunk in doc.chunks]
+        if not chunks:
+            return docs
         
         try:
-            vectors = self.embeddings.embed_documents(texts)
+            matrix = self.embedder.embed_matrix([chunk.content for chunk in chunks], self.dtype)
             
-            for chunk, vector in zip(doc.chunks, vectors):
-                chunk.embedding = vector
-                
-            doc.add_processing_step(self.name, {"model": self.model})
+            # One contiguous matrix per document; chunks hold row indices
+            start = 0
+            for doc in docs:
+                if doc.chunks:
+                    stop = start + len(doc.chunks)
+                    doc.set_chunk_embeddings(matrix.take_rows(start, stop))
+                    start = stop
+                    doc.add_processing_step(
+                        self.name, {"model": self.model, "backend": self.backend.name}
+                    )
             
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             
-        return doc
+        return docs
+
+    def cleanup(self) -> None:
+        self.backend.close()
@@ -2,12 +2,11 @@
 HTML Fetcher Processor Plugin for Webis.
 """
 
+import asyncio
 import logging
 from typing import Optional
 
-import requests
-from bs4 import BeautifulSoup
-
+from webis.core.http import get_http_client
 from webis.core.plugin import ProcessorPlugin
 from webis.core.schema import WebisDocument, DocumentType, PipelineContext
 
@@ -23,6 +22,10 @@ class HtmlFetcherPlugin(ProcessorPlugin):
     description = "Fetch HTML content from URLs"
     supported_types = ["html", "pdf"] # Can fetch both
     
+    # Network-bound: fan requests out over threads
+    default_concurrency = 8
+    default_executor = "thread"
+    
     def __init__(self, config: Optional[dict] = None):
         super().__init__(config)
         self.timeout = self.config.get("timeout", 30)
@@ -30,6 +33,44 @@ class HtmlFetcherPlugin(ProcessorPlugin):
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         })
 
+    def _needs_fetch(self, doc: WebisDocument) -> bool:
+        # If content is already present, skip fetching
+        if doc.content and len(doc.content) > 100:
+            return False
+            
+        if not doc.meta.url:
+            logger.warning(f"Document {doc.id} has no URL, skipping fetch")
+            return False
+        return True
+
+    def _apply_response(self, doc: WebisDocument, resp) -> WebisDocument:
+        """Copy a fetched response (requests or httpx) onto the document."""
+        resp.raise_for_status()
+        
+        # Update content
+        doc.content = resp.text
+        
+        # Update doc type if it was unknown or generic HTML but we got a PDF
+        content_type = resp.headers.get("Content-Type", "").lower()
+        if "application/pdf" in content_type:
+            doc.doc_type = DocumentType.PDF
+            # For PDF, content might be binary bytes, but WebisDocument.content is str
+            # We might need to handle binary storage or immediate text extraction
+            # For now, let's store it as latin-1 decoded string to preserve bytes if needed
+            # Or better, just mark it and let a PDF processor handle the download/extraction
+            # Re-assigning content to empty and letting PDF processor handle it might be better
+            # But for simplicity in this v1, let's assume text-based content mostly.
+            pass
+        
+        doc.add_processing_step(self.name, {"status": "fetched", "status_code": resp.status_code})
+        return doc
+
+    def _fetch_failed(self, doc: WebisDocument, error: Exception) -> WebisDocument:
+        logger.error(f"Failed to fetch {doc.meta.url}: {error}")
+        doc.add_processing_step(self.name, {"status": "failed", "error": str(error)})
+        # Return the doc anyway, maybe other processors can handle metadata
+        return doc
+
     def process(
         self, 
         doc: WebisDocument, 
@@ -37,44 +78,44 @@ class HtmlFetcherPlugin(ProcessorPlugin):
         **kwargs
     ) -> Optional[WebisDocument]:
         
-        # If content is already present, skip fetching
-        if doc.content and len(doc.content) > 100:
-            return doc
-            
-        if not doc.meta.url:
-            logger.warning(f"Document {doc.id} has no URL, skipping fetch")
+        if not self._needs_fetch(doc):
             return doc
             
         try:
             logger.info(f"Fetching URL: {doc.meta.url}")
-            resp = requests.get(
+            resp = get_http_client(context).get(
                 doc.meta.url, 
                 headers=self.headers, 
                 timeout=self.timeout,
                 verify=False # Sometimes needed for scraping, use with caution
             )
-            resp.raise_for_status()
-            
-            # Update content
-            doc.content = resp.text
+            return self._apply_response(doc, resp)
             
-            # Update doc type if it was unknown or generic HTML but we got a PDF
-            content_type = resp.headers.get("Content-Type", "").lower()
-            if "application/pdf" in content_type:
-                doc.doc_type = DocumentType.PDF
-                # For PDF, content might be binary bytes, but WebisDocument.content is str
-                # We might need to handle binary storage or immediate text extraction
-                # For now, let's store it as latin-1 decoded string to preserve bytes if needed
-                # Or better, just mark it and let a PDF processor handle the download/extraction
-                # Re-assigning content to empty and letting PDF processor handle it might be better
-                # But for simplicity in this v1, let's assume text-based content mostly.
-                pass
-            
-            doc.add_processing_step(self.name, {"status": "fetched", "status_code": resp.status_code})
+        except Exception as e:
+            return self._fetch_failed(doc, e)
+
+    async def aprocess(
+        self,
+        doc: WebisDocument,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> Optional[WebisDocument]:
+        """Fetch on the shared async client instead of a worker thread."""
+        if not self._needs_fetch(doc):
             return doc
             
+        try:
+            logger.info(f"Fetching URL: {doc.meta.url}")
+            resp = await get_http_client(context).aget(
+                doc.meta.url,
+                headers=self.headers,
+                timeout=self.timeout,
+                verify=False
+            )
+            return self._apply_response(doc, resp)
+            
+        except ImportError:
+            # httpx is optional: fetch on the sync client in a worker thread
+            return await asyncio.to_thread(self.process, doc, context=context, **kwargs)
         except Exception as e:
-            logger.error(f"Failed to fetch {doc.meta.url}: {e}")
-            doc.add_processing_step(self.name, {"status": "failed", "error": str(e)})
-            # Return the doc anyway, maybe other processors can handle metadata
-            return doc
+            return self._fetch_failed(doc, e)
@@ -0,0 +1,92 @@
+"""
+Near-Duplicate Processor Plugin for Webis.
+"""
+
+import logging
+from typing import List, Optional
+
+from webis.core.near_duplicates import NearDuplicateIndex
+from webis.core.plugin import ProcessorPlugin
+from webis.core.schema import WebisDocument, PipelineContext
+
+logger = logging.getLogger(__name__)
+
+
+class NearDuplicatePlugin(ProcessorPlugin):
+    """
+    Drop or mark documents that nearly duplicate one seen before.
+
+    Compares word shingles of the cleaned text with a MinHash LSH index,
+    so copies of one article with different boilerplate are caught.
+    Place it after cleaning and before chunking, embedding and LLM stages.
+
+    Config:
+        threshold: Jaccard similarity from which a document is a near-duplicate (default 0.8)
+        action: "drop" to filter near-duplicates out, "mark" to keep them
+            linked to the original through ``parent_id`` (default "drop")
+        index_path: SQLite file persisting the index across runs (default: memory only)
+        num_perm: MinHash signature length (default 128)
+        shingle_size: Words per shingle (default 5)
+    """
+
+    name = "near_dedup"
+    description = "Drop or mark near-duplicate documents (MinHash LSH)"
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        self.action = self.config.get("action", "drop")
+        if self.action not in ("drop", "mark"):
+            raise ValueError(f"Unknown near-duplicate action: {self.action} (use drop or mark)")
+
+        self.index = NearDuplicateIndex(
+            path=self.config.get("index_path"),
+            threshold=self.config.get("threshold", 0.8),
+            num_perm=self.config.get("num_perm", 128),
+            shingle_size=self.config.get("shingle_size", 5),
+        )
+        self.dropped = 0
+
+    def _check(self, doc: WebisDocument) -> Optional[WebisDocument]:
+        signature = self.index.signature(doc.clean_content or doc.content)
+        if signature is None:
+            return doc
+
+        match = self.index.match_or_insert(doc.id, signature)
+        if match is None:
+            return doc
+
+        original_id, similarity = match
+        if self.action == "drop":
+            logger.debug(f"Dropping {doc.id}: near-duplicate of {original_id} ({similarity:.2f})")
+            self.dropped += 1
+            return None
+
+        if doc.parent_id is None:
+            doc.parent_id = original_id
+        doc.meta.custom["near_duplicate_of"] = original_id
+        doc.meta.custom["near_duplicate_similarity"] = round(similarity, 4)
+        doc.add_processing_step(self.name, {"near_duplicate_of": original_id, "similarity": similarity})
+        return doc
+
+    def process(
+        self,
+        doc: WebisDocument,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> Optional[WebisDocument]:
+        result = self._check(doc)
+        self.index.flush()
+        return result
+
+    def process_batch(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        results = [doc for doc in map(self._check, docs) if doc is not None]
+        self.index.flush()
+        return results
+
+    def cleanup(self) -> None:
+        self.index.close()
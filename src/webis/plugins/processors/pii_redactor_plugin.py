@@ -1,5 +1,6 @@
 import re
 from typing import Any, Dict, List, Optional
+from webis.core.batch import DIGITS, DocumentBatch, sub_column
 from webis.core.pipeline import PipelineContext
 from webis.core.plugin import ProcessorPlugin
 from webis.core.schema import WebisDocument
@@ -16,6 +17,13 @@ class PiiRedactorPlugin(ProcessorPlugin):
         "phone": r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b",
         # Add more patterns as needed
     }
+    
+    # Literals every match of a pattern contains; the column path skips
+    # values without any of them before running the regex
+    REQUIRED = {
+        "email": "@",
+        "phone": DIGITS,
+    }
 
     def process(self, doc: WebisDocument, context: Optional[PipelineContext] = None, **kwargs) -> WebisDocument:
         content = doc.content
@@ -32,3 +40,14 @@ class PiiRedactorPlugin(ProcessorPlugin):
             doc.clean_content = clean_redacted
             
         return doc
+
+    def process_columns(self, batch: DocumentBatch, context: Optional[PipelineContext] = None, **kwargs) -> DocumentBatch:
+        for column in ("content", "clean_content"):
+            values = batch[column]
+            for pii_type, pattern in self.PATTERNS.items():
+                values = sub_column(
+                    pattern, f"[{pii_type.upper()}_REDACTED]", values, required=self.REQUIRED.get(pii_type)
+                )
+            batch[column] = values
+        
+        return batch
@@ -1,18 +1,47 @@
-from typing import Any, Dict, List, Optional
+"""
+Relation Extractor Plugin for Webis.
+"""
+
 import json
-from webis.core.pipeline import PipelineContext
+import logging
+import re
+from typing import List, Optional
+
 from webis.core.plugin import ExtractorPlugin
-from webis.core.schema import WebisDocument, StructuredResult, Lineage
-from webis.core.llm.base import LLMFactory
+from webis.core.schema import WebisDocument, StructuredResult, Lineage, PipelineContext
+from webis.core.llm import LLMRouter, fit_to_budget, offline_batch_options
+
+logger = logging.getLogger(__name__)
+
+RELATION_INSTRUCTION = """Extract relationships from the text.
+Return a JSON list of objects with 'subject', 'relation', and 'object' fields."""
+
 
 class RelationExtractorPlugin(ExtractorPlugin):
     """
     Extracts entity relations (Subject -> Relation -> Object) from documents.
+
+    Documents are packed several per LLM call; a document whose answer
+    cannot be recovered is retried alone. With ``llm_mode="offline_batch"``
+    in the pipeline config, all documents go out as one batch job instead.
     """
     name = "relation_extractor"
-    
-    def __init__(self, model_name: str = "gpt-3.5-turbo"):
-        self.llm = LLMFactory.create_llm(model_name)
+    description = "Extract subject-relation-object triples using LLM"
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        self.model_name = self.config.get("model", "gpt-4o-mini")
+        # Limit content length for demo
+        self.max_input_tokens = self.config.get("max_input_tokens", 600)
+
+        self.llm = LLMRouter()
+        try:
+            self.llm.add_model(self.model_name, primary=True)
+        except ValueError:
+            logger.warning(f"Model {self.model_name} not found in builtins. Using gpt-4o-mini as fallback.")
+            self.model_name = "gpt-4o-mini"
+            self.llm.add_model(self.model_name, primary=True)
+        self.llm.batch_size = self.config.get("batch_size", 8)
 
     def extract(
         self,
@@ -20,42 +49,45 @@ class RelationExtractorPlugin(ExtractorPlugin):
         context: Optional[PipelineContext] = None,
         **kwargs
     ) -> StructuredResult:
-        
+
         all_relations = []
-        
-        for doc in docs:
-            content = doc.clean_content or doc.content
-            # Limit content length for demo
-            content = content[:2000]
-            
-            prompt = f"""
-            Extract relationships from the following text.
-            Return a JSON list of objects with 'subject', 'relation', and 'object' fields.
-            
-            Text:
-            {content}
-            
-            Output:
-            """
-            
+        model_config = self.llm.get_model_config()
+
+        results = self.llm.chat_batch(
+            RELATION_INSTRUCTION,
+            [
+                fit_to_budget(
+                    doc.clean_content or doc.content,
+                    model_config,
+                    output_tokens=512,
+                    max_input_tokens=self.max_input_tokens,
+                )
+                for doc in docs
+            ],
+            output_tokens_per_item=512,
+            ids=[doc.id for doc in docs],
+            **offline_batch_options(context)
+        )
+        for doc, result in zip(docs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Relation extraction failed for doc {doc.id}: {result}")
+                continue
             try:
-                response = self.llm.generate(prompt)
                 # Simple JSON parsing
-                import re
-                match = re.search(r"\[.*\]", response, re.DOTALL)
+                match = re.search(r"\[.*\]", result.content, re.DOTALL)
                 if match:
                     relations = json.loads(match.group(0))
                     for r in relations:
                         r["source_doc_id"] = doc.id
                     all_relations.extend(relations)
             except Exception as e:
-                print(f"Relation extraction failed for doc {doc.id}: {e}")
+                logger.error(f"Relation extraction failed for doc {doc.id}: {e}")
 
         return StructuredResult(
             schema_id="relation_triples",
             data=all_relations,
             lineage=Lineage(
                 source_doc_ids=[d.id for d in docs],
-                model_name=self.llm.model_name
+                model_name=self.model_name
             )
         )
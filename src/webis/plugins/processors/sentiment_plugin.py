@@ -1,42 +1,106 @@
-from typing import Any, Dict, List, Optional
-from webis.core.pipeline import PipelineContext
+"""
+Sentiment Analysis Processor Plugin for Webis.
+"""
+
+import json
+import logging
+import re
+from typing import Any, List, Optional
+
 from webis.core.plugin import ProcessorPlugin
-from webis.core.schema import WebisDocument
-from webis.core.llm.base import LLMFactory
+from webis.core.schema import WebisDocument, PipelineContext
+from webis.core.llm import LLMRouter, fit_to_budget
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_INSTRUCTION = """Analyze the sentiment of the text.
+Return a JSON object with:
+- "polarity": "positive", "negative", or "neutral"
+- "score": a float between -1.0 (negative) and 1.0 (positive)
+- "explanation": brief reason"""
+
 
 class SentimentAnalysisPlugin(ProcessorPlugin):
     """
     Analyzes sentiment of the document content.
+
+    Short classification prompts are packed several documents per LLM
+    call when the plugin gets a batch (or through the router's
+    micro-batching in async pipelines).
     """
     name = "sentiment_analysis"
-    
-    def __init__(self, model_name: str = "gpt-3.5-turbo"):
-        self.llm = LLMFactory.create_llm(model_name)
+    description = "Classify document sentiment using LLM"
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        self.model_name = self.config.get("model", "gpt-4o-mini")
+        self.max_input_tokens = self.config.get("max_input_tokens", 300)
+
+        self.llm = LLMRouter()
+        try:
+            self.llm.add_model(self.model_name, primary=True)
+        except ValueError:
+            logger.warning(f"Model {self.model_name} not found in builtins. Using gpt-4o-mini as fallback.")
+            self.llm.add_model("gpt-4o-mini", primary=True)
+        self.llm.enable_batching(
+            batch_size=self.config.get("batch_size", 16),
+            linger_ms=self.config.get("linger_ms", 50),
+        )
+
+    def _text(self, doc: WebisDocument) -> str:
+        return fit_to_budget(
+            doc.clean_content or doc.content,
+            self.llm.get_model_config(),
+            output_tokens=128,
+            max_input_tokens=self.max_input_tokens,
+        )
+
+    def _apply(self, doc: WebisDocument, result: Any) -> WebisDocument:
+        if isinstance(result, Exception):
+            logger.error(f"Sentiment analysis failed for {doc.id}: {result}")
+            return doc
+
+        match = re.search(r"\{.*\}", result.content, re.DOTALL)
+        if match:
+            try:
+                doc.meta.custom["sentiment"] = json.loads(match.group(0))
+            except json.JSONDecodeError as e:
+                logger.error(f"Unparseable sentiment for {doc.id}: {e}")
+        return doc
 
     def process(self, doc: WebisDocument, context: Optional[PipelineContext] = None, **kwargs) -> WebisDocument:
-        content = doc.clean_content or doc.content
-        content = content[:1000]
-        
-        prompt = f"""
-        Analyze the sentiment of the following text.
-        Return a JSON object with:
-        - "polarity": "positive", "negative", or "neutral"
-        - "score": a float between -1.0 (negative) and 1.0 (positive)
-        - "explanation": brief reason
-        
-        Text:
-        {content}
-        """
-        
+        return self.process_batch([doc], context=context, **kwargs)[0]
+
+    def process_batch(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        # Documents without text are passed through without an LLM call
+        pending = [doc for doc in docs if doc.clean_content or doc.content]
+        if pending:
+            results = self.llm.chat_batch(
+                SENTIMENT_INSTRUCTION,
+                [self._text(doc) for doc in pending],
+                output_tokens_per_item=128,
+            )
+            for doc, result in zip(pending, results):
+                self._apply(doc, result)
+        return docs
+
+    async def aprocess(
+        self,
+        doc: WebisDocument,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> WebisDocument:
+        if not (doc.clean_content or doc.content):
+            return doc
         try:
-            response = self.llm.generate(prompt)
-            import json
-            import re
-            match = re.search(r"\{.*\}", response, re.DOTALL)
-            if match:
-                sentiment = json.loads(match.group(0))
-                doc.meta.custom["sentiment"] = sentiment
+            result = await self.llm.achat_batched(
+                SENTIMENT_INSTRUCTION, self._text(doc), output_tokens_per_item=128
+            )
         except Exception as e:
-            print(f"Sentiment analysis failed: {e}")
-            
-        return doc
+            result = e
+        return self._apply(doc, result)
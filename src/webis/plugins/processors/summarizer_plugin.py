@@ -3,32 +3,56 @@ Summarizer Processor Plugin for Webis.
 """
 
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, List
 
 from webis.core.plugin import ProcessorPlugin
 from webis.core.schema import WebisDocument, PipelineContext
-from webis.core.llm import LLMRouter
+from webis.core.llm import LLMRouter, fit_to_budget, get_tokenizer, offline_batch_options
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant that summarizes web content."
+DEFAULT_INSTRUCTION = "Please summarize the following text in a concise manner:"
+
 
 class SummarizerPlugin(ProcessorPlugin):
     """
     Summarize document content using LLM.
+    
+    With ``llm_mode="offline_batch"`` in the pipeline config, a stage's
+    documents are summarized by one provider batch job.
+    
+    Every path (``process``, ``process_batch``, ``aprocess`` and batch
+    jobs) sends the same ``system_prompt`` and ``instruction``, so a
+    document gets the same prompt however it is scheduled.
+    
+    Config:
+        system_prompt: System message
+        instruction: Task text; the document text follows it
+        prompt: Former single template; must end with ``{text}``
     """
     
     name = "summarizer"
     description = "Summarize document content using LLM"
     supported_types = ["html", "pdf", "text"]
     
+    # One LLM call per document; overlap them on threads
+    default_concurrency = 4
+    default_executor = "thread"
+    
     def __init__(self, config: Optional[dict] = None):
         super().__init__(config)
         self.model_name = self.config.get("model", "gpt-4o-mini")
         self.max_tokens = self.config.get("max_tokens", 500)
-        self.prompt_template = self.config.get(
-            "prompt", 
-            "Please summarize the following text in a concise manner:\n\n{text}"
-        )
+        # Input cap in tokens (the model's context window also applies)
+        self.max_input_tokens = self.config.get("max_input_tokens", 4000)
+        self.system_prompt = self.config.get("system_prompt", DEFAULT_SYSTEM_PROMPT)
+        self.instruction = self.config.get("instruction", DEFAULT_INSTRUCTION)
+        template = self.config.get("prompt")
+        if template is not None:
+            if not template.endswith("{text}"):
+                raise ValueError("Summarizer prompt must end with {text}; use instruction instead")
+            self.instruction = template[:-len("{text}")].strip()
         
         # Initialize LLM Router
         self.llm = LLMRouter()
@@ -41,36 +65,85 @@ class SummarizerPlugin(ProcessorPlugin):
             # Or we fallback to a safe default if add_model fails.
             logger.warning(f"Model {self.model_name} not found in builtins. Using gpt-4o-mini as fallback.")
             self.llm.add_model("gpt-4o-mini", primary=True)
+        
+        # Batches of short documents are packed into multi-item prompts
+        self.llm.enable_batching(
+            batch_size=self.config.get("batch_size", 8),
+            linger_ms=self.config.get("linger_ms", 50),
+        )
 
+    def _text(self, doc: WebisDocument) -> str:
+        config = self.llm.get_model_config()
+        return fit_to_budget(
+            doc.clean_content or doc.content,
+            config,
+            output_tokens=self.max_tokens,
+            reserved_tokens=get_tokenizer(config).count(f"{self.system_prompt}\n{self.instruction}") + 32,
+            max_input_tokens=self.max_input_tokens,
+        )
+    
+    def _needs_summary(self, doc: WebisDocument) -> bool:
+        # Skip empty and already summarized documents
+        return bool(doc.content) and not doc.meta.custom.get("summary")
+    
     def process(
         self, 
         doc: WebisDocument, 
         context: Optional[PipelineContext] = None,
         **kwargs
     ) -> Optional[WebisDocument]:
+        return self.process_batch([doc], context=context, **kwargs)[0]
+
+    def process_batch(
+        self,
+        docs: List[WebisDocument],
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> List[WebisDocument]:
+        pending = [doc for doc in docs if self._needs_summary(doc)]
+        if not pending:
+            return docs
         
-        if not doc.content:
-            return doc
-            
-        # Skip if already summarized
-        if doc.meta.custom.get("summary"):
+        offline = offline_batch_options(context)
+        if offline:
+            logger.info(f"Summarizing {len(pending)} documents in an offline batch job")
+        elif len(pending) == 1:
+            logger.info(f"Summarizing document: {pending[0].meta.title}")
+        else:
+            logger.info(f"Summarizing {len(pending)} documents in packed calls")
+        results = self.llm.chat_batch(
+            self.instruction,
+            [self._text(doc) for doc in pending],
+            system=self.system_prompt,
+            output_tokens_per_item=self.max_tokens,
+            ids=[doc.id for doc in pending],
+            **offline
+        )
+        for doc, result in zip(pending, results):
+            self._apply(doc, result)
+        return docs
+    
+    async def aprocess(
+        self,
+        doc: WebisDocument,
+        context: Optional[PipelineContext] = None,
+        **kwargs
+    ) -> Optional[WebisDocument]:
+        if not self._needs_summary(doc):
             return doc
-            
-        # Truncate content if too long (simple truncation for now)
-        # In a real app, we'd use token counting
-        text = doc.content[:10000] 
-        
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant that summarizes web content."},
-            {"role": "user", "content": self.prompt_template.format(text=text)}
-        ]
-        
         try:
-            logger.info(f"Summarizing document: {doc.meta.title}")
-            response = self.llm.chat(messages)
-            doc.meta.custom["summary"] = response.content
-            doc.meta.custom["summary_model"] = response.model
+            result = await self.llm.achat_batched(
+                self.instruction, self._text(doc),
+                system=self.system_prompt, output_tokens_per_item=self.max_tokens,
+            )
         except Exception as e:
-            logger.error(f"Summarization failed for {doc.meta.url}: {e}")
-            
+            result = e
+        return self._apply(doc, result)
+    
+    def _apply(self, doc: WebisDocument, result) -> WebisDocument:
+        if isinstance(result, Exception):
+            logger.error(f"Summarization failed for {doc.meta.url}: {result}")
+        else:
+            doc.meta.custom["summary"] = result.content
+            doc.meta.custom["summary_model"] = result.model
         return doc
@@ -1,6 +1,7 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
 from datetime import datetime
+from webis.core.batch import DIGITS, DocumentBatch, rows_matching
 from webis.core.plugin import ProcessorPlugin
 from webis.core.schema import WebisDocument, PipelineContext
 
@@ -11,23 +12,36 @@ class TemporalExtractorPlugin(ProcessorPlugin):
     """
     name = "temporal_extractor"
 
-    def __init__(self, date_formats: List[str] = None):
+    def __init__(self, date_formats: List[str] = None, config: Optional[Dict[str, Any]] = None):
+        super().__init__(config)
         self.date_formats = date_formats or ["%Y-%m-%d", "%Y年%m月%d日"]
         # Simple regex for demonstration. In production, use a library like dateparser or an LLM.
         self.date_pattern = re.compile(r'(\d{4}年\d{1,2}月\d{1,2}日|\d{4}-\d{2}-\d{2})')
 
-    def process(self, doc: WebisDocument, context: PipelineContext) -> WebisDocument:
+    def process(self, doc: WebisDocument, context: Optional[PipelineContext] = None, **kwargs) -> WebisDocument:
         
         text = doc.content
         events = self._extract_events(text)
         
         # Store extracted events in metadata
-        if "events" not in doc.meta.extra:
-            doc.meta.extra["events"] = []
-        doc.meta.extra["events"].extend(events)
+        if "events" not in doc.meta.custom:
+            doc.meta.custom["events"] = []
+        doc.meta.custom["events"].extend(events)
         
         return doc
 
+    def process_columns(self, batch: DocumentBatch, context: Optional[PipelineContext] = None, **kwargs) -> DocumentBatch:
+        contents = batch["content"]
+        # Every date contains digits: documents without any are skipped by a
+        # substring test, and only documents with dates are split into sentences
+        dated = rows_matching(self.date_pattern, contents, required=DIGITS)
+        for meta, text, has_dates in zip(batch["meta"], contents, dated):
+            events = meta.custom.setdefault("events", [])
+            if has_dates:
+                events.extend(self._extract_events(text))
+        
+        return batch
+
     def _extract_events(self, text: str) -> List[Dict[str, Any]]:
         events = []
         # Split by sentences to associate dates with immediate context
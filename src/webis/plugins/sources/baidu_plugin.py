@@ -8,8 +8,7 @@ import json
 import time
 from typing import Iterator, Optional, Dict, Any, List
 
-import requests
-
+from webis.core.http import HttpClient, get_http_client
 from webis.core.plugin import SourcePlugin
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata, PipelineContext
 
@@ -44,9 +43,11 @@ class BaiduSearchPlugin(SourcePlugin):
             logger.error("Missing BAIDU_AISEARCH_BEARER")
             return
 
+        http = get_http_client(context)
+        
         # 1. List tools
         try:
-            tools = self._mcp_tools_list(bearer)
+            tools = self._mcp_tools_list(http, bearer)
             if not tools:
                 logger.warning("No tools available from Baidu MCP")
                 return
@@ -63,7 +64,7 @@ class BaiduSearchPlugin(SourcePlugin):
                 
             # 3. Call tool
             args = {"query": query} # Simplified arg construction
-            raw_response = self._mcp_tools_call(bearer, chosen_tool["name"], args)
+            raw_response = self._mcp_tools_call(http, bearer, chosen_tool["name"], args)
             
             # 4. Extract URLs and yield documents
             # The raw response structure depends on the specific MCP tool
@@ -90,15 +91,15 @@ class BaiduSearchPlugin(SourcePlugin):
         except Exception as e:
             logger.error(f"Baidu search failed: {e}")
 
-    def _mcp_tools_list(self, bearer: str) -> List[Dict[str, Any]]:
+    def _mcp_tools_list(self, http: HttpClient, bearer: str) -> List[Dict[str, Any]]:
         headers = {"Content-Type": "application/json", "Authorization": f"Bearer {bearer}"}
         payload = {"jsonrpc": "2.0", "method": "tools/list", "id": 1}
-        resp = requests.post(self.mcp_url, headers=headers, json=payload, timeout=10)
+        resp = http.post(self.mcp_url, headers=headers, json=payload, timeout=10)
         resp.raise_for_status()
         data = resp.json()
         return data.get("result", {}).get("tools", [])
 
-    def _mcp_tools_call(self, bearer: str, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    def _mcp_tools_call(self, http: HttpClient, bearer: str, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
         headers = {"Content-Type": "application/json", "Authorization": f"Bearer {bearer}"}
         payload = {
             "jsonrpc": "2.0", 
@@ -106,7 +107,7 @@ class BaiduSearchPlugin(SourcePlugin):
             "id": 1,
             "params": {"name": tool_name, "arguments": args}
         }
-        resp = requests.post(self.mcp_url, headers=headers, json=payload, timeout=30)
+        resp = http.post(self.mcp_url, headers=headers, json=payload, timeout=30)
         resp.raise_for_status()
         return resp.json().get("result", {})
 
@@ -6,8 +6,7 @@ import logging
 import os
 from typing import Iterator, Optional
 
-import requests
-
+from webis.core.http import get_http_client
 from webis.core.plugin import SourcePlugin
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata, PipelineContext
 
@@ -40,7 +39,7 @@ class GitHubSearchPlugin(SourcePlugin):
             headers["Authorization"] = f"token {token}"
             
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=20)
+            resp = get_http_client(context).get(url, params=params, headers=headers, timeout=20)
             resp.raise_for_status()
             items = resp.json().get("items", [])
             
@@ -2,58 +2,222 @@
 Hacker News Source Plugin for Webis.
 """
 
+import json
 import logging
-from typing import Iterator, Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import requests
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
+from webis.core.http import HttpClient, get_http_client
 from webis.core.plugin import SourcePlugin
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata, PipelineContext
 
 logger = logging.getLogger(__name__)
 
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+
+
+class HackerNewsItemCache:
+    """
+    TTL cache of Hacker News items keyed by item id.
+
+    Items younger than ``ttl`` seconds are served from the cache, so
+    repeated runs only hit the API for new stories or stories whose entry
+    has expired (e.g. to pick up score changes). If ``path`` is given the
+    cache is persisted as JSON and shared across processes: each save
+    merges into the file instead of overwriting it.
+    """
+
+    def __init__(self, ttl: float = 300.0, path: Optional[str] = None):
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        self._items: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        if path and os.path.exists(path):
+            self._load()
+
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._items.get(str(item_id))
+        if entry and time.time() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def put(self, item_id: int, item: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[str(item_id)] = (time.time(), item)
+
+    def save(self) -> None:
+        """
+        Merge unexpired entries into ``path`` (no-op without a path).
+
+        Entries saved by other processes are kept, and also picked up by
+        this cache; for an item in both, the later fetch wins.
+        """
+        if not self.path:
+            return
+        with self._lock, self._file_lock():
+            merged = self._read()
+            for key, entry in self._items.items():
+                if key not in merged or entry[0] >= merged[key][0]:
+                    merged[key] = entry
+            now = time.time()
+            fresh = {k: v for k, v in merged.items() if now - v[0] < self.ttl}
+            self._items = fresh
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(fresh, f)
+            os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _file_lock(self):
+        # Serializes read-merge-write across processes (POSIX only)
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {k: (v[0], v[1]) for k, v in data.items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable HN item cache {self.path}: {e}")
+            return {}
+
+    def _load(self) -> None:
+        self._items = self._read()
+
+
+class HackerNewsClient:
+    """
+    Fetches Hacker News story lists and hydrates items concurrently.
+
+    Shared by HackerNewsPlugin and the legacy crawler tool.
+
+    Example:
+        >>> client = HackerNewsClient(max_workers=16)
+        >>> for item_id, item in client.iter_items(client.top_story_ids(100)):
+        ...     print(item["title"])
+    """
+
+    def __init__(
+        self,
+        http: Optional[HttpClient] = None,
+        max_workers: int = 16,
+        cache: Optional[HackerNewsItemCache] = None,
+    ):
+        self.http = http or get_http_client()
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+
+    def top_story_ids(self, limit: int) -> List[int]:
+        resp = self.http.get(f"{HN_API_URL}/topstories.json", timeout=20)
+        resp.raise_for_status()
+        return resp.json()[:limit]
+
+    def get_item(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Fetch one item, from the cache if fresh. Returns None on failure."""
+        if self.cache is not None:
+            item = self.cache.get(item_id)
+            if item is not None:
+                return item
+
+        resp = self.http.get(f"{HN_API_URL}/item/{item_id}.json", timeout=10)
+        if not resp.ok:
+            return None
+        item = resp.json()
+        if item and self.cache is not None:
+            self.cache.put(item_id, item)
+        return item
+
+    def iter_items(self, ids: List[int]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Hydrate ``ids`` with up to ``max_workers`` requests in flight.
+
+        Items are yielded in rank order as soon as they and every item
+        ranked above them have arrived; items that fail are skipped.
+        Requests not yet started are cancelled if the consumer stops early.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [(item_id, executor.submit(self.get_item, item_id)) for item_id in ids]
+            for item_id, future in futures:
+                try:
+                    item = future.result()
+                except Exception as e:
+                    logger.warning(f"Failed to fetch HN item {item_id}: {e}")
+                    continue
+                if item:
+                    yield item_id, item
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.cache is not None:
+                self.cache.save()
+
 
 class HackerNewsPlugin(SourcePlugin):
     """
     Fetch top stories from Hacker News.
+
+    Config:
+        max_workers: Concurrent item requests (default 16)
+        cache_ttl: Seconds an item is reused across runs (default 300, 0 disables)
+        cache_path: Optional JSON file to persist the item cache
     """
-    
+
     name = "hackernews"
     description = "Fetch top stories from Hacker News"
-    
+
+    def __init__(self, config: Optional[dict] = None):
+        super().__init__(config)
+        self.max_workers = self.config.get("max_workers", 16)
+        cache_ttl = self.config.get("cache_ttl", 300)
+        self.cache = (
+            HackerNewsItemCache(ttl=cache_ttl, path=self.config.get("cache_path"))
+            if cache_ttl else None
+        )
+
     def fetch(
-        self, 
+        self,
         query: str, # Query is ignored for HN top stories, or could be used to filter
-        limit: int = 10, 
+        limit: int = 10,
         context: Optional[PipelineContext] = None,
         **kwargs
     ) -> Iterator[WebisDocument]:
-        
+
+        client = HackerNewsClient(
+            http=get_http_client(context),
+            max_workers=kwargs.get("max_workers", self.max_workers),
+            cache=self.cache,
+        )
         try:
             # 1. Get top stories IDs
-            resp = requests.get(
-                "https://hacker-news.firebaseio.com/v0/topstories.json",
-                timeout=20
-            )
-            resp.raise_for_status()
-            ids = resp.json()[:limit]
-            
-            # 2. Fetch details for each story
-            for item_id in ids:
-                item_resp = requests.get(
-                    f"https://hacker-news.firebaseio.com/v0/item/{item_id}.json",
-                    timeout=10
-                )
-                if not item_resp.ok:
-                    continue
-                    
-                item = item_resp.json()
+            ids = client.top_story_ids(limit)
+
+            # 2. Fetch details for the stories concurrently, in rank order
+            for item_id, item in client.iter_items(ids):
                 url = item.get("url")
-                
+
                 # If no URL (e.g. Ask HN), use the HN item link
                 if not url:
                     url = f"https://news.ycombinator.com/item?id={item_id}"
-                
+
                 yield WebisDocument(
                     content="", # Content to be fetched by processor
                     doc_type=DocumentType.HTML,
@@ -69,6 +233,6 @@ class HackerNewsPlugin(SourcePlugin):
                         }
                     )
                 )
-                
+
         except Exception as e:
             logger.error(f"Hacker News fetch failed: {e}")
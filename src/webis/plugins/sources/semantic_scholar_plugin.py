@@ -5,8 +5,7 @@ Semantic Scholar Source Plugin for Webis.
 import logging
 from typing import Iterator, Optional
 
-import requests
-
+from webis.core.http import get_http_client
 from webis.core.plugin import SourcePlugin
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata, PipelineContext
 
@@ -38,7 +37,7 @@ class SemanticScholarPlugin(SourcePlugin):
         }
         
         try:
-            resp = requests.get(self.API_URL, params=params, timeout=20)
+            resp = get_http_client(context).get(self.API_URL, params=params, timeout=20)
             resp.raise_for_status()
             data = resp.json()
             papers = data.get("data", [])
@@ -6,8 +6,7 @@ import logging
 import os
 from typing import Iterator, Optional
 
-import requests
-
+from webis.core.http import get_http_client
 from webis.core.plugin import SourcePlugin
 from webis.core.schema import WebisDocument, DocumentType, DocumentMetadata, PipelineContext
 
@@ -48,7 +47,7 @@ class SerpApiPlugin(SourcePlugin):
         }
         
         try:
-            resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+            resp = get_http_client(context).get("https://serpapi.com/search", params=params, timeout=30)
             resp.raise_for_status()
             data = resp.json()
             
@@ -7,7 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from webis import __version__
-from webis.server.routers import ingest, query, tasks, compliance
+from webis.server.routers import ingest, query, tasks, compliance, llm
 
 app = FastAPI(
     title="Webis API",
@@ -32,6 +32,7 @@ app.include_router(ingest.router, prefix="/api/v1/ingest", tags=["Ingestion"])
 app.include_router(query.router, prefix="/api/v1/query", tags=["Query"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["Tasks"])
 app.include_router(compliance.router, prefix="/api/v1/compliance", tags=["Compliance"])
+app.include_router(llm.router, prefix="/api/v1/llm", tags=["LLM"])
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,73 @@
+"""
+LLM API router.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from webis.core.llm import get_default_router
+
+router = APIRouter()
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+class ChatRequest(BaseModel):
+    messages: List[ChatMessage]
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream a chat completion as server-sent events.
+
+    Emits ``delta`` events with content fragments as they arrive, then a
+    ``done`` event with usage, time to first token and tokens/sec, or an
+    ``error`` event if the call fails.
+    """
+    llm = get_default_router()
+    messages = [m.model_dump() for m in request.messages]
+    params = request.model_dump(include={"temperature", "max_tokens"}, exclude_none=True)
+
+    async def events() -> AsyncIterator[str]:
+        stream = None
+        try:
+            # Unknown models raise here, before the first event
+            stream = llm.astream(messages, model=request.model, **params)
+            async for delta in stream:
+                yield _sse("delta", {"content": delta})
+        except Exception as e:
+            yield _sse("error", {"message": str(e)})
+            return
+        finally:
+            if stream is not None:
+                await stream.aclose()
+
+        response = stream.response
+        yield _sse("done", {
+            "model": response.model,
+            "prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "cost": response.cost,
+            "latency_ms": response.latency_ms,
+            "ttft_ms": response.ttft_ms,
+            "tokens_per_second": response.tokens_per_second,
+            "cached": response.cached,
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,255 @@
+"""
+Local fake of the OpenAI-compatible files and batches API.
+
+Lets offline batch runs (``llm_mode="offline_batch"``) be exercised end to
+end without a provider account: jobs are answered by a local responder
+and complete after a configurable number of status polls.
+
+Example:
+    >>> with FakeBatchServer(polls_to_complete=2) as server:
+    ...     config = ModelConfig(name="fake", provider="openai",
+    ...                          base_url=server.base_url, api_key_env="FAKE_KEY")
+    ...     BatchJobProvider(poll_interval=0).run_job({"a": messages}, config)
+"""
+
+import email.parser
+import email.policy
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Responder = Callable[[Dict[str, Any]], str]
+
+
+def echo_responder(body: Dict[str, Any]) -> str:
+    """Answer with the last user message."""
+    return f"echo: {body['messages'][-1]['content']}"
+
+
+class FakeBatchServer:
+    """
+    In-process HTTP server speaking the subset of the batch API used by
+    ``BatchJobProvider``.
+
+    Args:
+        responder: Maps a chat request body to the answer text; an
+            exception becomes an entry in the job's error file
+        polls_to_complete: Status polls a job reports "in_progress" before
+            it completes
+        host: Interface to bind
+        port: Port to bind (0 = any free port)
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Responder] = None,
+        polls_to_complete: int = 1,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.responder = responder or echo_responder
+        self.polls_to_complete = polls_to_complete
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeBatchServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeBatchServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---- API ----
+
+    def _file_object(self, file_id: str, filename: str, purpose: str) -> Dict[str, Any]:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(self.files[file_id]),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def upload_file(self, content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self.files[file_id] = content
+        return self._file_object(file_id, filename, purpose)
+
+    def create_batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": request["endpoint"],
+            "input_file_id": request["input_file_id"],
+            "completion_window": request["completion_window"],
+            "created_at": int(time.time()),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "_polls": 0,
+        }
+        with self._lock:
+            self.batches[batch_id] = batch
+        return self._public(batch)
+
+    def retrieve_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress":
+                batch["_polls"] += 1
+                if batch["_polls"] >= self.polls_to_complete:
+                    self._complete(batch)
+            return self._public(batch)
+
+    def _complete(self, batch: Dict[str, Any]) -> None:
+        outputs: List[str] = []
+        errors: List[str] = []
+        for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                answer = self.responder(request["body"])
+            except Exception as e:
+                errors.append(json.dumps({
+                    "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 500, "body": {"error": {"message": str(e)}}},
+                    "error": None,
+                }))
+                continue
+            outputs.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": self._completion(request["body"], answer)},
+                "error": None,
+            }))
+
+        batch["request_counts"] = {
+            "total": len(outputs) + len(errors),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+        batch["status"] = "completed"
+        if outputs:
+            batch["output_file_id"] = self._store("\n".join(outputs) + "\n")
+        if errors:
+            batch["error_file_id"] = self._store("\n".join(errors) + "\n")
+
+    def _store(self, content: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        self.files[file_id] = content.encode("utf-8")
+        return file_id
+
+    @staticmethod
+    def _completion(body: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        prompt_tokens = sum(len(m.get("content") or "") for m in body["messages"]) // 4
+        completion_tokens = len(answer) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @staticmethod
+    def _public(batch: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in batch.items() if not k.startswith("_")}
+
+    # ---- HTTP ----
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, payload: Any, content_type: str = "application/json"):
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_POST(self):
+                if self.path == "/v1/files":
+                    # Multipart upload: parse it as a MIME message
+                    raw = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + self._body()
+                    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(raw)
+                    fields: Dict[str, Any] = {}
+                    for part in message.iter_parts():
+                        name = part.get_param("name", header="content-disposition")
+                        fields[name] = (part.get_filename(), part.get_payload(decode=True))
+                    filename, content = fields["file"]
+                    purpose = fields.get("purpose", (None, b"batch"))[1].decode()
+                    self._send(200, server.upload_file(content, filename or "upload.jsonl", purpose))
+                elif self.path == "/v1/batches":
+                    self._send(200, server.create_batch(json.loads(self._body())))
+                else:
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 3 and parts[:2] == ["v1", "batches"]:
+                    batch = server.retrieve_batch(parts[2])
+                    if batch is not None:
+                        return self._send(200, batch)
+                elif len(parts) == 4 and parts[:2] == ["v1", "files"] and parts[3] == "content":
+                    content = server.files.get(parts[2])
+                    if content is not None:
+                        return self._send(200, content, "application/octet-stream")
+                self._send(404, {"error": {"message": f"Not found: {self.path}"}})
+
+        return Handler
+
+
+__all__ = [
+    "FakeBatchServer",
+    "echo_responder",
+]
@@ -2,6 +2,7 @@ import pytest
 from webis.core.pipeline import Pipeline
 from webis.core.plugin import ProcessorPlugin, SourcePlugin, PluginRegistry
 from webis.core.schema import WebisDocument
+from webis.core.llm import LLMProvider, LLMResponse
 
 class MockSource(SourcePlugin):
     name = "mock_source"
@@ -31,3 +32,1366 @@ def test_pipeline_basic():
     assert result.context.get("status") == "ok"
     assert len(result.documents) == 1
     assert result.documents[0].content == "test content"
+
+class SlowSource(SourcePlugin):
+    def __init__(self, name, delay=0.2):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+    def fetch(self, query, **kwargs):
+        import time
+        time.sleep(self.delay)
+        yield WebisDocument(content=f"from {self.name}")
+
+def test_pipeline_dag_fans_in_parallel_sources():
+    registry = PluginRegistry()
+    registry.register(SlowSource("slow_a"))
+    registry.register(SlowSource("slow_b"))
+    registry.register(MockPlugin())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("slow_a")
+    pipeline.add_source("slow_b")
+    pipeline.add_processor("mock_plugin", depends_on=["source_slow_a", "source_slow_b"])
+    
+    result = pipeline.run("test")
+    
+    assert result.success
+    assert sorted(d.content for d in result.documents) == ["from slow_a", "from slow_b"]
+    assert set(result.stage_timings) == {"source_slow_a", "source_slow_b", "process_mock_plugin"}
+    # Sources overlap, so the critical path is well under the serial sum
+    assert result.critical_path[-1] == "process_mock_plugin"
+    assert result.critical_path_seconds < result.total_stage_seconds
+    assert result.duration_seconds < 0.35
+
+class TagPlugin(ProcessorPlugin):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+    def process(self, doc, context=None, **kwargs):
+        import time
+        doc.meta.custom["branch"] = self.name
+        time.sleep(0.05)
+        doc.meta.custom.setdefault("seen", []).append(self.name)
+        doc.meta.tags.append(self.name)
+        doc.add_processing_step(self.name)
+        return doc
+
+def test_pipeline_dag_branches_get_their_own_documents(caplog):
+    registry = PluginRegistry()
+    registry.register(SlowSource("slow_a"))
+    registry.register(TagPlugin("tag_a"))
+    registry.register(TagPlugin("tag_b"))
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("slow_a")
+    pipeline.add_processor("tag_a", depends_on=["source_slow_a"])
+    pipeline.add_processor("tag_b", depends_on=["source_slow_a"])
+    pipeline.add_processor("tag_c", depends_on=["process_tag_a", "process_tag_b"])
+    registry.register(TagPlugin("tag_c"))
+    
+    result = pipeline.run("test")
+    
+    # Both branches' changes reach the join; the value they both set keeps tag_a's
+    assert result.success
+    [doc] = result.documents
+    assert doc.meta.custom == {"branch": "tag_c", "seen": ["tag_a", "tag_b", "tag_c"]}
+    assert doc.meta.tags == ["tag_a", "tag_b", "tag_c"]
+    assert [step["plugin"] for step in doc.processing_history][-3:] == ["tag_a", "tag_b", "tag_c"]
+    assert "meta.custom.branch" in caplog.text
+    
+    # Parallel sinks are merged the same way
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("slow_a")
+    pipeline.add_processor("tag_a", depends_on=["source_slow_a"])
+    pipeline.add_processor("tag_b", depends_on=["source_slow_a"])
+    [doc] = pipeline.run("test").documents
+    assert doc.meta.tags == ["tag_a", "tag_b"]
+
+def test_pipeline_run_reports_unexpected_errors():
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("missing_plugin")
+    
+    result = pipeline.run("test", limit=2, stream=True)
+    
+    assert not result.success
+    assert pipeline._pools == {}
+
+def test_pipeline_dag_rejects_cycles():
+    pipeline = Pipeline(registry=PluginRegistry())
+    pipeline.add_processor("a", stage_name="a", depends_on=["b"])
+    pipeline.add_processor("b", stage_name="b", depends_on=["a"])
+    
+    with pytest.raises(ValueError):
+        pipeline.run("test")
+
+class TrickleSource(SourcePlugin):
+    name = "trickle_source"
+    def fetch(self, query, limit=10, **kwargs):
+        import time
+        for i in range(limit):
+            time.sleep(0.05)
+            yield WebisDocument(content=f"doc {i}")
+
+class UpperPlugin(ProcessorPlugin):
+    name = "upper"
+    def process(self, doc, context=None, **kwargs):
+        doc.clean_content = doc.content.upper()
+        return doc
+
+def test_pipeline_run_stream_yields_before_source_finishes():
+    import time
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(UpperPlugin())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("upper")
+    
+    started = time.time()
+    stream = pipeline.run_stream("test", limit=6, batch_size=2, queue_size=2)
+    first = next(stream)
+    assert time.time() - started < 0.2
+    assert first.clean_content == "DOC 0"
+    
+    rest = list(stream)
+    assert [d.clean_content for d in rest] == [f"DOC {i}" for i in range(1, 6)]
+
+class BrokenPlugin(ProcessorPlugin):
+    name = "broken"
+    def process(self, doc, context=None, **kwargs):
+        raise RuntimeError("boom")
+
+def test_pipeline_run_stream_surfaces_stage_errors():
+    from webis.core.pipeline import PipelineStreamError
+    from webis.core.schema import PipelineContext
+    
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(BrokenPlugin())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("broken")
+    
+    context = PipelineContext(task="test")
+    with pytest.raises(PipelineStreamError) as raised:
+        list(pipeline.run_stream("test", limit=3, context=context))
+    assert raised.value.failed_stages == ["process_broken"]
+    assert context.get("stream_errors")[0]["error"] == "boom"
+    
+    # With continue_on_error, documents pass through and errors are still recorded
+    pipeline._stages[-1].continue_on_error = True
+    context = PipelineContext(task="test")
+    assert len(list(pipeline.run_stream("test", limit=3, context=context))) == 3
+    assert context.get("stream_errors")
+
+def test_pipeline_run_stream_mode_result():
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(UpperPlugin())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("upper")
+    
+    result = pipeline.run("test", limit=3, stream=True)
+    
+    assert result.success
+    assert [d.clean_content for d in result.documents] == ["DOC 0", "DOC 1", "DOC 2"]
+    assert "process_upper" in result.stage_timings
+
+class SleepyPlugin(ProcessorPlugin):
+    name = "sleepy"
+    is_filter = True
+    def process(self, doc, context=None, **kwargs):
+        import time
+        time.sleep(0.05)
+        if doc.content.endswith("3"):
+            return None
+        return doc
+
+@pytest.mark.parametrize("executor", ["thread", "async"])
+def test_processor_concurrency_preserves_order_and_filters(executor):
+    import time
+    docs = [WebisDocument(content=f"doc {i}") for i in range(8)]
+    
+    started = time.time()
+    processed = SleepyPlugin().process_batch_concurrent(docs, concurrency=8, executor=executor)
+    
+    assert time.time() - started < 0.3
+    assert [d.content for d in processed] == [f"doc {i}" for i in range(8) if i != 3]
+
+def test_distributed_executor_reuses_async_loop():
+    import asyncio
+    from webis.core.execution.distributed_executor import DistributedExecutor
+    
+    async def loop_id(item):
+        return id(asyncio.get_running_loop())
+    
+    async def nested(item):
+        with pytest.raises(RuntimeError, match="own event loop"):
+            pool.map(loop_id, [item])
+        return item
+    
+    async def from_running_loop():
+        return pool.map(loop_id, [1, 2])
+    
+    with DistributedExecutor(max_workers=2, mode="async") as pool:
+        first = pool.map(loop_id, [1, 2, 3])
+        second = asyncio.run(from_running_loop())
+        assert len(set(first + second)) == 1
+        assert pool.map(nested, [7]) == [7]
+    assert pool._loop is None
+
+class LoopRecorder(ProcessorPlugin):
+    name = "loop_recorder"
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.loops = set()
+    def process(self, doc, context=None, **kwargs):
+        return doc
+    async def aprocess(self, doc, context=None, **kwargs):
+        import asyncio
+        self.loops.add(id(asyncio.get_running_loop()))
+        return doc
+
+def test_pipeline_keeps_stage_pool_for_the_run():
+    class BurstSource(SourcePlugin):
+        name = "burst_source"
+        def fetch(self, query, limit=10, **kwargs):
+            import time
+            for i in range(0, limit, 3):
+                time.sleep(0.05)
+                yield from (WebisDocument(content=f"doc {j}") for j in range(i, min(i + 3, limit)))
+    
+    registry = PluginRegistry()
+    registry.register(BurstSource())
+    recorder = LoopRecorder()
+    registry.register(recorder)
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("burst_source")
+    pipeline.add_processor("loop_recorder", concurrency=4, executor="async")
+    
+    result = pipeline.run("test", limit=9, stream=True, batch_size=3)
+    
+    assert result.success
+    assert len(result.documents) == 9
+    assert len(recorder.loops) == 1
+    assert pipeline._pools == {}
+
+def test_pipeline_stage_concurrency():
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(SleepyPlugin())
+    
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("sleepy", concurrency=5, executor="thread")
+    
+    result = pipeline.run("test", limit=5)
+    
+    assert result.success
+    assert [d.content for d in result.documents] == ["doc 0", "doc 1", "doc 2", "doc 4"]
+    assert result.stage_timings["process_sleepy"] < 0.2
+
+class AsyncSleepyPlugin(ProcessorPlugin):
+    name = "async_sleepy"
+    def process(self, doc, context=None, **kwargs):
+        raise AssertionError("sync path should not be used")
+    async def aprocess(self, doc, context=None, **kwargs):
+        import asyncio
+        await asyncio.sleep(0.1)
+        doc.clean_content = doc.content.upper()
+        return doc
+
+def test_async_pipeline_arun():
+    import asyncio
+    import time
+    from webis.core.pipeline.async_pipeline import AsyncPipeline
+    
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(AsyncSleepyPlugin())
+    registry.register(SleepyPlugin())
+    
+    pipeline = AsyncPipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("async_sleepy")
+    pipeline.add_processor("sleepy")  # sync plugin, offloaded to threads
+    
+    started = time.time()
+    result = asyncio.run(pipeline.arun("test", limit=5))
+    
+    assert result.success
+    assert [d.clean_content for d in result.documents] == ["DOC 0", "DOC 1", "DOC 2", "DOC 4"]
+    # 5 x (50ms fetch + 100ms + 50ms) serially would be ~1s
+    assert time.time() - started < 0.6
+    
+    # A processor that cannot be bound fails the run, as in Pipeline.run
+    pipeline.add_processor("missing_plugin")
+    result = asyncio.run(pipeline.arun("test", limit=5))
+    assert not result.success
+    assert result.errors[0]["stage"] == "process_missing_plugin"
+    assert result.documents == []
+
+def test_http_client_shared_per_config():
+    from webis.core.http import get_http_client
+    from webis.core.schema import PipelineContext
+    
+    ctx = PipelineContext(task="test", config={"http": {"max_concurrency_per_host": 2}})
+    other = PipelineContext(task="other", config={"http": {"max_concurrency_per_host": 2}})
+    
+    assert ctx.http is other.http
+    assert ctx.http is get_http_client(ctx)
+    assert ctx.http is not get_http_client()
+    assert ctx.http.config.max_concurrency_per_host == 2
+
+def test_http_client_dns_cache_is_per_client(monkeypatch):
+    import socket
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from webis.core.http import HttpClient, HttpClientConfig
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        def log_message(self, *args):
+            pass
+    
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    original = socket.getaddrinfo
+    lookups = []
+    def counting_getaddrinfo(host, *args, **kwargs):
+        lookups.append(host)
+        return original(host, *args, **kwargs)
+    monkeypatch.setattr(socket, "getaddrinfo", counting_getaddrinfo)
+    
+    try:
+        client = HttpClient(config=HttpClientConfig(dns_cache_ttl=60, dns_cache_size=1))
+        url = f"http://localhost:{server.server_port}/"
+        for _ in range(3):
+            resp = client.get(url, headers={"Connection": "close"})
+            assert resp.text == "ok"
+        
+        assert lookups.count("localhost") == 1
+        assert len(client.dns_cache) == 1
+        assert socket.getaddrinfo is counting_getaddrinfo
+        assert HttpClient().dns_cache is None
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class EchoProvider(LLMProvider):
+    def __init__(self):
+        self.calls = 0
+    def chat(self, messages, model_config, **kwargs):
+        self.calls += 1
+        return LLMResponse(content=messages[-1]["content"], model=model_config.name, total_tokens=3)
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_llm_response_cache(backend, tmp_path):
+    from webis.core.llm import LLMRouter, ModelConfig, ResponseCache, SQLiteCacheBackend
+    
+    if backend == "sqlite":
+        cache = ResponseCache(backend=SQLiteCacheBackend(str(tmp_path / "cache.db")))
+    else:
+        cache = ResponseCache(max_size=10)
+    router = LLMRouter(cache=cache)
+    provider = router._providers["echo"] = EchoProvider()
+    router.add_model("echo", ModelConfig(name="echo-1", provider="echo"), primary=True)
+    
+    messages = [{"role": "user", "content": "hi"}]
+    first = router.chat(messages)
+    second = router.chat(messages)
+    router.chat(messages, temperature=0.7)  # Different params, different entry
+    
+    assert provider.calls == 2
+    assert not first.cached and second.cached
+    assert second.content == "hi"
+    
+    stats = router.get_usage_stats()["cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["entries"] == 2
+
+def test_memory_cache_backend_lru_bounds():
+    from webis.core.llm import MemoryCacheBackend
+    
+    backend = MemoryCacheBackend(max_entries=2, max_bytes=10)
+    backend.set("a", b"1234")
+    backend.set("b", b"1234")
+    backend.get("a")
+    backend.set("c", b"1234")  # Evicts "b", the least recently used
+    assert backend.get("b") is None and backend.get("a") == b"1234"
+    backend.set("d", b"123456")  # Over the byte bound, evicts "c"
+    assert backend.get("c") is None and backend.get("a") == b"1234"
+    assert backend.total_bytes == 10 and backend.evictions == 2
+
+def test_openai_provider_pools_clients(monkeypatch):
+    import asyncio
+    from webis.core.llm import LLMRouter, ModelConfig, OpenAICompatibleProvider
+    
+    monkeypatch.setenv("TEST_LLM_KEY", "sk-test")
+    config = ModelConfig(name="m", provider="openai", api_key_env="TEST_LLM_KEY", base_url="http://localhost:1/v1")
+    other = ModelConfig(name="m2", provider="openai", api_key_env="TEST_LLM_KEY", base_url="http://localhost:2/v1")
+    
+    assert OpenAICompatibleProvider().get_client(config) is OpenAICompatibleProvider().get_client(config)
+    assert OpenAICompatibleProvider().get_client(config) is not OpenAICompatibleProvider().get_client(other)
+    
+    async def async_clients():
+        provider = OpenAICompatibleProvider()
+        client = provider.get_async_client(config)
+        assert client is provider.get_async_client(config)
+        # Closing a router closes the loop's pooled clients
+        await LLMRouter(enable_cache=False).aclose()
+        assert client.is_closed()
+        assert provider.get_async_client(config) is not client
+        await provider.aclose()
+    asyncio.run(async_clients())
+
+def test_llm_router_achat_offloads_sync_provider():
+    import asyncio
+    from webis.core.llm import LLMRouter, ModelConfig
+    
+    router = LLMRouter(enable_cache=False)
+    router._providers["echo"] = EchoProvider()
+    router.add_model("echo", ModelConfig(name="echo-1", provider="echo"), primary=True)
+    
+    response = asyncio.run(router.achat([{"role": "user", "content": "hi"}]))
+    assert response.content == "hi"
+    assert router.get_usage_stats()["total_tokens"] == 3
+
+class SlowEchoProvider(EchoProvider):
+    def chat(self, messages, model_config, **kwargs):
+        import time
+        time.sleep(0.2)
+        return super().chat(messages, model_config, **kwargs)
+
+def _echo_router(provider, cache=None):
+    from webis.core.llm import LLMRouter, ModelConfig
+    
+    router = LLMRouter(cache=cache)
+    router._providers["echo"] = provider
+    router.add_model("echo", ModelConfig(name="echo-1", provider="echo"), primary=True)
+    return router
+
+def test_single_flight_follower_takes_over_from_cancelled_leader():
+    import asyncio
+    from webis.core.llm import SingleFlight
+    
+    flights = SingleFlight()
+    calls = []
+    
+    async def call(name):
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        return name
+    
+    async def main():
+        leader = asyncio.ensure_future(flights.ado("k", lambda: call("leader")))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flights.ado("k", lambda: call("follower")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+    
+    assert asyncio.run(main()) == ("follower", False)
+    assert calls == ["leader", "follower"] and flights.in_flight() == 0
+    
+    # Errors of the call itself are still shared
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise ValueError("upstream")
+    
+    async def both():
+        return await asyncio.gather(
+            flights.ado("e", failing), flights.ado("e", failing), return_exceptions=True
+        )
+    
+    first, second = asyncio.run(both())
+    assert isinstance(second, ValueError) and second is first
+
+def test_llm_router_coalesces_concurrent_calls():
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    
+    provider = SlowEchoProvider()
+    router = _echo_router(provider)
+    messages = [{"role": "user", "content": "same"}]
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda _: router.chat(messages), range(4)))
+    assert provider.calls == 1
+    assert sum(not r.cached for r in responses) == 1
+    assert router.get_usage_stats()["coalesced_requests"] == 3
+    
+    async def burst():
+        other = [{"role": "user", "content": "async"}]
+        return await asyncio.gather(*(router.achat(other) for _ in range(4)))
+    assert [r.content for r in asyncio.run(burst())] == ["async"] * 4
+    assert provider.calls == 2
+
+def test_llm_router_coalesces_across_routers_with_shared_backend(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from webis.core.llm import ResponseCache, SQLiteCacheBackend
+    
+    # Separate routers stand in for separate worker processes
+    provider = SlowEchoProvider()
+    routers = [
+        _echo_router(provider, ResponseCache(backend=SQLiteCacheBackend(
+            str(tmp_path / "cache.db"), coalesce_across_processes=True
+        )))
+        for _ in range(3)
+    ]
+    messages = [{"role": "user", "content": "shared"}]
+    
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = list(pool.map(lambda r: r.chat(messages), routers))
+    assert provider.calls == 1
+    assert [r.content for r in responses] == ["shared"] * 3
+    
+    # Followers find a fallback's answer under the requested model's key
+    class DownProvider(EchoProvider):
+        def chat(self, messages, model_config, **kwargs):
+            raise RuntimeError("primary down")
+    from webis.core.llm import ModelConfig
+    fallback = SlowEchoProvider()
+    for router in routers:
+        router._providers["down"] = DownProvider()
+        router._providers["fallback"] = fallback
+        router.add_model("down", ModelConfig(name="down-1", provider="down"), primary=True)
+        router.add_model("backup", ModelConfig(name="backup-1", provider="fallback"), fallback=True)
+    messages = [{"role": "user", "content": "failover"}]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = list(pool.map(lambda r: r.chat(messages), routers))
+    assert fallback.calls == 1
+    assert [r.content for r in responses] == ["failover"] * 3
+
+class ThrottledError(Exception):
+    status_code = 429
+
+class FlakyEchoProvider(EchoProvider):
+    """Fails with 429 on the first ``failures`` calls."""
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+    def chat(self, messages, model_config, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise ThrottledError("rate limited")
+        return super().chat(messages, model_config, **kwargs)
+
+def test_llm_router_retries_throttled_model_before_fallback():
+    from webis.core.llm import LLMRouter, ModelConfig, get_rate_limiter
+    
+    router = LLMRouter(enable_cache=False)
+    router.overload_backoff = 0.01
+    router._providers["flaky"] = FlakyEchoProvider(failures=2)
+    router._providers["echo"] = fallback = EchoProvider()
+    config = ModelConfig(name="flaky-1", provider="flaky", rpm=600, tpm=100_000, max_concurrency=8)
+    router.add_model("flaky", config, primary=True)
+    router.add_model("echo", ModelConfig(name="echo-1", provider="echo"), fallback=True)
+    
+    assert router.chat([{"role": "user", "content": "hi"}]).model == "flaky-1"
+    assert fallback.calls == 0
+    
+    limiter = get_rate_limiter(config)
+    assert limiter.throttled == 2
+    # Halved twice from 4, then one additive step
+    assert limiter.concurrency.limit == pytest.approx(2.0)
+
+def test_adaptive_concurrency_limit_shared_by_threads_and_tasks():
+    import asyncio
+    import threading
+    import time
+    from webis.core.llm import AdaptiveConcurrencyLimit
+    
+    limit = AdaptiveConcurrencyLimit(max_limit=2, initial=2)
+    peak = 0
+    lock = threading.Lock()
+    
+    def work():
+        nonlocal peak
+        with lock:
+            peak = max(peak, limit.in_flight)
+        time.sleep(0.02)
+        limit.release()
+    
+    def sync_worker():
+        limit.acquire()
+        work()
+    
+    async def async_worker():
+        await limit.aacquire()
+        await asyncio.to_thread(work)
+    
+    async def main():
+        threads = [threading.Thread(target=sync_worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        await asyncio.gather(*(async_worker() for _ in range(4)))
+        for t in threads:
+            t.join()
+    
+    asyncio.run(main())
+    assert peak == 2 and limit.in_flight == 0
+
+class PackingProvider(EchoProvider):
+    """Answers packed prompts with upper-cased inputs, dropping input "bad"."""
+    def chat(self, messages, model_config, **kwargs):
+        import json
+        import re
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        match = re.search(r"Inputs:\n(\[.*\])", prompt, re.DOTALL)
+        if not match:
+            if prompt.endswith("bad"):
+                raise ValueError("bad input")
+            return LLMResponse(content=prompt.rsplit("\n", 1)[-1].upper(), model=model_config.name)
+        outputs = [
+            {"id": entry["id"], "output": entry["input"].upper()}
+            for entry in json.loads(match.group(1)) if entry["input"] != "bad"
+        ]
+        return LLMResponse(content=json.dumps(outputs), model=model_config.name, total_tokens=10)
+
+def test_llm_router_chat_batch_packs_and_isolates_errors():
+    provider = PackingProvider()
+    router = _echo_router(provider)
+    router.batch_size = 3
+    
+    results = router.chat_batch("Shout", ["a", "b", "bad", "c", "d"])
+    
+    assert [r.content for r in results if not isinstance(r, Exception)] == ["A", "B", "C", "D"]
+    assert isinstance(results[2], RuntimeError)
+    # Two packed calls plus a lone retry of the item missing from the first answer
+    assert provider.calls == 3
+
+class RecordingProvider(PackingProvider):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+    def chat(self, messages, model_config, **kwargs):
+        self.requests.append((messages, kwargs.get("max_tokens")))
+        return super().chat(messages, model_config, **kwargs)
+
+def test_llm_router_batch_paths_share_system_and_prompt():
+    import asyncio
+    
+    provider = RecordingProvider()
+    router = _echo_router(provider)
+    single = [{"role": "system", "content": "Be loud"}, {"role": "user", "content": "Shout\n\na"}]
+    
+    # Same messages and parameters in every path: later calls are cache hits
+    router.chat_batch("Shout", ["a"], system="Be loud", output_tokens_per_item=50)
+    asyncio.run(router.achat_batched("Shout", "a", system="Be loud", output_tokens_per_item=50))
+    router.enable_batching(batch_size=4, linger_ms=0)
+    asyncio.run(router.achat_batched("Shout", "a", system="Be loud", output_tokens_per_item=50))
+    assert provider.requests == [(single, 50)]
+    
+    # Packed prompts keep the system message, and a retried item gets the single prompt
+    provider.requests.clear()
+    router.chat_batch("Shout", ["bad", "a"], system="Be loud", output_tokens_per_item=50)
+    packed, retry = provider.requests
+    assert packed[0][0]["content"].startswith("Be loud\n\n")
+    assert retry == ([single[0], {"role": "user", "content": "Shout\n\nbad"}], 50)
+
+def test_llm_plugins_send_one_prompt_per_document_and_skip_empty_text():
+    import importlib.util
+    from pathlib import Path
+    
+    def load(name):
+        spec = importlib.util.spec_from_file_location(
+            name, Path(__file__).parents[1] / f"src/webis/plugins/processors/{name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    
+    provider = RecordingProvider()
+    summarizer = load("summarizer_plugin").SummarizerPlugin({"prompt": "Sum up:\n\n{text}"})
+    summarizer.llm = _echo_router(provider)
+    summarizer.process(WebisDocument(content="one"))
+    summarizer.process_batch([WebisDocument(content="two")])
+    assert [messages for messages, _ in provider.requests] == [
+        [{"role": "system", "content": summarizer.system_prompt}, {"role": "user", "content": f"Sum up:\n\n{text}"}]
+        for text in ("one", "two")
+    ]
+    with pytest.raises(ValueError):
+        load("summarizer_plugin").SummarizerPlugin({"prompt": "{text}\n\nSum up."})
+    
+    provider.requests.clear()
+    sentiment = load("sentiment_plugin").SentimentAnalysisPlugin()
+    sentiment.llm = _echo_router(provider)
+    docs = [WebisDocument(content=""), WebisDocument(content="great")]
+    assert sentiment.process_batch(docs) == docs
+    assert sentiment.process(docs[0]) is docs[0]
+    assert len(provider.requests) == 1 and provider.requests[0][0][-1]["content"].endswith("great")
+
+def test_llm_router_batch_input_budget_reserves_packed_output(caplog):
+    from webis.core.llm import ModelConfig
+    
+    router = _echo_router(EchoProvider())
+    router.add_model("big", ModelConfig(name="big-1", provider="echo", context_window=8192, max_tokens=4096))
+    router.batch_size = 16
+    # 16 items x 64 tokens + 64 are reserved, not the config's whole max_tokens
+    assert router._max_batch_input_tokens("big", {}, 64) == 8192 - (16 * 64 + 64) - 256
+    
+    router.add_model("small", ModelConfig(name="small-1", provider="echo", context_window=1000, max_tokens=4096))
+    with caplog.at_level("WARNING"):
+        assert router._max_batch_input_tokens("small", {}, 256) == 256
+    assert "using 256" in caplog.text
+
+def test_llm_router_achat_batched_micro_batches():
+    import asyncio
+    
+    provider = PackingProvider()
+    router = _echo_router(provider).enable_batching(batch_size=8, linger_ms=20)
+    
+    async def burst():
+        return await asyncio.gather(*(router.achat_batched("Shout", t) for t in "wxyz"))
+    
+    assert [r.content for r in asyncio.run(burst())] == ["W", "X", "Y", "Z"]
+    assert provider.calls == 1
+
+def test_llm_router_offline_batch_job_resumes(tmp_path, monkeypatch):
+    from webis.core.llm import BatchJobProvider, LLMRouter, ModelConfig
+    from webis.core.utils.checkpoint import CheckpointManager
+    from webis.tools.dev.fake_batch_server import FakeBatchServer
+    
+    def responder(body):
+        text = body["messages"][-1]["content"]
+        if "bad" in text:
+            raise ValueError("rejected")
+        return text.upper()
+    
+    monkeypatch.setenv("FAKE_BATCH_KEY", "test")
+    checkpoints = CheckpointManager(str(tmp_path / "ckpt"))
+    with FakeBatchServer(responder, polls_to_complete=3) as server:
+        router = LLMRouter(enable_cache=False)
+        router.add_model("fake", ModelConfig(
+            name="fake-1", provider="openai", base_url=server.base_url,
+            api_key_env="FAKE_BATCH_KEY", cost_per_1m_input=1.0,
+        ), primary=True)
+        
+        # First run is interrupted while the job is still running
+        impatient = BatchJobProvider(spool_dir=str(tmp_path / "spool"), poll_interval=0, timeout=0)
+        with pytest.raises(TimeoutError):
+            router.chat_batch("Shout", ["a", "bad", "c"], ids=["d1", "d2", "d3"],
+                              job=impatient, checkpoints=checkpoints)
+        
+        # The rerun resumes the submitted job instead of submitting again
+        job = BatchJobProvider(spool_dir=str(tmp_path / "spool"), poll_interval=0)
+        results = router.chat_batch("Shout", ["a", "bad", "c"], ids=["d1", "d2", "d3"],
+                                    job=job, checkpoints=checkpoints)
+        
+        assert len(server.batches) == 1
+        assert results[0].content == "SHOUT\n\nA"
+        assert isinstance(results[1], Exception)
+        assert results[2].content == "SHOUT\n\nC"
+        assert router.total_tokens > 0
+        assert list((tmp_path / "ckpt").iterdir()) == []
+
+def test_fit_to_budget_uses_tokens():
+    from webis.core.llm import ModelConfig, fit_to_budget, get_tokenizer
+    
+    config = ModelConfig(name="gpt-4o-mini", provider="openai", context_window=1000, max_tokens=200)
+    tokenizer = get_tokenizer(config)
+    english = "The quick brown fox jumps over the lazy dog. " * 200
+    chinese = "今天的天气很好，我们去公园散步吧。" * 200
+    
+    # Same token budget, very different character counts
+    short_en = fit_to_budget(english, config, max_input_tokens=100)
+    short_zh = fit_to_budget(chinese, config, max_input_tokens=100)
+    assert 90 <= tokenizer.count(short_en) <= 100
+    assert 90 <= tokenizer.count(short_zh) <= 100
+    assert len(short_en) > 2 * len(short_zh)
+    
+    # Context window minus completion and prompt bounds the input
+    assert tokenizer.count(fit_to_budget(english, config, reserved_tokens=100)) <= 700
+    
+    # Chunks are selected whole, in order
+    chunks = ["alpha " * 40, "beta " * 40, "gamma " * 40]
+    counts = tokenizer.count_batch(chunks)
+    assert fit_to_budget(chunks, config, max_input_tokens=counts[0] + counts[1]) == chunks[:2]
+    
+    with pytest.raises(ValueError):
+        fit_to_budget(english, config, output_tokens=1000)
+
+class StreamingEchoProvider(LLMProvider):
+    """Streams the prompt back word by word; ``fail_at`` raises before that word."""
+    def __init__(self, fail_at=None):
+        self.calls = 0
+        self.fail_at = fail_at
+    def chat(self, messages, model_config, **kwargs):
+        raise NotImplementedError
+    def stream(self, messages, model_config, **kwargs):
+        import time
+        from webis.core.llm.base import _set_stream_metrics
+        
+        self.calls += 1
+        start = time.time()
+        first = None
+        words = messages[-1]["content"].split()
+        for i, word in enumerate(words):
+            if i == self.fail_at:
+                raise RuntimeError("connection reset")
+            time.sleep(0.01)
+            if first is None:
+                first = time.time()
+            yield word + " "
+        response = LLMResponse(content=" ".join(words) + " ", model=model_config.name,
+                               completion_tokens=len(words), total_tokens=len(words))
+        yield _set_stream_metrics(response, start, first, time.time())
+
+def test_llm_router_stream_fails_over_before_first_token_and_caches():
+    import asyncio
+    from webis.core.llm import LLMRouter, ModelConfig
+    
+    router = LLMRouter()
+    router._providers["broken"] = StreamingEchoProvider(fail_at=0)
+    good = router._providers["echo"] = StreamingEchoProvider()
+    router.add_model("broken", ModelConfig(name="broken-1", provider="broken"), primary=True)
+    router.add_model("echo", ModelConfig(name="echo-1", provider="echo"), fallback=True)
+    
+    messages = [{"role": "user", "content": "one two three"}]
+    stream = router.stream(messages)
+    assert list(stream) == ["one ", "two ", "three "]
+    response = stream.response
+    assert response.model == "echo-1"
+    assert 0 < response.ttft_ms < response.latency_ms
+    assert response.tokens_per_second > 0
+    
+    # Completed streams feed the cache (under the model that answered)
+    replay = router.astream(messages, model="echo")
+    assert asyncio.run(replay.read()).cached
+    assert good.calls == 1
+    
+    # Once tokens have been sent, errors surface instead of failing over
+    router._providers["echo"] = StreamingEchoProvider(fail_at=1)
+    stream = router.stream([{"role": "user", "content": "a b c"}], model="echo")
+    with pytest.raises(RuntimeError, match="connection reset"):
+        list(stream)
+
+class SleepyEchoProvider(EchoProvider):
+    """Echo after ``delay`` seconds (a real sleep, or an awaitable one)."""
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.cancelled = 0
+    def chat(self, messages, model_config, **kwargs):
+        import time
+        time.sleep(self.delay)
+        return super().chat(messages, model_config, **kwargs)
+    async def achat(self, messages, model_config, **kwargs):
+        import asyncio
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return super().chat(messages, model_config, **kwargs)
+
+def test_llm_router_hedges_slow_primary():
+    import asyncio
+    import time
+    from webis.core.llm import LLMRouter, ModelConfig
+    
+    router = LLMRouter(enable_cache=False).enable_hedging(delay_ms=50)
+    slow = router._providers["slow"] = SleepyEchoProvider(0.5)
+    router._providers["fast"] = SleepyEchoProvider(0.0)
+    router.add_model("slow", ModelConfig(name="slow-1", provider="slow"), primary=True)
+    router.add_model("fast", ModelConfig(name="fast-1", provider="fast"), fallback=True)
+    
+    started = time.monotonic()
+    response = router.chat([{"role": "user", "content": "hi"}])
+    assert response.model == "fast-1"
+    assert time.monotonic() - started < 0.4
+    
+    # The async loser is cancelled, not just ignored
+    response = asyncio.run(router.achat([{"role": "user", "content": "hey"}]))
+    assert response.model == "fast-1"
+    assert slow.cancelled == 1
+    stats = router.get_usage_stats()
+    assert stats["hedged_requests"] == 2 and stats["hedge_wins"] == 2
+    
+    # Without a fixed delay, hedging waits for enough samples, then uses p95
+    router.enable_hedging(min_samples=5)
+    assert router._hedge_delay("fast") is None
+    for latency in [100, 110, 120, 130, 900]:
+        router.latency.record("fast", latency)
+    assert router._hedge_delay("fast") == 0.9
+
+def test_llm_router_routing_objective_prefers_cheap_fast_model():
+    from webis.core.llm import ModelConfig
+    
+    router = _echo_router(EchoProvider())
+    router.add_model("pricey", ModelConfig(name="pricey-1", provider="echo", cost_per_1m_input=10.0),
+                     primary=True)
+    router.add_model("cheap", ModelConfig(name="cheap-1", provider="echo", cost_per_1m_input=0.1),
+                     fallback=True)
+    router.set_routing_objective(cost_weight=1.0, latency_weight=1.0)
+    assert router.chat([{"role": "user", "content": "x"}]).model == "cheap-1"
+    
+    # Slow enough, the cheap model loses
+    for _ in range(10):
+        router.latency.record("cheap", 30_000)
+    assert router._routing_order()[0] == "pricey"
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.batches = []
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+def test_cached_embedder_dedups_batches_and_persists(tmp_path):
+    from webis.core.embedding import CachedEmbedder, EmbeddingCache
+    
+    path = str(tmp_path / "embeddings.db")
+    provider = CountingEmbeddings()
+    embedder = CachedEmbedder(provider, "fake-embed", cache=EmbeddingCache(path), batch_size=2)
+    
+    texts = ["cookie banner", "article one", "cookie banner", "footer", "article two"]
+    vectors = embedder.embed(texts)
+    assert vectors[0] == vectors[2] == [13.0, 0.5]
+    # Four unique texts, in batches of at most two
+    assert provider.batches == [["cookie banner", "article one"], ["footer", "article two"]]
+    
+    # A fresh process only embeds what it has never seen
+    provider = CountingEmbeddings()
+    embedder = CachedEmbedder(provider, "fake-embed", cache=EmbeddingCache(path))
+    assert embedder.embed(["footer", "new text"]) == [[6.0, 0.5], [8.0, 0.5]]
+    assert provider.batches == [["new text"]]
+    # Cache entries are per model
+    other = CountingEmbeddings()
+    CachedEmbedder(other, "other-embed", cache=EmbeddingCache(path)).embed(["footer"])
+    assert other.batches == [["footer"]]
+
+def test_embedding_plugin_hashing_backend_runs_offline():
+    import importlib.util
+    from pathlib import Path
+    from webis.core.embedding import get_embedding_backend
+    
+    backend = get_embedding_backend("hashing", dimension=64)
+    near, same, far = backend.embed_documents(
+        ["cookie banner accept", "Cookie banner accept", "quarterly revenue grew"]
+    )
+    assert list(near) == list(same)
+    dot = lambda a, b: sum(x * y for x, y in zip(a, b))
+    assert dot(near, same) > dot(near, far)
+    
+    with pytest.raises(ValueError):
+        get_embedding_backend("nope")
+    
+    # Loaded by path: the processors package pulls in optional splitters
+    spec = importlib.util.spec_from_file_location(
+        "embedding_plugin",
+        Path(__file__).parents[1] / "src/webis/plugins/processors/embedding_plugin.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    plugin = module.EmbeddingPlugin({"backend": "hashing", "cache_path": None})
+    doc = WebisDocument(content="x", chunks=[{"content": "cookie banner", "index": 0}])
+    plugin.process(doc)
+    assert len(doc.chunk_embedding(doc.chunks[0])) == 256
+    assert doc.processing_history[-1]["details"]["backend"] == "hashing"
+    plugin.cleanup()
+
+def test_local_backend_serializes_encoder_calls(monkeypatch):
+    np = pytest.importorskip("numpy")
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from webis.core.embedding import backends
+    
+    class FakeEncoder:
+        active = 0
+        overlapped = False
+        def encode(self, texts, **kwargs):
+            FakeEncoder.active += 1
+            FakeEncoder.overlapped |= FakeEncoder.active > 1
+            time.sleep(0.01)
+            FakeEncoder.active -= 1
+            return np.ones((len(texts), 4), dtype=np.float32)
+        def get_sentence_embedding_dimension(self):
+            return 4
+    
+    encoder = FakeEncoder()
+    monkeypatch.setattr(backends, "load_local_model", lambda *args: encoder)
+    backend = backends.LocalEmbeddingBackend(model="fake", batch_size=2, threads=2)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(backend.embed_documents, [["a"] * 5] * 4))
+    
+    assert all(result.shape == (5, 4) for result in results)
+    assert not FakeEncoder.overlapped
+    backend.close()
+
+
+def test_document_embeddings_are_contiguous_and_roundtrip(caplog):
+    import pickle
+    from webis.core.embedding import EmbeddingMatrix
+    
+    doc = WebisDocument(
+        content="x",
+        chunks=[{"content": "a", "index": 0}, {"content": "b", "index": 1}],
+    )
+    doc.set_chunk_embeddings([[0.5, -1.0, 2.0], [0.25, 0.0, 1.5]])
+    assert doc.embeddings.shape == (2, 3)
+    assert doc.embeddings.nbytes == 24
+    assert [chunk.embedding_row for chunk in doc.chunks] == [0, 1]
+    assert list(doc.chunk_embedding(doc.chunks[1])) == [0.25, 0.0, 1.5]
+    
+    # JSON carries one base64 buffer, not a list of floats
+    payload = doc.to_dict()
+    assert isinstance(payload["embeddings"]["data"], str)
+    restored = WebisDocument.model_validate(payload)
+    assert restored.embeddings == doc.embeddings
+    assert pickle.loads(pickle.dumps(doc.embeddings)) == doc.embeddings
+    
+    half = doc.embeddings.astype("float16")
+    assert half.nbytes == 12 and half.row(0) == [0.5, -1.0, 2.0]
+    assert WebisDocument.model_validate({**payload, "embeddings": half.to_json()}).embeddings.dtype == "float16"
+    # Documents stored before the change still load
+    legacy = WebisDocument(content="x", embeddings=[[1.0, 2.0]])
+    assert isinstance(legacy.embeddings, EmbeddingMatrix) and legacy.embeddings.row(0) == [1.0, 2.0]
+    legacy = WebisDocument.model_validate({
+        "content": "x",
+        "chunks": [{"content": "a", "index": 0}, {"content": "b", "index": 1}],
+        "embeddings": [[1.0, 2.0], [3.0, 4.0]],
+    })
+    assert list(legacy.chunk_embedding(legacy.chunks[1])) == [3.0, 4.0]
+    # Per-chunk vectors are moved into the document's matrix, even if some chunks lack one
+    legacy = WebisDocument.model_validate({
+        "content": "x",
+        "chunks": [
+            {"content": "a", "index": 0, "embedding": None},
+            {"content": "b", "index": 1, "embedding": [1.0, 2.0]},
+        ],
+    })
+    assert "embedding" not in legacy.chunks[1].model_dump()
+    assert [chunk.embedding_row for chunk in legacy.chunks] == [None, 0]
+    assert legacy.chunk_embedding(legacy.chunks[0]) is None
+    assert list(legacy.chunk_embedding(legacy.chunks[1])) == [1.0, 2.0]
+    assert "Discarding" not in caplog.text
+    # A chunk on its own has nowhere to keep a vector
+    from webis.core.schema import DocumentChunk
+    DocumentChunk(content="a", index=0, embedding=[1.0, 2.0])
+    assert "Discarding the embedding of chunk 0" in caplog.text
+
+
+def test_document_record_roundtrip():
+    from webis.core.records import DocumentRecord, to_documents, to_records
+    from webis.core.schema import DocumentMetadata, DocumentType
+    
+    doc = WebisDocument(
+        content="<p>hi</p>",
+        doc_type=DocumentType.HTML,
+        meta=DocumentMetadata(url="https://example.com", crawl_depth=2),
+        chunks=[{"content": "hi", "index": 0, "start_char": 3}],
+    )
+    doc.add_processing_step("source", {"stage": "fetch"})
+    
+    record = to_records([doc])[0]
+    assert not hasattr(record, "__dict__")
+    record.clean_content = "hi"
+    record.add_processing_step("html_cleaner")
+    
+    restored = to_documents([record])[0]
+    assert restored.id == doc.id and restored.clean_content == "hi"
+    assert restored.meta.url == "https://example.com" and restored.meta.crawl_depth == 2
+    assert restored.chunks[0].content == "hi" and restored.chunks[0].start_char == 3
+    assert [step["plugin"] for step in restored.processing_history] == ["source", "html_cleaner"]
+    assert isinstance(restored.processing_history[1]["timestamp"], str)
+    # Converted documents serialize like validated ones
+    assert WebisDocument.model_validate(restored.to_dict()).meta.crawl_depth == 2
+    
+    fresh = DocumentRecord(content="x", meta={"title": "t"}).to_document()
+    assert fresh.meta.title == "t" and fresh.meta.tags == [] and fresh.meta.fetched_at is not None
+
+
+class UpperColumnsProcessor(ProcessorPlugin):
+    name = "upper_columns"
+    
+    def process(self, doc, context=None, **kwargs):
+        raise AssertionError("process_columns should be preferred")
+    
+    def process_columns(self, batch, context=None, **kwargs):
+        from webis.core.batch import sub_column
+        batch["clean_content"] = sub_column(r"[a-z0-9]+@[a-z.]+", "[EMAIL]", batch["content"], required="@")
+        batch.filter(batch.mask("content", lambda text: "drop" not in text))
+        batch.add_processing_step(self.name)
+        return batch
+
+def test_process_columns_preferred_by_process_batch():
+    docs = [
+        WebisDocument(content="mail bob@example.com now"),
+        WebisDocument(content="drop me"),
+        WebisDocument(content="no address"),
+    ]
+    processed = UpperColumnsProcessor().process_batch(docs)
+    assert [doc.clean_content for doc in processed] == ["mail [EMAIL] now", "no address"]
+    assert processed[0] is docs[0]
+    assert processed[1].processing_history[-1]["plugin"] == "upper_columns"
+    
+    # Concurrent chunks go through process_batch, and so through the columns
+    docs = [WebisDocument(content=f"to x{i}@y.org") for i in range(6)]
+    processed = UpperColumnsProcessor().process_batch_concurrent(docs, concurrency=3)
+    assert [doc.clean_content for doc in processed] == ["to [EMAIL]"] * 6
+
+def test_aprocess_batch_keeps_batch_path_and_cancels_siblings():
+    import asyncio
+    
+    docs = [WebisDocument(content=f"to x{i}@y.org") for i in range(3)]
+    processed = asyncio.run(UpperColumnsProcessor().aprocess_batch(docs, concurrency=2))
+    assert [doc.clean_content for doc in processed] == ["to [EMAIL]"] * 3
+    
+    finished = []
+    class FailFast(ProcessorPlugin):
+        name = "fail_fast"
+        def process(self, doc, context=None, **kwargs):
+            raise AssertionError("aprocess should be used")
+        async def aprocess(self, doc, context=None, **kwargs):
+            if doc.content == "bad":
+                raise ValueError("bad document")
+            await asyncio.sleep(0.5)
+            finished.append(doc.content)
+            return doc
+    
+    docs = [WebisDocument(content=text) for text in ("ok", "bad", "ok")]
+    with pytest.raises(ValueError, match="bad document"):
+        asyncio.run(FailFast().aprocess_batch(docs))
+    assert finished == []
+
+class BatchOnlyProcessor(ProcessorPlugin):
+    """Counts process_batch() calls; has no aprocess()."""
+    name = "batch_only"
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+    def process(self, doc, context=None, **kwargs):
+        raise AssertionError("process_batch should be used")
+    def process_batch(self, docs, context=None, **kwargs):
+        self.batches.append(len(docs))
+        return docs
+
+def test_async_executor_keeps_batch_path():
+    from webis.core.plugin import PluginRegistry
+    
+    plugin = BatchOnlyProcessor()
+    assert plugin.prefers_batches and not UpperPlugin().prefers_batches
+    docs = [WebisDocument(content=str(i)) for i in range(6)]
+    assert plugin.process_batch_concurrent(docs, concurrency=3, executor="async") == docs
+    assert plugin.batches == [2, 2, 2]
+    
+    # The pipeline runs such stages on threads instead of an event loop
+    registry = PluginRegistry()
+    registry.register(TrickleSource())
+    registry.register(plugin)
+    pipeline = Pipeline(registry=registry)
+    pipeline.add_source("trickle_source")
+    pipeline.add_processor("batch_only", concurrency=2, executor="async")
+    plugin.batches.clear()
+    assert len(pipeline.run("test", limit=4).documents) == 4
+    assert plugin.batches == [2, 2]
+
+
+def test_document_repository_bulk_upsert(tmp_path):
+    pytest.importorskip("sqlmodel")
+    from webis.core.memory.db import create_db_engine, init_db
+    from webis.core.memory.repository import DocumentRepository
+    from webis.core.schema import DocumentMetadata
+    
+    engine = create_db_engine(f"sqlite:///{tmp_path}/docs.db")
+    init_db(engine)
+    repo = DocumentRepository(engine, chunk_size=2)
+    
+    docs = [
+        WebisDocument(content=f"body {i}", meta=DocumentMetadata(url=f"https://x/{i}"))
+        for i in range(5)
+    ]
+    assert repo.bulk_upsert(docs) == {"inserted": 5, "updated": 0, "skipped": 0}
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+    
+    # Same URL with new content, and same content under a new URL
+    changed = WebisDocument(content="body 0 v2", meta=DocumentMetadata(url="https://x/0"))
+    moved = WebisDocument(content="body 1", meta=DocumentMetadata(url="https://y/1"))
+    fresh = WebisDocument(content="body 9", meta=DocumentMetadata(url="https://x/9"))
+    assert repo.bulk_upsert([changed, moved, fresh]) == {"inserted": 1, "updated": 2, "skipped": 0}
+    assert repo.count() == 6
+
+
+def test_bloom_filter_has_no_false_negatives():
+    from webis.core.utils.bloom import BloomFilter
+    
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    bloom.update(f"u:https://x/{i}" for i in range(5000))
+    assert len(bloom) == 5000
+    assert all(f"u:https://x/{i}" in bloom for i in range(5000))
+    false_positives = sum(f"u:https://y/{i}" in bloom for i in range(10000))
+    assert false_positives < 200
+
+
+def test_deduplicator_filter_new(tmp_path):
+    pytest.importorskip("sqlmodel")
+    from sqlmodel import Session
+    from webis.core.memory.db import create_db_engine, init_db
+    from webis.core.memory.deduplication import Deduplicator
+    from webis.core.memory.repository import DocumentRepository
+    from webis.core.schema import DocumentMetadata
+    
+    engine = create_db_engine(f"sqlite:///{tmp_path}/dedup.db")
+    init_db(engine)
+    stored = [WebisDocument(content=f"body {i}", meta=DocumentMetadata(url=f"https://x/{i}")) for i in range(3)]
+    DocumentRepository(engine).bulk_upsert(stored)
+    
+    batch = [
+        WebisDocument(content="body 0", meta=DocumentMetadata(url="https://other/0")),   # stored content
+        WebisDocument(content="changed", meta=DocumentMetadata(url="https://x/1")),      # stored URL
+        WebisDocument(content="fresh", meta=DocumentMetadata(url="https://x/new")),
+        WebisDocument(content="fresh", meta=DocumentMetadata(url="https://x/copy")),     # repeated in batch
+    ]
+    with Session(engine) as session:
+        # The filter is on by default and loaded on the first filter_new
+        assert Deduplicator(session).seen is not None
+        for use_filter in (False, True):
+            dedup = Deduplicator(session, use_filter=use_filter)
+            assert [d.meta.url for d in dedup.filter_new(batch)] == ["https://x/new"]
+            assert dedup.is_duplicate(stored[2])
+            assert dedup.get_existing_doc(batch[1]).url == "https://x/1"
+
+
+def test_near_duplicate_index_and_plugin(tmp_path):
+    import importlib.util
+    import random
+    from pathlib import Path
+    from webis.core.near_duplicates import NearDuplicateIndex
+    
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(2000)]
+    article = " ".join(rng.choice(words) for _ in range(300))
+    other = " ".join(rng.choice(words) for _ in range(300))
+    syndicated = "Home | World | Sports " + article + " Copyright Example Media. Subscribe."
+    
+    path = str(tmp_path / "near.db")
+    index = NearDuplicateIndex(path, threshold=0.8)
+    assert index.match_or_insert("a", index.signature(article)) is None
+    assert index.match_or_insert("b", index.signature(other)) is None
+    match = index.match_or_insert("c", index.signature(syndicated))
+    assert match[0] == "a" and match[1] >= 0.8
+    index.close()
+    
+    # Signatures persist; the MinHash parameters of an index are fixed
+    reopened = NearDuplicateIndex(path, threshold=0.8)
+    assert len(reopened) == 2 and reopened.query(reopened.signature(syndicated))[0][0] == "a"
+    reopened.close()
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path, num_perm=64)
+    
+    spec = importlib.util.spec_from_file_location(
+        "near_duplicate_plugin",
+        Path(__file__).parents[1] / "src/webis/plugins/processors/near_duplicate_plugin.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    docs = [WebisDocument(content=text) for text in (article, other, syndicated)]
+    
+    assert module.NearDuplicatePlugin().process_batch(docs) == docs[:2]
+    marked = module.NearDuplicatePlugin({"action": "mark"}).process_batch(docs)
+    assert marked[2].parent_id == docs[0].id
+    assert marked[2].meta.custom["near_duplicate_of"] == docs[0].id
+    
+    # Reprocessing an indexed document (retry, resume, rerun) does not match itself
+    assert index.match_or_insert("a", index.signature(article)) is None
+    for action in ("mark", "drop"):
+        plugin = module.NearDuplicatePlugin({"action": action, "index_path": str(tmp_path / f"{action}.db")})
+        assert plugin.process(docs[0]) is docs[0]
+        assert plugin.process(docs[0]) is docs[0]
+        assert docs[0].parent_id is None and "near_duplicate_of" not in docs[0].meta.custom
+        plugin.cleanup()
+
+
+def test_seen_store_and_deduplication_plugin(tmp_path, monkeypatch):
+    import importlib.util
+    import json
+    import time
+    from pathlib import Path
+    from webis.core.pipeline import PipelineContext
+    from webis.core.seen_store import SQLiteSeenStore
+    
+    store = SQLiteSeenStore(str(tmp_path / "seen.db"), ttl=60)
+    assert store.add_new(["a", "b", "a"]) == [True, True, False]
+    # A second handle (another worker) sees the same state
+    other = SQLiteSeenStore(str(tmp_path / "seen.db"), ttl=60)
+    assert other.add_new(["b", "c"]) == [False, True]
+    assert other.contains_many(["a", "z"]) == [True, False]
+    
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert store.add_new(["a"]) == [True]
+    assert len(store) == 1
+    monkeypatch.undo()
+    
+    # A legacy JSON state file is imported once
+    legacy = tmp_path / "dedup_state.json"
+    legacy.write_text(json.dumps(["https://old"]))
+    spec = importlib.util.spec_from_file_location(
+        "deduplication_plugin",
+        Path(__file__).parents[1] / "src/webis/plugins/processors/deduplication_plugin.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    plugin = module.DeduplicationPlugin(state_file=str(legacy))
+    context = PipelineContext(task="monitor")
+    items = [{"url": "https://old"}, {"url": "https://new"}, {"content": "no url"}, {}]
+    result = plugin.run(context, items=items)
+    assert result["items"] == items[1:3]
+    assert result["filtered_count"] == 2
+    assert not legacy.exists() and (tmp_path / "dedup_state.db").exists()
+    assert plugin.run(context, items=items)["items"] == []
+    # A worker that lost the race to import (or rename) the file carries on
+    plugin._import_legacy(str(legacy))
+    def renamed_by_another_worker(src, dst):
+        raise FileNotFoundError(src)
+    legacy.write_text(json.dumps(["https://raced"]))
+    monkeypatch.setattr(module.os, "replace", renamed_by_another_worker)
+    plugin._import_legacy(str(legacy))
+    monkeypatch.undo()
+    assert plugin.store.contains_many(["https://raced"]) == [True]
+    plugin.cleanup()
+
+
+def test_vector_store_upserts_and_queries_with_backend_vectors(tmp_path):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("sqlmodel")
+    from webis.core.embedding import get_embedding_backend
+    from webis.core.memory.vector_store import VectorStore
+    
+    backend = get_embedding_backend("hashing", dimension=32)
+    store = VectorStore("test", persist_dir=str(tmp_path / "chroma"), embedding_backend=backend, batch_size=2)
+    
+    docs = [WebisDocument(content="x", chunks=[{"content": t, "index": 0}]) for t in ("oil supply", "rate cuts", "chip exports")]
+    for doc in docs:
+        doc.set_chunk_embeddings(backend.embed_documents([doc.chunks[0].content]))
+    assert store.upsert_documents(docs) == 3
+    # Re-ingesting replaces instead of failing on existing ids
+    assert store.upsert_batch(["a", "a"], documents=["one", "two"]) == 1
+    assert store.collection.count() == 4
+    
+    results = store.query_many(query_texts=["rate cuts", "oil supply", "two"], n_results=1)
+    assert [ids[0] for ids in results["ids"]] == [docs[1].chunks[0].id, docs[0].chunks[0].id, "a"]
+
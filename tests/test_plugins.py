@@ -17,3 +17,53 @@ def test_processor_plugin(sample_text_doc):
     
     assert " [Processed]" in processed_doc.content
     assert processed_doc.meta.url == "http://example.com/test"
+
+class FakeHNHttp:
+    """Serves HN API responses with a delay that favours later ranks."""
+    def __init__(self):
+        self.item_calls = []
+    
+    def get(self, url, **kwargs):
+        import time
+        from unittest.mock import Mock
+        if url.endswith("topstories.json"):
+            return Mock(ok=True, json=lambda: [1, 2, 3, 4], raise_for_status=lambda: None)
+        item_id = int(url.rsplit("/", 1)[1].split(".")[0])
+        self.item_calls.append(item_id)
+        time.sleep(0.05 * (5 - item_id))
+        return Mock(ok=item_id != 3, json=lambda: {"id": item_id, "title": f"Story {item_id}"})
+
+def test_hackernews_client_parallel_rank_order_and_cache():
+    import time
+    from webis.plugins.sources.hackernews_plugin import HackerNewsClient, HackerNewsItemCache
+    
+    http = FakeHNHttp()
+    client = HackerNewsClient(http=http, max_workers=4, cache=HackerNewsItemCache(ttl=60))
+    
+    started = time.time()
+    ids = client.top_story_ids(4)
+    assert [i for i, _ in client.iter_items(ids)] == [1, 2, 4]
+    # Serial hydration would take 0.5s
+    assert time.time() - started < 0.35
+    
+    # Cached items are not fetched again; the failed one is retried
+    http.item_calls.clear()
+    assert [i for i, _ in client.iter_items(ids)] == [1, 2, 4]
+    assert http.item_calls == [3]
+
+def test_hackernews_item_cache_save_merges(tmp_path):
+    from webis.plugins.sources.hackernews_plugin import HackerNewsItemCache
+    
+    path = str(tmp_path / "hn.json")
+    first, second = HackerNewsItemCache(ttl=60, path=path), HackerNewsItemCache(ttl=60, path=path)
+    first.put(1, {"id": 1, "score": 10})
+    second.put(2, {"id": 2})
+    first.save()
+    second.put(1, {"id": 1, "score": 12})
+    second.save()
+    
+    # Neither save drops the other's items; the later fetch of item 1 wins
+    merged = HackerNewsItemCache(ttl=60, path=path)
+    assert merged.get(2) == {"id": 2}
+    assert merged.get(1) == {"id": 1, "score": 12}
+    assert second.get(1) == {"id": 1, "score": 12} and first.get(2) is None
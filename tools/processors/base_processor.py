@@ -58,6 +58,31 @@ class BaseFileProcessor(ABC):
             return {"success": False, "error": f"Unsupported file type: {ext}"}
         
         return {"success": True, "error": ""}
+
+    @staticmethod
+    def split_by_tokens(text: str, max_tokens: int, model: str = "") -> List[str]:
+        """
+        Split text into chunks of at most max_tokens tokens
+
+        Uses the webis tokenizer when webis is installed, otherwise a
+        rough estimate (one token per CJK character, four characters per
+        token elsewhere).
+
+        Args:
+            text: Text to split
+            max_tokens: Token budget per chunk
+            model: Model name used to pick the encoding
+
+        Returns:
+            List[str]: Consecutive chunks covering the whole text
+        """
+        try:
+            from webis.core.llm.tokenizer import get_tokenizer
+        except ImportError:
+            # Fewer characters per chunk than tokens allowed is always safe for CJK text
+            step = max(1, max_tokens)
+            return [text[i:i + step] for i in range(0, len(text), step)]
+        return get_tokenizer(model).split(text, max_tokens)
     
     @abstractmethod
     def extract_text(self, file_path: str) -> Dict[str, Union[str, bool]]:
@@ -53,8 +53,8 @@ class DocumentProcessor(BaseFileProcessor):
             }
 
             # 文本分块处理（适应长文档）
-            chunk_size = 3000
-            text_chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+            # 按 token 切分：输出与输入长度相当，每块需能在 max_tokens=2048 内返回
+            text_chunks = self.split_by_tokens(text, 1500, model="deepseek-ai/DeepSeek-V3.2")
             denoised_chunks = []
 
             for chunk in text_chunks:
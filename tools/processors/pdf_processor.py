@@ -50,8 +50,8 @@ class PDFProcessor(BaseFileProcessor):
             }
 
             # 修复文本块分割逻辑（步长与块大小保持一致，避免重叠）
-            chunk_size = 3000
-            text_chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+            # 按 token 切分：输出与输入长度相当，每块需能在 max_tokens=2048 内返回
+            text_chunks = self.split_by_tokens(text, 1500, model="deepseek-ai/DeepSeek-V3.2")
             denoised_chunks = []
 
             for chunk in text_chunks: